@@ -0,0 +1,107 @@
+import sys
+import zlib
+from pathlib import Path
+
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+from config import LAZY_SUMMARY_THRESHOLD
+
+class Article:
+    """单条新闻记录。
+
+    使用 __slots__ 代替字典以减少每条记录的内存；来源、语言、类别等重复出现的
+    字符串做驻留处理；超过 LAZY_SUMMARY_THRESHOLD 的原始摘要压缩存储，访问时才解压。
+    """
+
+    __slots__ = (
+        'title', 'link', 'published', 'source', 'language', 'score', 'attitudes_count',
+        '_category', 'translated_title', 'summary_ai', 'index', '_summary', 'content_url',
+        'relevance'
+    )
+
+    def __init__(self, title, link, published='', summary='', source='', language='en',
+                 score=0, attitudes_count=0, category=None, translated_title=None,
+                 summary_ai=None, index=0, content_url=None, relevance=None):
+        self.title = title
+        self.link = link
+        self.published = published
+        self.summary = summary
+        self.source = sys.intern(source)
+        self.language = sys.intern(language)
+        self.score = score or 0
+        self.attitudes_count = attitudes_count or 0
+        self.category = category
+        self.translated_title = translated_title
+        self.summary_ai = summary_ai
+        self.index = index
+        # 原文地址：link 指向讨论页（Hacker News、Reddit）时，正文补全从这里抓取
+        self.content_url = content_url
+        # 与AI主题的向量相似度（向量分类可用时才有），同分文章按它排序
+        self.relevance = relevance
+
+    @property
+    def summary(self):
+        value = self._summary
+        if isinstance(value, bytes):
+            return zlib.decompress(value).decode('utf-8')
+        return value
+
+    @summary.setter
+    def summary(self, value):
+        value = value or ''
+        if len(value) > LAZY_SUMMARY_THRESHOLD:
+            self._summary = zlib.compress(value.encode('utf-8'))
+        else:
+            self._summary = value
+
+    @property
+    def category(self):
+        return self._category
+
+    @category.setter
+    def category(self, value):
+        self._category = sys.intern(value) if value else None
+
+    @property
+    def display_title(self):
+        """日报中展示的标题：有翻译时用翻译后的标题"""
+        return self.translated_title or self.title
+
+    def to_dict(self):
+        """转换为可JSON序列化的字典，省略空的可选字段"""
+        data = {
+            'title': self.title,
+            'link': self.link,
+            'published': self.published,
+            'summary': self.summary,
+            'source': self.source,
+            'language': self.language
+        }
+        for name in ('score', 'attitudes_count', 'category', 'translated_title', 'summary_ai', 'index', 'content_url', 'relevance'):
+            value = getattr(self, name)
+            if value:
+                data[name] = value
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            title=data.get('title', ''),
+            link=data.get('link', ''),
+            published=data.get('published', ''),
+            summary=data.get('summary', ''),
+            source=data.get('source', ''),
+            language=data.get('language', 'en'),
+            score=data.get('score', 0),
+            attitudes_count=data.get('attitudes_count', 0),
+            category=data.get('category'),
+            translated_title=data.get('translated_title'),
+            summary_ai=data.get('summary_ai'),
+            index=data.get('index', 0),
+            content_url=data.get('content_url'),
+            relevance=data.get('relevance')
+        )
+
+    def __repr__(self):
+        return f"Article(title={self.title[:40]!r}, source={self.source!r}, score={self.score})"
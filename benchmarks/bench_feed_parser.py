@@ -0,0 +1,92 @@
+"""对比 RSS 快速解析路径与 feedparser 完整解析的耗时。
+
+用法:
+    python benchmarks/bench_feed_parser.py                    # 合成的大型全文RSS
+    python benchmarks/bench_feed_parser.py --file feed.xml    # 本地保存的真实订阅源
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir.parent))
+
+from feed_parser import fast_parse, feedparser_parse
+
+PARAGRAPH = (
+    '<p>OpenAI, Google and Anthropic shipped new models this week &amp; researchers '
+    'published benchmark results on reasoning, coding and multimodal tasks. '
+    '<a href="https://example.com/more">Read more</a></p>\n'
+)
+
+def synthetic_feed(items, content_kb):
+    """生成类似 techcrunch.com/feed 的RSS：每条带描述和 content:encoded 全文"""
+    body = PARAGRAPH * max(1, content_kb * 1024 // len(PARAGRAPH))
+    entries = []
+    for i in range(items):
+        entries.append(
+            f'<item><title>AI story number {i} &amp; friends</title>'
+            f'<link>https://example.com/story/{i}</link>'
+            f'<guid isPermaLink="false">story-{i}</guid>'
+            f'<pubDate>Mon, 06 Jan 2025 {i % 24:02d}:00:00 +0000</pubDate>'
+            f'<dc:creator>Reporter {i}</dc:creator>'
+            f'<category><![CDATA[AI]]></category>'
+            f'<description><![CDATA[<p>Short description of story {i}.</p>]]></description>'
+            f'<content:encoded><![CDATA[{body}]]></content:encoded>'
+            f'</item>'
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/" '
+        'xmlns:dc="http://purl.org/dc/elements/1.1/">'
+        '<channel><title>Synthetic</title><link>https://example.com</link>'
+        + ''.join(entries) +
+        '</channel></rss>'
+    ).encode('utf-8')
+
+def best_of(func, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--file', help='本地RSS/Atom文件，不指定时使用合成数据')
+    parser.add_argument('--items', type=int, default=50, help='合成订阅源的条目数')
+    parser.add_argument('--content-kb', type=int, default=20, help='合成条目全文大小（KB）')
+    parser.add_argument('--limit', type=int, default=10, help='解析的条目数上限（与采集器一致）')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.file:
+        content = Path(args.file).read_bytes()
+    else:
+        content = synthetic_feed(args.items, args.content_kb)
+    print(f"文档大小: {len(content) / 1024:.0f} KB，取前 {args.limit} 条，重复 {args.repeat} 次取最优")
+
+    # 原有路径：解码为文本后整体交给 feedparser
+    slow_time, slow_entries = best_of(
+        lambda: feedparser_parse(content.decode('utf-8', errors='replace'), args.limit), args.repeat
+    )
+    fast_time, fast_entries = best_of(lambda: fast_parse(content, args.limit), args.repeat)
+
+    print(f"  feedparser : {slow_time * 1000:8.1f} ms")
+    print(f"  快速路径   : {fast_time * 1000:8.1f} ms  ({slow_time / fast_time:.1f}x)")
+
+    mismatches = [
+        (slow['title'], fast['title'])
+        for slow, fast in zip(slow_entries, fast_entries)
+        if (slow['title'].strip(), slow['link'].strip()) != (fast['title'].strip(), fast['link'].strip())
+    ]
+    if len(slow_entries) != len(fast_entries) or mismatches:
+        print(f"  ⚠️ 结果不一致: feedparser {len(slow_entries)} 条，快速路径 {len(fast_entries)} 条，标题/链接不同 {len(mismatches)} 条")
+    else:
+        print(f"  ✓ 两种路径提取的 {len(fast_entries)} 条标题/链接一致")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+"""离线基准测试：用本地模拟服务器测量 NewsCollector 与 FeishuSender 各阶段的性能。
+
+对每个来源规模（默认 10 / 100 / 1000）在独立子进程中运行一遍流水线，
+报告每个阶段的墙钟时间、CPU时间、峰值内存和发往模拟服务器的请求数。
+
+用法:
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --sizes 10 100 --latency 0.1 --error-rate 0.05
+    python benchmarks/bench_pipeline.py --streaming --warm --json bench.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+import urllib.request
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+sys.path.insert(0, str(current_dir.parent))
+
+from mock_server import MockServer, MockConfig, host_addresses
+
+RESULT_PREFIX = 'BENCH_RESULT '
+
+def build_sources(base_urls, count):
+    """按 7:1:1:1 的比例生成 RSS / Hacker News / Reddit / 微博 源的注册表，轮流分配到各个模拟主机"""
+    sources = []
+    for i in range(count):
+        base = base_urls[i % len(base_urls)]
+        kind = i % 10
+        if kind == 7:
+            sources.append({'type': 'hn', 'name': f'Hacker News AI {i}', 'url': f'{base}/hn/{i}'})
+        elif kind == 8:
+            sources.append({'type': 'reddit', 'name': f'Reddit Machine Learning {i}', 'url': f'{base}/reddit/{i}'})
+        elif kind == 9:
+            sources.append({'type': 'weibo', 'name': f'微博AI热搜 {i}', 'url': f'{base}/weibo/{i}'})
+        else:
+            sources.append({'type': 'rss', 'url': f'{base}/rss/{i}'})
+    return sources
+
+def peak_rss_mb():
+    """进程的历史峰值常驻内存（MB）"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 为单位，macOS 以字节为单位
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+class StageMeter:
+    """逐阶段记录墙钟时间、CPU时间、内存峰值与模拟服务器收到的请求数"""
+
+    def __init__(self, stats_url, trace_memory=False):
+        self.stats_url = stats_url
+        self.trace_memory = trace_memory
+        self.stages = []
+
+    def _server_counts(self):
+        with urllib.request.urlopen(self.stats_url, timeout=10) as response:
+            return json.load(response)
+
+    @contextmanager
+    def stage(self, name):
+        before = self._server_counts()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        yield
+        wall = time.perf_counter() - wall_started
+        cpu = time.process_time() - cpu_started
+        after = self._server_counts()
+        requests = {key: after[key] - before.get(key, 0) for key in after if after[key] != before.get(key, 0)}
+        self.stages.append({
+            'stage': name,
+            'wall': round(wall, 4),
+            'cpu': round(cpu, 4),
+            'peak_rss_mb': peak_rss_mb(),
+            'peak_heap_mb': tracemalloc.get_traced_memory()[1] / (1024 * 1024) if self.trace_memory else None,
+            'requests': requests
+        })
+
+def run_worker(args):
+    """子进程：配置环境变量后再导入采集器，保证缓存目录和接口地址指向临时目录与模拟服务器"""
+    cache_dir = tempfile.mkdtemp(prefix='news-bench-')
+    base_urls = [f'http://{address}:{args.port}' for address in host_addresses(args.hosts)]
+    os.environ.update({
+        'NEWS_CACHE_DIR': cache_dir,
+        'AI_PROVIDER': 'deepseek',
+        'DEEPSEEK_API_KEY': 'bench',
+        'DEEPSEEK_API_BASE': f'{base_urls[0]}/v1',
+        # 不使用环境中的真实 OpenAI 密钥：备用提供商和向量分类都不应请求外部接口
+        'OPENAI_API_KEY': '',
+        'EMBED_API_KEY': 'bench',
+        'EMBED_API_BASE': f'{base_urls[0]}/v1',
+        'HTTP_PROXY': ''
+    })
+    logging.basicConfig(
+        level=args.log_level,
+        filename=os.path.join(cache_dir, 'bench.log'),
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    from news_collector import NewsCollector
+    from feishu_sender import FeishuSender
+    from http_client import close_client
+    from llm_router import close_routers
+
+    sources = build_sources(base_urls, args.worker)
+    meter = StageMeter(f'{base_urls[0]}/__stats', args.tracemalloc)
+    sender = FeishuSender(webhook_url=f'{base_urls[0]}/hook')
+    rounds = ['cold', 'warm'] if args.warm else ['cold']
+    try:
+        for round_name in rounds:
+            collector = NewsCollector(sources=sources)
+            if args.streaming:
+                with meter.stage(f'{round_name}:pipeline'):
+                    processed = collector.run_pipeline()
+            else:
+                with meter.stage(f'{round_name}:collect'):
+                    articles = collector.collect_all_news()
+                with meter.stage(f'{round_name}:filter'):
+                    selected = collector.filter_and_categorize(articles)
+                with meter.stage(f'{round_name}:summarize'):
+                    processed = collector.summarize_articles(selected)
+            with meter.stage(f'{round_name}:report'):
+                report = collector.generate_daily_report(processed)
+            with meter.stage(f'{round_name}:send'):
+                if args.text:
+                    sender.send_report(report)
+                else:
+                    sender.send_card(processed, time.strftime('%Y年%m月%d日'))
+    finally:
+        close_routers()
+        close_client()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    print(RESULT_PREFIX + json.dumps({'sources': args.worker, 'stages': meter.stages}, ensure_ascii=False))
+
+def run_size(args, server, count):
+    urllib.request.urlopen(urllib.request.Request(f'{server.url()}/__reset', data=b'', method='POST'), timeout=10).close()
+    command = [
+        sys.executable, __file__, '--worker', str(count),
+        '--port', str(server.port), '--hosts', str(args.hosts), '--log-level', args.log_level
+    ]
+    for flag in ('streaming', 'warm', 'tracemalloc', 'text'):
+        if getattr(args, flag):
+            command.append(f'--{flag}')
+    completed = subprocess.run(command, capture_output=True, text=True)
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    raise RuntimeError(f"{count} 个来源的基准测试失败:\n{completed.stderr[-2000:]}")
+
+def print_table(results):
+    header = f"{'来源数':>6}  {'阶段':<16}{'墙钟(s)':>9}{'CPU(s)':>9}{'峰值RSS(MB)':>13}{'堆峰值(MB)':>12}  请求数"
+    print(header)
+    print('-' * (len(header) + 20))
+    for result in results:
+        for stage in result['stages']:
+            requests = ' '.join(f'{key}={value}' for key, value in sorted(stage['requests'].items())) or '-'
+            rss = f"{stage['peak_rss_mb']:.1f}" if stage['peak_rss_mb'] is not None else '-'
+            heap = f"{stage['peak_heap_mb']:.1f}" if stage['peak_heap_mb'] is not None else '-'
+            print(f"{result['sources']:>6}  {stage['stage']:<16}{stage['wall']:>9.3f}{stage['cpu']:>9.3f}{rss:>13}{heap:>12}  {requests}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000], help='要测试的来源数量')
+    parser.add_argument('--latency', type=float, default=0.05, help='新闻源响应延迟（秒）')
+    parser.add_argument('--jitter', type=float, default=0.02, help='延迟随机抖动（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='新闻源返回500的概率')
+    parser.add_argument('--llm-latency', type=float, default=0.2, help='对话接口响应延迟（秒）')
+    parser.add_argument('--llm-error-rate', type=float, default=0.0, help='对话接口返回429的概率')
+    parser.add_argument('--hosts', type=int, default=16, help='模拟的主机数（Linux 上使用多个回环地址）')
+    parser.add_argument('--streaming', action='store_true', help='测量流式 run_pipeline，而不是逐阶段调用')
+    parser.add_argument('--warm', action='store_true', help='再跑一轮，测量条件请求与AI结果缓存命中后的性能')
+    parser.add_argument('--tracemalloc', action='store_true', help='用 tracemalloc 记录每个阶段的Python堆峰值（会拖慢运行）')
+    parser.add_argument('--text', action='store_true', help='以纯文本而不是交互卡片发送日报')
+    parser.add_argument('--log-level', default='INFO', help='采集器日志级别（日志写入临时文件）')
+    parser.add_argument('--json', help='把结果写入JSON文件，便于比较不同版本')
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        run_worker(args)
+        return
+
+    config = MockConfig(args.latency, args.jitter, args.error_rate, args.llm_latency, args.llm_error_rate, args.hosts)
+    results = []
+    with MockServer(config) as server:
+        print(f"模拟服务器: {server.url()}（{len(host_addresses(args.hosts))} 个主机），新闻源延迟 {args.latency}s，AI延迟 {args.llm_latency}s")
+        for count in args.sizes:
+            print(f"运行 {count} 个来源...", flush=True)
+            results.append(run_size(args, server, count))
+    print()
+    print_table(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'config': vars(config), 'results': results}, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入 {args.json}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""启动开销基准：在全新的子进程中测量入口模块的导入时间与采集器初始化时间。
+
+每项重复若干次取中位数，并列出 -X importtime 统计中累计耗时最多的模块，
+用于跟踪延迟导入（openai、feedparser 等只在用到时才导入）是否退化。
+
+用法:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 10 --top 15 --json startup.json
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+RESULT_PREFIX = 'BENCH_RESULT '
+
+# 在子进程中执行的测量脚本：导入入口模块并构造采集器，输出各步耗时和已导入的重型依赖
+PROBE = f"""
+import sys, time, json
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+from news_collector import NewsCollector
+NewsCollector(sources=[])
+initialized = time.perf_counter()
+print({RESULT_PREFIX!r} + json.dumps({{
+    'import_main': imported - started,
+    'init_collector': initialized - imported,
+    'heavy_modules': sorted(m for m in ('openai', 'feedparser', 'bs4', 'requests', 'numpy') if m in sys.modules)
+}}))
+"""
+
+def run_probe(env):
+    completed = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, env=env, capture_output=True, text=True)
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    raise RuntimeError(f"启动测量失败:\n{completed.stderr[-2000:]}")
+
+def import_profile(env, top):
+    """-X importtime 中累计耗时最多的模块（微秒）"""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import main'],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    modules = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        # 格式: "import time:  自身耗时 | 累计耗时 | 缩进的模块名"
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        modules[name] = max(modules.get(name, 0), int(cumulative_us))
+    return sorted(modules.items(), key=lambda item: item[1], reverse=True)[:top]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='每项测量的重复次数（取中位数）')
+    parser.add_argument('--top', type=int, default=10, help='列出累计导入耗时最多的模块数')
+    parser.add_argument('--json', help='把结果写入JSON文件，便于比较不同版本')
+    args = parser.parse_args()
+
+    cache_dir = tempfile.mkdtemp(prefix='news-startup-')
+    env = dict(os.environ, NEWS_CACHE_DIR=cache_dir, AI_PROVIDER='deepseek', DEEPSEEK_API_KEY='bench', LOG_LEVEL='WARNING')
+    try:
+        run_probe(env)  # 预热：生成 __pycache__，避免首轮计入编译时间
+        probes = [run_probe(env) for _ in range(args.repeat)]
+        profile = import_profile(env, args.top)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    result = {
+        'import_main_ms': round(statistics.median(p['import_main'] for p in probes) * 1000, 1),
+        'init_collector_ms': round(statistics.median(p['init_collector'] for p in probes) * 1000, 1),
+        'heavy_modules': probes[-1]['heavy_modules'],
+        'top_imports_ms': {name: round(us / 1000, 1) for name, us in profile}
+    }
+    print(f"导入 main:          {result['import_main_ms']:8.1f} ms（{args.repeat} 次中位数）")
+    print(f"初始化 NewsCollector: {result['init_collector_ms']:6.1f} ms")
+    print(f"启动时已导入的重型依赖: {', '.join(result['heavy_modules']) or '无'}")
+    print(f"\n累计导入耗时最多的 {args.top} 个模块:")
+    for name, ms in result['top_imports_ms'].items():
+        print(f"  {ms:8.1f} ms  {name}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入 {args.json}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+"""本地模拟服务器：代替真实新闻源、OpenAI 兼容的对话接口和飞书 Webhook，用于离线基准测试。
+
+新闻源路径（<id> 会替换进载荷中的 {source}，保证不同源的链接互不相同）:
+    /rss/<id>      fixtures/feed.xml   支持 ETag / If-None-Match
+    /hn/<id>       fixtures/hn.json
+    /reddit/<id>   fixtures/reddit.json
+    /weibo/<id>    fixtures/weibo.json
+其他接口:
+    POST /v1/chat/completions   按提示词返回合并JSON、JSON数组或纯文本回复，stream=true 时以 SSE 分片返回
+    POST /v1/embeddings         按词哈希生成的确定性向量
+    POST /hook                  飞书 Webhook，返回 {"code": 0}
+    GET  /__stats               各类请求计数
+    POST /__reset               清零计数
+
+单独运行:
+    python benchmarks/mock_server.py --port 8765 --latency 0.05 --error-rate 0.02
+"""
+import re
+import sys
+import json
+import time
+import zlib
+import random
+import argparse
+import threading
+import multiprocessing
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+SOURCE_KINDS = {'rss': 'feed.xml', 'hn': 'hn.json', 'reddit': 'reddit.json', 'weibo': 'weibo.json'}
+CONTENT_TYPES = {'rss': 'application/rss+xml; charset=utf-8'}
+
+class MockConfig:
+    """模拟服务器的延迟与错误注入参数"""
+
+    def __init__(self, latency=0.05, jitter=0.02, error_rate=0.0, llm_latency=0.2,
+                 llm_error_rate=0.0, hosts=1, seed=42):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.llm_latency = llm_latency
+        self.llm_error_rate = llm_error_rate
+        self.hosts = hosts
+        self.seed = seed
+
+class _State:
+    def __init__(self, config):
+        self.config = config
+        self.fixtures = {kind: (FIXTURES_DIR / name).read_text(encoding='utf-8') for kind, name in SOURCE_KINDS.items()}
+        self.counts = Counter()
+        self.random = random.Random(config.seed)
+        self.lock = threading.Lock()
+
+    def count(self, key):
+        with self.lock:
+            self.counts[key] += 1
+
+    def roll(self, rate):
+        with self.lock:
+            return self.random.random() < rate
+
+    def delay(self, base):
+        with self.lock:
+            jitter = self.random.uniform(-self.config.jitter, self.config.jitter)
+        time.sleep(max(0.0, base + jitter))
+
+def _chat_reply(prompt):
+    """按采集器的提示词格式构造回复"""
+    if 'JSON数组' in prompt:
+        count = len(re.findall(r'^\[(\d+)\] ', prompt, re.M))
+        items = [{'index': i, 'title': f'模拟标题{i}', 'summary': f'模拟的一句话总结{i}'} for i in range(count)]
+        return '```json\n' + json.dumps(items, ensure_ascii=False) + '\n```'
+    if 'JSON' in prompt:
+        return json.dumps({'title': '模拟的中文标题', 'summary': '模拟的一句话总结'}, ensure_ascii=False)
+    return '模拟的中文回复'
+
+def _embedding(text, dims=64):
+    """词袋哈希向量：共享词语越多的文本相似度越高，同一文本总是得到同一向量"""
+    vector = [0.0] * dims
+    for word in re.findall(r'[a-z0-9]+|[\u4e00-\u9fff]', text.lower()):
+        vector[zlib.crc32(word.encode('utf-8')) % dims] += 1.0
+    return vector
+
+def _make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body=b'', content_type='application/json', headers=None):
+            if isinstance(body, str):
+                body = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_stream(self, model, content, pieces=4):
+            """以 SSE 分片返回回复，格式与 OpenAI 的流式 chat.completion.chunk 一致"""
+            size = max(1, -(-len(content) // pieces))
+            deltas = [{'role': 'assistant', 'content': ''}] + [
+                {'content': content[i:i + size]} for i in range(0, len(content), size)
+            ]
+            events = [
+                {'id': 'chatcmpl-mock', 'object': 'chat.completion.chunk', 'created': int(time.time()), 'model': model,
+                 'choices': [{'index': 0, 'delta': delta, 'finish_reason': None}]}
+                for delta in deltas
+            ]
+            events[-1]['choices'][0]['finish_reason'] = 'stop'
+            body = ''.join(f"data: {json.dumps(event, ensure_ascii=False)}\n\n" for event in events) + 'data: [DONE]\n\n'
+            self._send(200, body, 'text/event-stream')
+
+        def _read_json(self):
+            length = int(self.headers.get('Content-Length', 0))
+            return json.loads(self.rfile.read(length) or b'{}')
+
+        def do_GET(self):
+            path = self.path.split('?', 1)[0]
+            if path == '/__stats':
+                with state.lock:
+                    return self._send(200, json.dumps(dict(state.counts)))
+
+            parts = path.strip('/').split('/')
+            kind = parts[0]
+            if kind not in SOURCE_KINDS or len(parts) != 2:
+                state.count('not_found')
+                return self._send(404, '{}')
+
+            source_id = parts[1]
+            state.count(kind)
+            state.delay(state.config.latency)
+            if state.roll(state.config.error_rate):
+                state.count('errors')
+                return self._send(500, '{"error": "injected"}')
+
+            etag = f'"{kind}-{source_id}-v1"'
+            if self.headers.get('If-None-Match') == etag:
+                state.count('not_modified')
+                return self._send(304, headers={'ETag': etag})
+            body = state.fixtures[kind].replace('{source}', source_id)
+            self._send(200, body, CONTENT_TYPES.get(kind, 'application/json'), {'ETag': etag})
+
+        def do_POST(self):
+            path = self.path.split('?', 1)[0]
+            if path == '/__reset':
+                with state.lock:
+                    state.counts.clear()
+                return self._send(200, '{}')
+
+            body = self._read_json()
+            if path.endswith('/chat/completions'):
+                state.count('chat')
+                state.delay(state.config.llm_latency)
+                if state.roll(state.config.llm_error_rate):
+                    state.count('chat_429')
+                    return self._send(429, json.dumps({'error': {'message': 'rate limited', 'type': 'rate_limit'}}),
+                                      headers={'Retry-After': '0.1'})
+                prompt = body['messages'][-1]['content']
+                if body.get('stream'):
+                    return self._send_stream(body.get('model', 'mock'), _chat_reply(prompt))
+                reply = {
+                    'id': 'chatcmpl-mock', 'object': 'chat.completion', 'created': int(time.time()),
+                    'model': body.get('model', 'mock'),
+                    'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': _chat_reply(prompt)}, 'finish_reason': 'stop'}],
+                    'usage': {'prompt_tokens': len(prompt) // 4, 'completion_tokens': 30, 'total_tokens': len(prompt) // 4 + 30}
+                }
+                return self._send(200, json.dumps(reply, ensure_ascii=False))
+            if path.endswith('/embeddings'):
+                state.count('embed')
+                state.delay(state.config.llm_latency)
+                data = [
+                    {'object': 'embedding', 'index': i, 'embedding': _embedding(text)}
+                    for i, text in enumerate(body['input'])
+                ]
+                return self._send(200, json.dumps({
+                    'object': 'list', 'data': data, 'model': body.get('model', 'mock'),
+                    'usage': {'prompt_tokens': len(data), 'total_tokens': len(data)}
+                }))
+            if path == '/hook':
+                state.count('feishu')
+                return self._send(200, json.dumps({'code': 0, 'msg': 'success'}))
+            state.count('not_found')
+            self._send(404, '{}')
+
+    return Handler
+
+def host_addresses(count):
+    """可用于分散“不同主机”的回环地址；Linux 上整个 127.0.0.0/8 都指向本机"""
+    if count <= 1 or not sys.platform.startswith('linux'):
+        return ['127.0.0.1']
+    return [f'127.0.0.{i}' for i in range(1, count + 1)]
+
+def serve(config, port=0, ready=None):
+    """在每个回环地址上各启动一个服务器（共享计数），阻塞运行"""
+    state = _State(config)
+    handler = _make_handler(state)
+    servers = []
+    for address in host_addresses(config.hosts):
+        server = ThreadingHTTPServer((address, port), handler)
+        server.daemon_threads = True
+        port = server.server_address[1]
+        servers.append(server)
+    for server in servers[1:]:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    if ready is not None:
+        ready.put(port)
+    servers[0].serve_forever()
+
+class MockServer:
+    """在独立进程中运行模拟服务器，避免与被测代码争用 GIL 和 CPU 时间统计"""
+
+    def __init__(self, config=None, port=0):
+        self.config = config or MockConfig()
+        self.port = port
+        self._process = None
+
+    def start(self):
+        ready = multiprocessing.Queue()
+        self._process = multiprocessing.Process(target=serve, args=(self.config, self.port, ready), daemon=True)
+        self._process.start()
+        self.port = ready.get(timeout=10)
+        return self
+
+    def stop(self):
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def url(self, index=0):
+        """第 index 个模拟主机的根地址"""
+        addresses = host_addresses(self.config.hosts)
+        return f'http://{addresses[index % len(addresses)]}:{self.port}'
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.05, help='新闻源响应延迟（秒）')
+    parser.add_argument('--jitter', type=float, default=0.02, help='延迟随机抖动（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='新闻源返回500的概率')
+    parser.add_argument('--llm-latency', type=float, default=0.2, help='对话接口响应延迟（秒）')
+    parser.add_argument('--llm-error-rate', type=float, default=0.0, help='对话接口返回429的概率')
+    parser.add_argument('--hosts', type=int, default=1, help='监听的回环地址数（模拟多个主机）')
+    args = parser.parse_args()
+
+    config = MockConfig(args.latency, args.jitter, args.error_rate, args.llm_latency, args.llm_error_rate, args.hosts)
+    print(f"模拟服务器监听 {', '.join(host_addresses(args.hosts))} 端口 {args.port}")
+    serve(config, args.port)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+import re
+import sys
+import logging
+from pathlib import Path
+
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+from config import CATEGORY_KEYWORDS, DEFAULT_CATEGORY, TITLE_KEYWORD_WEIGHT
+
+logger = logging.getLogger(__name__)
+
+# 英文关键词允许的常见词形变化，如 launch -> launches / launched；
+# 只用于至少 INFLECTION_MIN_LENGTH 个字母的单词关键词，短词和词组（ipo、series a）不做变化
+INFLECTION_SUFFIXES = ['ments', 'ment', 'ing', 'es', 'ed', 's', 'd']
+INFLECTION_MIN_LENGTH = 5
+WORD_CHAR = 'a-z0-9'
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+def _is_word_char(ch):
+    return ch.isascii() and ch.isalnum()
+
+def _inflectable(keyword):
+    return len(keyword) >= INFLECTION_MIN_LENGTH and keyword.isascii() and keyword.isalpha()
+
+def _parse_entry(entry):
+    """配置项 -> (关键词, 权重, 变体列表)；没有列出变体时变体列表为 None"""
+    if isinstance(entry, str):
+        return entry, 1.0, None
+    keyword, weight, variants = entry[0], 1.0, None
+    for item in entry[1:]:
+        if isinstance(item, (list, tuple)):
+            variants = item
+        else:
+            weight = item
+    return keyword, float(weight), variants
+
+def _trie_pattern(keywords, inflected=()):
+    """把关键词列表编译成前缀共享的正则，匹配代价与关键词数量基本无关；inflected 中的关键词允许词形变化"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[''] = node.get('', False) or keyword in inflected
+
+    tail = '(?:' + '|'.join(INFLECTION_SUFFIXES) + f')?(?![{WORD_CHAR}])'
+    boundary = f'(?![{WORD_CHAR}])'
+
+    def render(node, last_char):
+        alternatives = [
+            re.escape(ch) + render(child, ch)
+            for ch, child in sorted(node.items()) if ch
+        ]
+        if '' in node:
+            # 以英文字母/数字结尾的关键词要求右侧是词边界，可变化的关键词允许常见词形变化
+            if not _is_word_char(last_char):
+                alternatives.append('')
+            else:
+                alternatives.append(tail if node[''] else boundary)
+        if len(alternatives) == 1:
+            return alternatives[0]
+        return '(?:' + '|'.join(alternatives) + ')'
+
+    return render(trie, '')
+
+class KeywordClassifier:
+    """由 CATEGORY_KEYWORDS 一次性编译的多关键词匹配器，按类别加权计分而不是首个命中即返回"""
+
+    def __init__(self, category_keywords=None, default_category=DEFAULT_CATEGORY, title_weight=TITLE_KEYWORD_WEIGHT):
+        category_keywords = CATEGORY_KEYWORDS if category_keywords is None else category_keywords
+        self.default_category = default_category
+        self.title_weight = title_weight
+        self.categories = [cat for cat in category_keywords if cat != default_category]
+
+        # 关键词 -> {类别: 权重}；配置项可以是 'keyword'、('keyword', 权重)、('keyword', [变体...])
+        # 或 ('keyword', 权重, [变体...])。列出变体的关键词只匹配自身和这些变体，不再自动做词形变化
+        self._weights = {}
+        self._aliases = {}  # 匹配文本 -> 关键词
+        explicit = set()
+        for category in self.categories:
+            for entry in category_keywords[category]:
+                keyword, weight, variants = _parse_entry(entry)
+                keyword = keyword.strip().lower()
+                if not keyword:
+                    continue
+                weights = self._weights.setdefault(keyword, {})
+                weights[category] = max(weights.get(category, 0.0), weight)
+                self._aliases[keyword] = keyword
+                if variants is not None:
+                    explicit.add(keyword)
+                    for variant in variants:
+                        variant = variant.strip().lower()
+                        if variant:
+                            self._aliases.setdefault(variant, keyword)
+        self._inflected = {k for k in self._weights if k not in explicit and _inflectable(k)}
+
+        # 以英文字母/数字开头的关键词要求左侧是词边界（round 不再命中 background），中文等直接子串匹配
+        bounded = [k for k in self._aliases if _is_word_char(k[0])]
+        unbounded = [k for k in self._aliases if not _is_word_char(k[0])]
+        parts = []
+        if bounded:
+            parts.append(f'(?<![{WORD_CHAR}])' + _trie_pattern(bounded, self._inflected))
+        if unbounded:
+            parts.append(_trie_pattern(unbounded, self._inflected))
+        self._pattern = re.compile('|'.join(parts)) if parts else None
+        logger.debug(f"关键词分类器已编译: {len(self._weights)} 个关键词，{len(self.categories)} 个类别")
+
+    def _keyword_for(self, matched):
+        """把变体或带词形变化的命中文本还原为配置中的关键词"""
+        if matched in self._aliases:
+            return self._aliases[matched]
+        for suffix in INFLECTION_SUFFIXES:
+            if matched.endswith(suffix) and matched[:-len(suffix)] in self._inflected:
+                return matched[:-len(suffix)]
+        return None
+
+    def scores(self, title, summary=''):
+        """返回各类别得分，标题中的命中按 title_weight 加权"""
+        scores = {}
+        if self._pattern is None:
+            return scores
+        fields = (
+            (title.lower(), self.title_weight),
+            (HTML_TAG_RE.sub(' ', summary or '').lower(), 1.0)
+        )
+        for text, field_weight in fields:
+            for match in self._pattern.finditer(text):
+                keyword = self._keyword_for(match.group(0))
+                if keyword is None:
+                    continue
+                for category, weight in self._weights[keyword].items():
+                    scores[category] = scores.get(category, 0.0) + weight * field_weight
+        return scores
+
+    def classify(self, title, summary=''):
+        """得分最高的类别；同分时按配置顺序取靠前者，没有命中返回默认类别"""
+        scores = self.scores(title, summary)
+        best_category, best_score = self.default_category, 0.0
+        for category in self.categories:
+            score = scores.get(category, 0.0)
+            if score > best_score:
+                best_category, best_score = category, score
+        return best_category
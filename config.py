@@ -1,12 +1,11 @@
 import os
-import sys
-import json
 import logging
-from datetime import datetime
 from pathlib import Path
 
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()  # 设为 DEBUG 时输出逐篇文章的处理细节
+
 logging.basicConfig(
-    level=logging.INFO,
+    level=LOG_LEVEL,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
@@ -20,19 +19,184 @@ NEWS_CATEGORIES = {
 }
 
 CATEGORY_KEYWORDS = {
-    '🚀 产品发布': ['product', 'launch', 'release', 'announce', 'introduce', 'new feature', 'unveil', 'debut', 'launch', 'release'],
-    '💰 投融资': ['funding', 'invest', 'raise', 'round', 'acquire', 'acquisition', 'ipo', 'valuation', 'series a', 'series b', 'series c', 'strategic investment'],
-    '🔬 技术突破': ['research', 'paper', 'breakthrough', 'model', 'performance', 'state-of-the-art', 'sota', 'improve', 'accuracy', 'benchmark', 'arxiv', 'language model', 'llm', 'training', 'inference'],
-    '🎯 行业观点': ['opinion', 'predict', 'forecast', 'trend', 'concern', 'warning', 'criticize', 'praise', 'ceo', 'founder', 'expert', 'analyst', 'perspective', 'view'],
+    '🚀 产品发布': ['product', 'launch', 'release', 'announce', 'introduce', ('new feature', ['new features']), 'unveil', 'debut', 'launch', 'release'],
+    '💰 投融资': ['funding', 'invest', 'raise', ('round', ['rounds']), 'acquire', 'acquisition', ('ipo', ['ipos']), 'valuation', 'series a', 'series b', 'series c', 'strategic investment'],
+    '🔬 技术突破': ['research', 'paper', 'breakthrough', 'model', 'performance', 'state-of-the-art', 'sota', 'improve', 'accuracy', 'benchmark', 'arxiv', ('language model', ['language models']), ('llm', ['llms']), 'training', 'inference'],
+    '🎯 行业观点': ['opinion', 'predict', 'forecast', 'trend', 'concern', 'warning', 'criticize', 'praise', ('ceo', ['ceos']), 'founder', 'expert', 'analyst', 'perspective', 'view'],
     '📊 其他要闻': []
 }
 
+# 关键词分类：每个关键词可写成 'keyword' 或 ('keyword', 权重)，按类别累加得分，取最高分类别。
+# 5 个字母以上的英文单词自动匹配常见词形变化（launches / launched）；短词、词组或需要限制变化的词
+# 写成 ('keyword', ['变体', ...]) 或 ('keyword', 权重, ['变体', ...])，只匹配自身和列出的变体
+DEFAULT_CATEGORY = '📊 其他要闻'  # 没有任何关键词命中时的类别
+TITLE_KEYWORD_WEIGHT = 2.0  # 标题中命中的关键词权重倍数
+
 FEISHU_WEBHOOK_URL = os.environ.get('FEISHU_WEBHOOK_URL', '')
+# 推送到多个群时在 FEISHU_WEBHOOK_URLS 中用逗号或换行分隔，与 FEISHU_WEBHOOK_URL 合并去重
+FEISHU_WEBHOOK_URLS = list(dict.fromkeys(
+    url.strip()
+    for url in [FEISHU_WEBHOOK_URL] + os.environ.get('FEISHU_WEBHOOK_URLS', '').replace('\n', ',').split(',')
+    if url.strip()
+))
+# 自定义机器人的请求体上限为 20KB，留出余量；单个机器人限流约 5次/秒、100次/分钟
+FEISHU_MAX_MESSAGE_BYTES = 18 * 1024
+FEISHU_QPS = 2.0
+FEISHU_MAX_RETRIES = 3
+FEISHU_BACKOFF_BASE = 1.0
+# 日报消息格式：card 为交互卡片（每张卡片元素数不超过上限），text 为纯文本
+FEISHU_MESSAGE_FORMAT = os.environ.get('FEISHU_MESSAGE_FORMAT', 'card')
+FEISHU_CARD_MAX_ELEMENTS = 50
 
 # AI服务配置
 AI_PROVIDER = os.environ.get('AI_PROVIDER', 'deepseek')  # 默认使用deepseek
 DEEPSEEK_API_KEY = os.environ.get('DEEPSEEK_API_KEY', '')
-DEEPSEEK_API_BASE = 'https://api.deepseek.com/v1'
+DEEPSEEK_API_BASE = os.environ.get('DEEPSEEK_API_BASE', 'https://api.deepseek.com/v1')
+OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY', '')
+OPENAI_API_BASE = os.environ.get('OPENAI_API_BASE', '') or None  # 留空使用官方地址
+DEEPSEEK_MODEL = os.environ.get('DEEPSEEK_MODEL', 'deepseek-chat')
+OPENAI_MODEL = os.environ.get('OPENAI_MODEL', 'gpt-3.5-turbo')
+
+# 多提供商路由：AI_PROVIDER 为主，其余配置了密钥的提供商作为备用。
+# 主提供商超过其 p95 延迟仍未返回时向备用提供商发出对冲请求，取先成功的结果；主提供商出错时立即切换
+LLM_HEDGE_ENABLED = os.environ.get('LLM_HEDGE_ENABLED', '1') != '0'
+LLM_HEDGE_PERCENTILE = 0.95
+LLM_HEDGE_MIN_SAMPLES = 5  # 延迟样本少于该数量时使用 LLM_HEDGE_DELAY
+LLM_HEDGE_DELAY = 10.0  # 默认对冲等待（秒）
+LLM_HEDGE_MIN_DELAY = 1.0  # 对冲等待下限（秒），避免延迟很低时几乎每个请求都对冲
+LLM_PROVIDER_LATENCY_SAMPLES = 50  # 每个提供商保留的延迟样本数
+LLM_PROVIDER_FAILURE_THRESHOLD = 3  # 连续失败达到该次数后暂时降为最低优先级
+LLM_PROVIDER_COOLDOWN = 300  # 降级时长（秒）
+
+# 新闻源健康记录：自适应超时与熔断
+SOURCE_LATENCY_SAMPLES = 20  # 每个源保留的延迟样本数
+SOURCE_TIMEOUT_FACTOR = 3.0  # 自适应超时 = 历史 p95 延迟 × 该系数
+SOURCE_TIMEOUT_MIN = 5.0  # 自适应超时下限（秒），上限为 FETCH_TIMEOUT
+SOURCE_BREAKER_THRESHOLD = 3  # 连续失败达到该次数后熔断
+SOURCE_BREAKER_COOLDOWN = 6 * 3600  # 首次熔断冷却时间（秒），之后每次失败翻倍
+SOURCE_BREAKER_MAX_COOLDOWN = 7 * 86400
+SOURCE_PROBE_TIMEOUT = 10.0  # 冷却期结束后试探请求的超时（秒）
+
+# AI总结并发与重试配置
+LLM_CONCURRENCY = int(os.environ.get('LLM_CONCURRENCY', '4'))  # 同时进行的AI请求数
+LLM_MAX_RETRIES = 3  # 限流(429)、超时、5xx 时的最大重试次数
+LLM_BACKOFF_BASE = 1.0  # 无 Retry-After 时的指数退避基数（秒）
+LLM_BACKOFF_MAX = 60.0  # 单次退避等待上限（秒）
+
+# 总结模式：separate 翻译与总结分两次请求；combined 一次请求返回标题和摘要；batch 多篇文章合并为一个请求
+LLM_SUMMARY_MODE = os.environ.get('LLM_SUMMARY_MODE', 'combined').lower()
+LLM_BATCH_SIZE = int(os.environ.get('LLM_BATCH_SIZE', '5'))  # batch 模式下每个请求包含的文章数
+
+# AI预算：每次运行的 token 总量与时间上限（秒），0 表示不限。时间从开始总结入选文章时计算，抓取期间的提前总结只占用 token 预算。
+# 文章按热度和AI相关度从高到低依次总结，预算用完后剩余文章使用（已翻译的）标题代替总结
+LLM_TOKEN_BUDGET = int(os.environ.get('LLM_TOKEN_BUDGET', '60000'))
+LLM_TIME_BUDGET = float(os.environ.get('LLM_TIME_BUDGET', '300'))
+LLM_INPUT_MAX_TOKENS = 300  # 每篇文章摘要送入模型的 token 上限，超出部分截断
+LLM_SUMMARY_MAX_TOKENS = 80  # 一句话总结的输出 token 上限；标题翻译的上限按原标题长度估算
+LLM_TOKENIZER = 'cl100k_base'  # 安装 tiktoken 时用于计数的编码，未安装时按字符数估算
+LLM_STREAMING = os.environ.get('LLM_STREAMING', '1') != '0'  # 流式接收回复，超过时间预算时可中途停止
+LLM_SPECULATIVE_BUDGET_SHARE = 0.5  # 抓取期间提前总结最多使用的 token 预算比例，其余留给最终按优先级排定的文章
+# 抓取期间只提前总结排进已满类别前 N 名的文章（0 表示不提前总结）。已发出的请求无法撤回，
+# 之后仍被挤出（或超出 TOTAL_NEWS_COUNT）的文章照样计费；N 越大重叠越多、多余请求也越多
+LLM_SPECULATIVE_DEPTH = int(os.environ.get('LLM_SPECULATIVE_DEPTH', '1'))
+
+# 共享HTTP传输层：抓取、AI接口和飞书发送共用连接池、代理、重试和超时策略
+HTTP_PROXY = os.environ.get('HTTP_PROXY', '')  # 所有出站请求使用的代理
+HTTP2_ENABLED = os.environ.get('HTTP2_ENABLED', '1') != '0'  # 需要安装 h2，未安装时自动退回 HTTP/1.1
+# 进程内DNS缓存秒数，默认 0 关闭；开启后替换 socket.getaddrinfo，对进程内所有库的域名解析生效
+HTTP_DNS_CACHE_TTL = int(os.environ.get('HTTP_DNS_CACHE_TTL', '0'))
+HTTP_CONNECT_RETRIES = 2  # 建立连接失败时的重试次数
+HTTP_MAX_CONNECTIONS = 20
+HTTP_MAX_KEEPALIVE = 10
+HTTP_KEEPALIVE_EXPIRY = 30.0
+HTTP_TIMEOUT = 30.0
+HTTP_CONNECT_TIMEOUT = 10.0
+LLM_TIMEOUT = 60.0  # 单次AI请求超时（秒）
+
+# 本地持久化缓存目录（GitHub Actions 中通过 actions/cache 跨运行保留）
+CACHE_DIR = Path(os.environ.get('NEWS_CACHE_DIR', Path(__file__).parent / '.cache'))
+HTTP_CACHE_FILE = CACHE_DIR / 'http_cache.json'  # ETag / Last-Modified 条件请求缓存
+HTTP_CACHE_MAX_AGE_DAYS = 30  # 超过该天数未再请求的URL从缓存中清除
+SOURCE_HEALTH_FILE = CACHE_DIR / 'source_health.json'
+RUN_STORE_DIR = CACHE_DIR / 'runs'  # 每日运行的阶段检查点（main.py --resume）
+RUN_RETENTION_DAYS = 7
+
+# 运行指标：每次运行结束写出JSON报告；设置 METRICS_PROMETHEUS_FILE 时额外写出Prometheus文本格式
+METRICS_REPORT_FILE = CACHE_DIR / 'run_report.json'
+METRICS_PROMETHEUS_FILE = os.environ.get('METRICS_PROMETHEUS_FILE', '')
+METRICS_PREFIX = 'ai_daily_news'
+
+# AI结果缓存：键为 提供商+模型+提示词版本+输入 的哈希；修改提示词后请提升 LLM_PROMPT_VERSION
+LLM_PROMPT_VERSION = 'v1'
+LLM_CACHE_FILE = CACHE_DIR / 'llm_cache.sqlite3'
+LLM_CACHE_TTL_DAYS = 7
+LLM_CACHE_MAX_ENTRIES = 20000
+
+# 向量分类（可选）：文章向量与各类别原型向量的余弦相似度决定类别，与AI原型的相似度作为相关度参与排序。
+# 需要 numpy 和支持 embeddings 接口的密钥（DeepSeek 没有该接口，默认使用 OPENAI_API_KEY）；不可用或请求失败时退回关键词分类
+EMBED_ENABLED = os.environ.get('EMBED_ENABLED', '1') != '0'
+EMBED_API_KEY = os.environ.get('EMBED_API_KEY', '') or OPENAI_API_KEY
+EMBED_API_BASE = os.environ.get('EMBED_API_BASE', '') or OPENAI_API_BASE
+EMBED_MODEL = os.environ.get('EMBED_MODEL', 'text-embedding-3-small')
+EMBED_BATCH_SIZE = 256  # 每次 embeddings 请求的文本数
+EMBED_MAX_CHARS = 1000  # 每篇文章参与向量化的 标题+摘要 最大字符数
+EMBED_MIN_SIMILARITY = 0.2  # 与所有类别原型的相似度都低于该值时归入 DEFAULT_CATEGORY
+EMBED_MIN_RELEVANCE = float(os.environ.get('EMBED_MIN_RELEVANCE', '0'))  # AI相关度低于该值的文章不入选，0 表示不过滤
+EMBED_CACHE_FILE = CACHE_DIR / 'embed_cache.sqlite3'  # 按 模型+文本 缓存向量
+EMBED_CACHE_TTL_DAYS = 30
+EMBED_CACHE_MAX_ENTRIES = 50000
+# 类别原型：每类几句中英文描述，向量取平均作为类别中心；DEFAULT_CATEGORY 不需要原型
+CATEGORY_PROTOTYPES = {
+    '🚀 产品发布': [
+        'A company launches a new AI product, app, feature or model release available to users',
+        '公司发布新的AI产品、应用或功能，正式上线并向用户开放',
+        'Open-source release of a new AI tool, SDK or API version'
+    ],
+    '💰 投融资': [
+        'An AI startup raises a funding round led by venture capital investors at a new valuation',
+        'AI公司完成新一轮融资，投资方、估值和融资金额',
+        'Acquisition, merger, IPO or strategic investment involving an AI company'
+    ],
+    '🔬 技术突破': [
+        'Researchers publish a paper with a new machine learning method that beats state-of-the-art benchmarks',
+        '研究团队发布论文，提出新的大模型训练或推理方法，刷新基准测试成绩',
+        'Technical deep dive into model architecture, training, inference efficiency or evaluation'
+    ],
+    '🎯 行业观点': [
+        'An industry leader or expert shares opinions and predictions about the future of AI',
+        '专家、创始人或CEO对人工智能行业趋势的观点、评论与预测',
+        'Debate about AI regulation, safety, ethics, jobs and its impact on society'
+    ]
+}
+# AI相关度原型：与这些描述的相似度即文章的AI相关度
+AI_PROTOTYPES = [
+    'Artificial intelligence, machine learning, deep learning and large language models',
+    '人工智能、大模型、机器学习与生成式AI',
+    'AI products, AI research, AI companies and AI industry news'
+]
+
+# 跨天去重：按规范化URL和标题指纹记录已推送的新闻，保留期内不再重复推送
+SKIP_SEEN_ARTICLES = os.environ.get('SKIP_SEEN_ARTICLES', '1') != '0'
+SEEN_STORE_FILE = CACHE_DIR / 'seen_articles.sqlite3'
+SEEN_RETENTION_DAYS = 30
+
+# 近似去重：MinHash + LSH，把不同来源报道的同一事件合并为一条
+NEAR_DUP_ENABLED = os.environ.get('NEAR_DUP_ENABLED', '1') != '0'
+NEAR_DUP_THRESHOLD = 0.5  # 估计的 Jaccard 相似度不低于该值视为重复
+NEAR_DUP_SHINGLE_SIZE = 2  # 片段长度：英文按单词，中文按字
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16  # 每个分桶 64/16=4 行，对应的相似度拐点约为 0.5
+# 重复簇内热度相同时按来源优先级选代表，越靠前越优先
+SOURCE_PRIORITY = [
+    'openai.com',
+    'blog.google',
+    'anthropic.com',
+    'jiqizhixin.com',
+    'techcrunch.com',
+    'venturebeat.com',
+    'artificialintelligence-news.com',
+    '36kr.com',
+]
 
 DATETIME_FORMAT = '%Y年%m月%d日'
 NEWS_DATE_FORMAT = '%Y-%m-%d'
@@ -40,41 +204,77 @@ NEWS_DATE_FORMAT = '%Y-%m-%d'
 MAX_NEWS_PER_CATEGORY = 4
 TOTAL_NEWS_COUNT = 20
 
-RSS_SOURCES = {
-    '国际': [
-        'https://openai.com/blog/rss.xml',
-        'https://blog.google/rss/news_ai.xml',
-        'https://www.anthropic.com/rss.xml',
-        'https://techcrunch.com/feed/',
-        'https://venturebeat.com/ai/feed/',
-        'https://www.artificialintelligence-news.com/feed/',
-    ],
-    '国内': [
-        'https://www.jiqizhixin.com/rss',
-        'https://www.xianjichina.com/rss',
-        'http://www.raincent.com/rss',
-        'https://www.36kr.com/feed/',
-    ]
-}
+# 超过该长度的原始摘要压缩存储，访问时才解压（节省大量文章时的内存）
+LAZY_SUMMARY_THRESHOLD = 1024
 
-HTTP_SOURCES = {
-    '国际': [
-        {
-            'name': 'Hacker News AI',
-            'url': 'https://news.ycombinator.com/',
-            'category_keywords': ['AI', 'artificial intelligence', 'machine learning', 'GPT', 'LLM', 'OpenAI', 'Google AI', 'Anthropic']
-        },
-        {
-            'name': 'Reddit Machine Learning',
-            'url': 'https://www.reddit.com/r/MachineLearning/new.json?limit=50',
-            'category_keywords': ['AI', 'machine learning', 'deep learning', 'NLP', 'computer vision']
-        },
-    ],
-    '国内': [
-        {
-            'name': '微博AI热搜',
-            'url': 'https://weibo.com/ajax/statuses/mymblog?uid=6170256793&feature=0&is_all=1&is_search=0&key_word=AI&starttime=0&endtime=0&is_all=1&is_search=0',
-            'category_keywords': ['AI', '人工智能', 'ChatGPT', 'GPT', '大模型', 'AIGC']
-        }
-    ]
-}
+# 抓取并发配置
+FETCH_CONCURRENCY = int(os.environ.get('FETCH_CONCURRENCY', '10'))  # 全局最大并发请求数
+FETCH_PER_HOST_LIMIT = int(os.environ.get('FETCH_PER_HOST_LIMIT', '2'))  # 单个主机最大并发请求数
+FETCH_TIMEOUT = 30.0  # 单个请求超时（秒）
+FETCH_DEADLINE = float(os.environ.get('FETCH_DEADLINE', '60'))  # 整轮采集总时限（秒）
+
+# 正文补全（可选）：总结前并发抓取入选文章的原文页面，在进程池中解析HTML提取正文，替换过短或含HTML标签的摘要
+ENRICH_ENABLED = os.environ.get('ENRICH_ENABLED', '0') == '1'
+ENRICH_CONCURRENCY = 8  # 同时抓取的原文页面数（单主机仍受 FETCH_PER_HOST_LIMIT 限制）
+ENRICH_PROCESSES = int(os.environ.get('ENRICH_PROCESSES', '0')) or min(4, os.cpu_count() or 1)  # HTML解析进程数
+ENRICH_TIMEOUT = 15.0  # 单个页面的请求超时（秒）
+ENRICH_DEADLINE = 30.0  # 整个补全阶段的总时限（秒），超时的文章保留原摘要
+ENRICH_MAX_BYTES = 2 * 1024 * 1024  # 单个页面最多读取的字节数
+ENRICH_MAX_CHARS = 2000  # 提取出的正文最多保留的字符数
+ENRICH_MIN_SUMMARY = 200  # 摘要短于该长度时抓取原文；否则只清理摘要中的HTML标签
+EXTRACT_CACHE_FILE = CACHE_DIR / 'extract_cache.sqlite3'  # 按URL和页面内容哈希缓存提取结果
+EXTRACT_CACHE_TTL_DAYS = 7
+EXTRACT_CACHE_MAX_ENTRIES = 5000
+
+# 守护进程模式（main.py --daemon）：各类源按自己的间隔轮询，新文章进入当天的滚动缓冲区，定时生成并推送日报
+DAEMON_REPORT_TIME = os.environ.get('DAEMON_REPORT_TIME', '08:00')  # 每天推送日报的时间（本地时间 HH:MM）
+DAEMON_POLL_INTERVALS = {'rss': 900, 'hn': 300, 'reddit': 300, 'weibo': 600}  # 各类源的轮询间隔（秒）
+DAEMON_POLL_JITTER = 0.2  # 轮询间隔的随机抖动比例，避免所有源同时请求
+DAEMON_STARTUP_SPREAD = 30.0  # 启动时把首轮抓取随机分散到该时间窗口内（秒）
+DAEMON_CHECKPOINT_INTERVAL = 60.0  # 缓冲区与缓存写回磁盘的最小间隔（秒）
+DAEMON_CATCHUP_HOURS = 4  # 错过推送时间后，在该时长内启动会立即补发当天日报
+# 突发新闻：Hacker News / Reddit 上热度达到阈值的新文章立即单独推送
+DAEMON_BREAKING_ENABLED = os.environ.get('DAEMON_BREAKING_ENABLED', '0') == '1'
+DAEMON_BREAKING_MIN_SCORE = int(os.environ.get('DAEMON_BREAKING_MIN_SCORE', '500'))
+
+# 新闻源注册表：每个源声明 type（决定抓取与解析方式：rss / hn / reddit / weibo）和 url，
+# 可选 name（默认取域名）、region、interval（守护进程轮询间隔，秒，默认按类型取 DAEMON_POLL_INTERVALS）、keywords。
+# 设置 NEWS_SOURCES_FILE 时改从该 JSON 文件加载同样结构的列表，便于维护上百个源
+SOURCES = [
+    {'type': 'rss', 'url': 'https://openai.com/blog/rss.xml', 'region': '国际'},
+    {'type': 'rss', 'url': 'https://blog.google/rss/news_ai.xml', 'region': '国际'},
+    {'type': 'rss', 'url': 'https://www.anthropic.com/rss.xml', 'region': '国际'},
+    {'type': 'rss', 'url': 'https://techcrunch.com/feed/', 'region': '国际'},
+    {'type': 'rss', 'url': 'https://venturebeat.com/ai/feed/', 'region': '国际'},
+    {'type': 'rss', 'url': 'https://www.artificialintelligence-news.com/feed/', 'region': '国际'},
+    {'type': 'rss', 'url': 'https://www.jiqizhixin.com/rss', 'region': '国内'},
+    {'type': 'rss', 'url': 'https://www.xianjichina.com/rss', 'region': '国内'},
+    {'type': 'rss', 'url': 'http://www.raincent.com/rss', 'region': '国内'},
+    {'type': 'rss', 'url': 'https://www.36kr.com/feed/', 'region': '国内'},
+    {
+        'type': 'hn',
+        'name': 'Hacker News AI',
+        'url': 'https://news.ycombinator.com/',
+        'region': '国际',
+        'keywords': ['AI', 'artificial intelligence', 'machine learning', 'GPT', 'LLM', 'OpenAI', 'Google AI', 'Anthropic']
+    },
+    {
+        'type': 'reddit',
+        'name': 'Reddit Machine Learning',
+        'url': 'https://www.reddit.com/r/MachineLearning/new.json?limit=50',
+        'region': '国际',
+        'keywords': ['AI', 'machine learning', 'deep learning', 'NLP', 'computer vision']
+    },
+    {
+        'type': 'weibo',
+        'name': '微博AI热搜',
+        'url': 'https://weibo.com/ajax/statuses/mymblog?uid=6170256793&feature=0&is_all=1&is_search=0&key_word=AI&starttime=0&endtime=0&is_all=1&is_search=0',
+        'region': '国内',
+        'keywords': ['AI', '人工智能', 'ChatGPT', 'GPT', '大模型', 'AIGC']
+    }
+]
+NEWS_SOURCES_FILE = os.environ.get('NEWS_SOURCES_FILE', '')
+
+# 分片采集：main.py --shard i/N 只抓取第 i 个分片的源并写出部分结果（适合CI矩阵中的多个任务），
+# main.py --merge 合并当天所有分片并去重后继续筛选、总结和发送；COLLECT_WORKERS > 1 时在本机用多个进程分片抓取
+COLLECT_WORKERS = int(os.environ.get('COLLECT_WORKERS', '1'))
@@ -0,0 +1,249 @@
+import sys
+import time
+import random
+import signal
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+from config import (
+    DATETIME_FORMAT,
+    FEISHU_WEBHOOK_URLS,
+    FEISHU_MESSAGE_FORMAT,
+    DAEMON_REPORT_TIME,
+    DAEMON_POLL_JITTER,
+    DAEMON_STARTUP_SPREAD,
+    DAEMON_CHECKPOINT_INTERVAL,
+    DAEMON_CATCHUP_HOURS,
+    DAEMON_BREAKING_ENABLED,
+    DAEMON_BREAKING_MIN_SCORE
+)
+from news_collector import NewsCollector
+from feishu_sender import FeishuSender
+from metrics import metrics
+from run_store import RunStore, STAGE_COLLECTED, STAGE_SELECTED, STAGE_PROCESSED, STAGE_SENT
+
+logger = logging.getLogger(__name__)
+
+# 参与突发新闻推送的源类型（有热度分数）
+BREAKING_KINDS = ('hn', 'reddit')
+# 已推送的突发新闻链接保留时长（秒），期间同一链接不再推送
+BREAKING_MEMORY = 3 * 86400
+
+def next_report_at(now, report_time=DAEMON_REPORT_TIME):
+    """now 之后最近一次推送日报的时间"""
+    hour, minute = map(int, report_time.split(':'))
+    scheduled = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if scheduled <= now:
+        scheduled += timedelta(days=1)
+    return scheduled
+
+def jittered(interval, jitter=DAEMON_POLL_JITTER):
+    return interval * random.uniform(1 - jitter, 1 + jitter)
+
+class NewsDaemon:
+    """常驻进程：复用AI客户端、连接池和各类缓存，按各源自己的间隔增量抓取。
+
+    新文章进入当天的滚动缓冲区，定期写入 RunStore 的 collected 检查点（重启后恢复）；
+    到推送时间后对缓冲区筛选、总结并推送日报，同时开始下一天的缓冲区。
+    """
+
+    def __init__(self, collector=None, sender=None):
+        self.collector = collector or NewsCollector()
+        self.sender = sender or FeishuSender()
+        self.buffer = {}
+        self.run_store = None
+        self.delivered = None
+        self.report_at = None
+        self._dirty = False
+        self._last_links = {}
+        self._breaking_sent = {}
+        self._background = set()
+
+    def _start_day(self, report_at):
+        """切换到 report_at 当天的缓冲区；该日期已有抓取检查点时从中恢复"""
+        self.report_at = report_at
+        self.run_store = RunStore(report_at.strftime('%Y-%m-%d'))
+        self.delivered = self.run_store.delivery_log()
+        self.buffer = {}
+        self._dirty = False
+        if self.run_store.has(STAGE_COLLECTED):
+            for article in self.run_store.load_articles(STAGE_COLLECTED):
+                self.buffer[article.link] = article
+            logger.info(f"📌 恢复 {self.run_store.run_date} 的缓冲区: {len(self.buffer)} 条新闻")
+        cutoff = time.time() - BREAKING_MEMORY
+        self._breaking_sent = {link: at for link, at in self._breaking_sent.items() if at >= cutoff}
+
+    @staticmethod
+    def _initial_report_time(now):
+        """启动时的推送时间；今天已过推送时间但日报未发送且仍在补发窗口内时，立即补发"""
+        scheduled = next_report_at(now)
+        missed = scheduled - timedelta(days=1)
+        if missed.date() == now.date() and now - missed <= timedelta(hours=DAEMON_CATCHUP_HOURS):
+            run_store = RunStore(missed.strftime('%Y-%m-%d'))
+            if run_store.has(STAGE_COLLECTED) and not run_store.has(STAGE_SENT):
+                logger.info("⏩ 错过了今天的推送时间，立即补发日报")
+                return now
+        return scheduled
+
+    def _add(self, key, kind, articles):
+        """新文章放入缓冲区；与该源上一次抓取结果相比新出现的高热度文章触发突发推送"""
+        fresh = [article for article in articles if article.link not in self.buffer]
+        for article in fresh:
+            self.buffer[article.link] = article
+        if fresh:
+            self._dirty = True
+            metrics.incr('daemon_new_articles', len(fresh), kind=kind)
+            logger.info(f"  + {len(fresh)} 条新文章进入缓冲区（共 {len(self.buffer)} 条）")
+
+        if not articles:
+            return
+        # 源的首轮抓取只建立基线；按源比较而不是按缓冲区，换天清空缓冲区后不会把旧文章当成突发
+        previous = self._last_links.get(key)
+        self._last_links[key] = {article.link for article in articles}
+        if previous is None or not DAEMON_BREAKING_ENABLED or not FEISHU_WEBHOOK_URLS or kind not in BREAKING_KINDS:
+            return
+        for article in articles:
+            if (article.link not in previous and article.score >= DAEMON_BREAKING_MIN_SCORE
+                    and article.link not in self._breaking_sent):
+                self._breaking_sent[article.link] = time.time()
+                self._spawn(self._push_breaking(article))
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _push_breaking(self, article):
+        try:
+            if not self.collector.seen_store.filter_unseen([article]):
+                return
+            article.summary_ai = await asyncio.to_thread(self.collector.summarize_breaking, article)
+            sent = await asyncio.to_thread(
+                self.sender.send_breaking, article, self.delivered, FEISHU_MESSAGE_FORMAT != 'text'
+            )
+            if sent:
+                # 记为已推送，之后的日报不再重复收录
+                await asyncio.to_thread(self.collector.seen_store.mark_seen, [article])
+                metrics.incr('breaking_pushed')
+                logger.info(f"🔥 已推送突发新闻: {article.display_title}")
+        except Exception as e:
+            logger.error(f"  ✗ 推送突发新闻失败: {e}")
+
+    async def _poll_loop(self, source):
+        """按源在注册表中的间隔（带抖动）反复抓取一个源"""
+        await asyncio.sleep(random.uniform(0, DAEMON_STARTUP_SPREAD))
+        while True:
+            try:
+                self._add(source.key, source.type, await self.collector.poll(source))
+            except Exception as e:
+                logger.error(f"  ✗ 轮询 {source.name} 失败: {e}")
+            await asyncio.sleep(jittered(source.interval))
+
+    def _checkpoint(self):
+        """把缓冲区、条件请求缓存和源健康记录写回磁盘"""
+        if self._dirty:
+            self.run_store.save_articles(STAGE_COLLECTED, list(self.buffer.values()))
+            self._dirty = False
+        self.collector.http_cache.save()
+        self.collector.source_health.save()
+
+    async def _checkpoint_loop(self):
+        while True:
+            await asyncio.sleep(DAEMON_CHECKPOINT_INTERVAL)
+            try:
+                self._checkpoint()
+            except Exception as e:
+                logger.error(f"  ✗ 写入检查点失败: {e}")
+
+    async def _report_loop(self):
+        """到推送时间后取出当天缓冲区、切换到下一天，再在线程中生成并推送日报（轮询不中断）"""
+        while True:
+            delay = (self.report_at - datetime.now()).total_seconds()
+            if delay > 0:
+                # 分段等待，系统休眠或调整时钟后也能按时推送
+                await asyncio.sleep(min(delay, 300))
+                continue
+
+            articles = list(self.buffer.values())
+            run_store, date_str = self.run_store, self.report_at.strftime(DATETIME_FORMAT)
+            run_store.save_articles(STAGE_COLLECTED, articles)
+            self._start_day(next_report_at(datetime.now()))
+            try:
+                done = await asyncio.to_thread(self.publish, articles, run_store, date_str)
+            except Exception as e:
+                logger.error(f"  ✗ 生成或推送日报失败: {e}")
+                done = False
+            if not done:
+                # 未送达的新闻并入下一天的缓冲区，下次日报仍可入选
+                for article in articles:
+                    self.buffer.setdefault(article.link, article)
+                self._dirty = True
+            metrics.log_summary()
+            metrics.export()
+            metrics.reset()
+            logger.info(f"⏰ 下次推送: {self.report_at:%Y-%m-%d %H:%M}")
+
+    def publish(self, articles, run_store, date_str):
+        """筛选、总结一天的缓冲区并推送日报；返回 False 表示推送失败，需要并入下一天"""
+        logger.info(f"📰 生成 {date_str} 日报: 缓冲区共 {len(articles)} 条新闻")
+        selected_articles = self.collector.filter_and_categorize(articles)
+        run_store.save_articles(STAGE_SELECTED, selected_articles)
+        processed_articles = self.collector.summarize_articles(selected_articles)
+        run_store.save_articles(STAGE_PROCESSED, processed_articles)
+        if not processed_articles:
+            logger.warning("缓冲区中没有可推送的新闻，跳过本次日报")
+            return True
+
+        with metrics.timer('stage', stage='report'):
+            report = self.collector.generate_daily_report(processed_articles, date_str)
+        run_store.save_report(report)
+        if not FEISHU_WEBHOOK_URLS:
+            logger.warning("未配置飞书Webhook URL，跳过发送")
+            return True
+
+        delivered = run_store.delivery_log()
+        with metrics.timer('stage', stage='send'):
+            if FEISHU_MESSAGE_FORMAT == 'text':
+                success = self.sender.send_report(report, delivered=delivered)
+            else:
+                success = self.sender.send_card(processed_articles, date_str, delivered=delivered)
+        logger.info(f"飞书消息发送结果: {'成功' if success else '失败'}")
+        if success:
+            run_store.mark_sent()
+            self.collector.mark_reported(processed_articles)
+        return success
+
+    async def run(self):
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):  # Windows
+                pass
+
+        self._start_day(self._initial_report_time(datetime.now()))
+        sources = self.collector.sources
+        logger.info(f"🛰️ 守护进程启动: {len(sources)} 个新闻源，下次推送 {self.report_at:%Y-%m-%d %H:%M}")
+        async with self.collector.fetch_session():
+            tasks = [asyncio.create_task(self._poll_loop(source)) for source in sources]
+            tasks.append(asyncio.create_task(self._checkpoint_loop()))
+            tasks.append(asyncio.create_task(self._report_loop()))
+            try:
+                await stop.wait()
+            finally:
+                logger.info("正在停止守护进程...")
+                pending = tasks + list(self._background)
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                self._checkpoint()
+
+def run_daemon():
+    """启动守护进程，收到 SIGINT / SIGTERM 后保存缓冲区并退出"""
+    asyncio.run(NewsDaemon().run())
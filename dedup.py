@@ -0,0 +1,149 @@
+import re
+import sys
+import random
+import hashlib
+import logging
+from pathlib import Path
+
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+from config import (
+    NEAR_DUP_THRESHOLD,
+    NEAR_DUP_SHINGLE_SIZE,
+    MINHASH_PERMUTATIONS,
+    LSH_BANDS,
+    SOURCE_PRIORITY
+)
+
+logger = logging.getLogger(__name__)
+
+# 英文/数字按单词切分，中日韩文字按单字切分
+TOKEN_RE = re.compile(r'[a-z0-9]+|[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]')
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+MERSENNE_PRIME = (1 << 61) - 1
+HASH_MASK = (1 << 32) - 1
+
+def article_text(article):
+    """用于近似去重的文本：标题加去掉HTML标签的摘要开头"""
+    summary = HTML_TAG_RE.sub(' ', article.summary)[:500]
+    return f"{article.title} {summary}"
+
+def shingles(text, size=NEAR_DUP_SHINGLE_SIZE):
+    """把文本切成连续 size 个词元的片段；中文按字切分，即字符 n-gram"""
+    tokens = TOKEN_RE.findall(text.lower())
+    if len(tokens) <= size:
+        return {' '.join(tokens)} if tokens else set()
+    return {' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+class MinHashLSH:
+    """MinHash 签名 + LSH 分桶索引，查询只比较落入同一桶的候选，避免两两比较"""
+
+    def __init__(self, num_perm=MINHASH_PERMUTATIONS, bands=LSH_BANDS, threshold=NEAR_DUP_THRESHOLD):
+        if num_perm % bands:
+            raise ValueError("MINHASH_PERMUTATIONS 必须能被 LSH_BANDS 整除")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        # 固定随机种子，保证同一文本在不同运行中签名一致
+        rng = random.Random(1)
+        self._perms = [
+            (rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        self._buckets = [{} for _ in range(bands)]
+        self._signatures = {}
+
+    def signature(self, text):
+        """计算文本的 MinHash 签名，没有可用词元时返回None"""
+        hashes = [
+            int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=4).digest(), 'little')
+            for shingle in shingles(text)
+        ]
+        if not hashes:
+            return None
+        return tuple(
+            min((a * h + b) % MERSENNE_PRIME for h in hashes) & HASH_MASK
+            for a, b in self._perms
+        )
+
+    def similarity(self, sig_a, sig_b):
+        """用签名估计 Jaccard 相似度"""
+        return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / self.num_perm
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def add(self, key, signature):
+        self._signatures[key] = signature
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band].setdefault(band_key, []).append(key)
+
+    def remove(self, key):
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for band, band_key in self._band_keys(signature):
+            bucket = self._buckets[band].get(band_key)
+            if bucket and key in bucket:
+                bucket.remove(key)
+                if not bucket:
+                    del self._buckets[band][band_key]
+
+    def query(self, signature):
+        """返回相似度不低于阈值的已索引键"""
+        candidates = set()
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(band_key, ()))
+        return [
+            key for key in candidates
+            if self.similarity(signature, self._signatures[key]) >= self.threshold
+        ]
+
+def source_rank(article):
+    """来源优先级，越靠前越优先；未列出的来源排在最后"""
+    source = article.source
+    for rank, name in enumerate(SOURCE_PRIORITY):
+        if name in source:
+            return rank
+    return len(SOURCE_PRIORITY)
+
+def representative_key(article):
+    """簇内代表的排序键：热度高者优先，其次来源优先级高者"""
+    return (article.score, -source_rank(article))
+
+def collapse_near_duplicates(articles):
+    """把近似重复的文章聚成簇，每簇只保留一个代表，保持原有顺序"""
+    articles = list(articles)
+    index = MinHashLSH()
+    parent = list(range(len(articles)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, article in enumerate(articles):
+        signature = index.signature(article_text(article))
+        if signature is None:
+            continue
+        for j in index.query(signature):
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[root_i] = root_j
+        index.add(i, signature)
+
+    clusters = {}
+    for i in range(len(articles)):
+        clusters.setdefault(find(i), []).append(i)
+
+    # 同分时取最早出现的文章，max 对相等键返回第一个
+    keep = {
+        max(members, key=lambda i: representative_key(articles[i]))
+        for members in clusters.values()
+    }
+    return [article for i, article in enumerate(articles) if i in keep]
@@ -0,0 +1,135 @@
+import sys
+import time
+import base64
+import logging
+import importlib.util
+from pathlib import Path
+
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+from config import (
+    DEFAULT_CATEGORY,
+    CATEGORY_PROTOTYPES,
+    AI_PROTOTYPES,
+    EMBED_API_KEY,
+    EMBED_API_BASE,
+    EMBED_MODEL,
+    EMBED_BATCH_SIZE,
+    EMBED_MAX_CHARS,
+    EMBED_MIN_SIMILARITY,
+    EMBED_CACHE_FILE,
+    EMBED_CACHE_TTL_DAYS,
+    EMBED_CACHE_MAX_ENTRIES,
+    LLM_PROVIDER_COOLDOWN
+)
+from classifier import HTML_TAG_RE
+from result_cache import ResultCache
+from llm_router import Provider
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+def embedding_text(article, max_chars=EMBED_MAX_CHARS):
+    """参与向量化的文本：标题 + 去掉HTML标签的摘要"""
+    summary = HTML_TAG_RE.sub(' ', article.summary or '')
+    return ' '.join(f"{article.title} {summary}".split())[:max_chars]
+
+class EmbeddingClassifier:
+    """按向量相似度为文章分类并计算AI相关度。
+
+    文章文本通过 OpenAI 兼容的 embeddings 接口分批向量化，向量按 模型+文本 缓存在磁盘上；
+    每批文章的得分是一次矩阵乘法：归一化后的文章向量 (n×d) 乘以类别中心与AI中心 (k+1)×d 的转置。
+    numpy 未安装、未配置密钥或请求失败时 classify() 返回 None，由调用方退回关键词分类。
+    """
+
+    def __init__(self, prototypes=None, ai_prototypes=None, provider=None, cache=None,
+                 min_similarity=EMBED_MIN_SIMILARITY, default_category=DEFAULT_CATEGORY):
+        self.prototypes = CATEGORY_PROTOTYPES if prototypes is None else prototypes
+        self.ai_prototypes = AI_PROTOTYPES if ai_prototypes is None else ai_prototypes
+        self.categories = [category for category in self.prototypes if category != default_category]
+        self.min_similarity = min_similarity
+        self.default_category = default_category
+        self.provider = provider or (Provider('embedding', EMBED_API_KEY, EMBED_MODEL, EMBED_API_BASE) if EMBED_API_KEY else None)
+        self.cache = cache or ResultCache(EMBED_CACHE_FILE, EMBED_CACHE_TTL_DAYS, EMBED_CACHE_MAX_ENTRIES)
+        self._np = None
+        self._centroids = None
+
+    @property
+    def available(self):
+        """是否具备向量分类的条件（numpy 已安装、配置了密钥且未处于失败冷却期）"""
+        if self.provider is None or time.monotonic() < self.provider.demoted_until:
+            return False
+        return self._np is not None or importlib.util.find_spec('numpy') is not None
+
+    def classify(self, articles):
+        """返回与 articles 对应的 [(类别, AI相关度)]；向量分类不可用时返回 None"""
+        if not articles or not self.available:
+            return None
+        try:
+            if self._np is None:
+                # numpy 导入较慢，只在第一次分类时导入
+                import numpy
+                self._np = numpy
+            np = self._np
+            if self._centroids is None:
+                self._centroids = self._build_centroids()
+            vectors = self.embed([embedding_text(article) for article in articles])
+        except Exception as e:
+            self.provider.demoted_until = time.monotonic() + LLM_PROVIDER_COOLDOWN
+            metrics.incr('embed_errors', reason=type(e).__name__)
+            logger.warning(f"  ⚠ 向量分类失败，{LLM_PROVIDER_COOLDOWN:.0f}s 内改用关键词分类: {e}")
+            return None
+
+        # 一次矩阵乘法得到每篇文章对每个类别中心和AI中心的余弦相似度
+        similarities = vectors @ self._centroids.T
+        category_similarities = similarities[:, :len(self.categories)]
+        best = category_similarities.argmax(axis=1)
+        best_similarity = category_similarities[np.arange(len(articles)), best]
+        categories = np.array(self.categories + [self.default_category], dtype=object)
+        labels = categories[np.where(best_similarity >= self.min_similarity, best, len(self.categories))]
+        relevance = similarities[:, -1].astype(np.float64).round(4)
+        metrics.incr('articles_embedded', len(articles))
+        return list(zip(labels.tolist(), relevance.tolist()))
+
+    def _build_centroids(self):
+        """类别中心和AI中心：各自原型向量的平均再归一化，最后一行是AI中心"""
+        np = self._np
+        groups = [self.prototypes[category] for category in self.categories] + [self.ai_prototypes]
+        vectors = self.embed([text for group in groups for text in group])
+        centroids, start = [], 0
+        for group in groups:
+            centroids.append(vectors[start:start + len(group)].mean(axis=0))
+            start += len(group)
+        return self._normalize(np.vstack(centroids))
+
+    def embed(self, texts):
+        """返回归一化后的向量矩阵 (len(texts)×d)；缓存未命中的文本按 EMBED_BATCH_SIZE 分批请求"""
+        np = self._np
+        keys = [ResultCache.make_key('embed', self.provider.model, text) for text in texts]
+        cached = self.cache.get_many(keys)
+        vectors = {key: np.frombuffer(base64.b64decode(value), dtype=np.float32) for key, value in cached.items()}
+
+        missing = list(dict.fromkeys(
+            (key, text) for key, text in zip(keys, texts) if key not in vectors
+        ))
+        for start in range(0, len(missing), EMBED_BATCH_SIZE):
+            batch = missing[start:start + EMBED_BATCH_SIZE]
+            with metrics.timer('embed_request'):
+                response = self.provider.client.embeddings.create(
+                    model=self.provider.model,
+                    input=[text or ' ' for key, text in batch]
+                )
+            fresh = {}
+            for (key, text), item in zip(batch, sorted(response.data, key=lambda item: item.index)):
+                vectors[key] = np.asarray(item.embedding, dtype=np.float32)
+                fresh[key] = base64.b64encode(vectors[key].tobytes()).decode('ascii')
+            self.cache.set_many(fresh.items())
+        if missing:
+            logger.debug("向量化 %d 条文本，缓存命中 %d 条", len(missing), len(cached))
+
+        return self._normalize(np.vstack([vectors[key] for key in keys]))
+
+    def _normalize(self, matrix):
+        norms = self._np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / self._np.maximum(norms, 1e-12)
@@ -0,0 +1,202 @@
+import re
+import sys
+import html
+import asyncio
+import hashlib
+import logging
+import importlib.util
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit
+
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+import httpx
+from config import (
+    ENRICH_CONCURRENCY,
+    ENRICH_PROCESSES,
+    ENRICH_TIMEOUT,
+    ENRICH_DEADLINE,
+    ENRICH_MAX_BYTES,
+    ENRICH_MAX_CHARS,
+    ENRICH_MIN_SUMMARY,
+    EXTRACT_CACHE_FILE,
+    EXTRACT_CACHE_TTL_DAYS,
+    EXTRACT_CACHE_MAX_ENTRIES,
+    FETCH_PER_HOST_LIMIT
+)
+from result_cache import ResultCache
+from http_client import create_async_client
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# 修改抽取规则后提升版本号，使旧的缓存结果失效
+EXTRACTOR_VERSION = 'v1'
+HTML_TAG_RE = re.compile(r'<[a-zA-Z/!][^>]*>')
+SCRIPT_STYLE_RE = re.compile(r'<(script|style|noscript)\b.*?</\1\s*>', re.S | re.I)
+WHITESPACE_RE = re.compile(r'\s+')
+# 解析前整体删除的非正文元素
+BOILERPLATE_TAGS = ['script', 'style', 'noscript', 'nav', 'header', 'footer', 'aside', 'form', 'svg', 'iframe', 'button']
+# 短于该长度的段落视为导航、版权等噪声
+MIN_PARAGRAPH_CHARS = 25
+
+def _strip_tags(markup, max_chars):
+    """没有安装 BeautifulSoup 时的退路：正则去掉标签"""
+    if isinstance(markup, bytes):
+        markup = markup.decode('utf-8', errors='replace')
+    text = HTML_TAG_RE.sub(' ', SCRIPT_STYLE_RE.sub(' ', markup))
+    return WHITESPACE_RE.sub(' ', html.unescape(text)).strip()[:max_chars]
+
+def extract_text(markup, fragment=False, max_chars=ENRICH_MAX_CHARS):
+    """从整页HTML中提取正文段落；fragment=True 时只把HTML片段（如RSS摘要）转成纯文本。
+
+    在进程池的子进程中运行，BeautifulSoup 只在子进程里导入。
+    """
+    try:
+        from bs4 import BeautifulSoup
+    except ImportError:
+        return _strip_tags(markup, max_chars)
+
+    parser = 'lxml' if importlib.util.find_spec('lxml') else 'html.parser'
+    soup = BeautifulSoup(markup, parser)
+    for tag in soup(BOILERPLATE_TAGS):
+        tag.decompose()
+    if fragment:
+        return WHITESPACE_RE.sub(' ', soup.get_text(' ', strip=True))[:max_chars]
+
+    root = soup.find('article') or soup.find('main') or soup.body or soup
+    paragraphs, length = [], 0
+    for node in root.find_all(['p', 'pre']):
+        text = WHITESPACE_RE.sub(' ', node.get_text(' ', strip=True))
+        if len(text) >= MIN_PARAGRAPH_CHARS:
+            paragraphs.append(text)
+            length += len(text) + 1
+            if length >= max_chars:
+                break
+    if paragraphs:
+        return '\n'.join(paragraphs)[:max_chars]
+
+    meta = soup.find('meta', attrs={'property': 'og:description'}) or soup.find('meta', attrs={'name': 'description'})
+    if meta and meta.get('content'):
+        return meta['content'].strip()[:max_chars]
+    return WHITESPACE_RE.sub(' ', root.get_text(' ', strip=True))[:max_chars]
+
+class ArticleExtractor:
+    """总结前的可选正文补全：并发抓取原文页面，在进程池中解析HTML，避免解析阻塞事件循环。
+
+    摘要过短的文章抓取原文（优先 content_url），摘要含HTML标签的文章清理为纯文本。
+    提取结果按URL缓存（命中时不再请求），同时按页面内容哈希缓存（内容未变时不再解析）。
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache or ResultCache(EXTRACT_CACHE_FILE, EXTRACT_CACHE_TTL_DAYS, EXTRACT_CACHE_MAX_ENTRIES)
+
+    @staticmethod
+    def needs_page(article):
+        return len(article.summary.strip()) < ENRICH_MIN_SUMMARY
+
+    def enrich(self, articles):
+        """补全文章摘要（原地修改），返回补全的篇数；超过总时限的文章保留原摘要"""
+        targets = [
+            article for article in articles
+            if self.needs_page(article) or HTML_TAG_RE.search(article.summary)
+        ]
+        if not targets:
+            return 0
+
+        logger.info(f"\n📄 正在补全 {len(targets)} 篇文章的正文...")
+        # 采集器在多线程环境中运行（总结线程池、守护进程），用 spawn 避免 fork 继承其它线程持有的锁
+        context = multiprocessing.get_context('spawn')
+        with metrics.timer('stage', stage='enrich'), \
+                ProcessPoolExecutor(max_workers=ENRICH_PROCESSES, mp_context=context) as pool:
+            enriched = asyncio.run(self._enrich(targets, pool))
+        self.cache.evict()
+        stats = self.cache.stats()
+        metrics.incr('articles_enriched', enriched)
+        logger.info(f"  ✓ 补全 {enriched}/{len(targets)} 篇，提取缓存命中 {stats['hits']} 次")
+        return enriched
+
+    async def _enrich(self, articles, pool):
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(ENRICH_CONCURRENCY)
+        host_semaphores = {}
+
+        async with create_async_client(max_connections=ENRICH_CONCURRENCY) as client:
+            async def enrich_one(article):
+                text = None
+                if self.needs_page(article):
+                    text = await self._page_text(client, article.content_url or article.link, loop, pool,
+                                                 semaphore, host_semaphores)
+                if not text and HTML_TAG_RE.search(article.summary):
+                    text = await loop.run_in_executor(pool, extract_text, article.summary, True)
+                if not text:
+                    return False
+                article.summary = text
+                return True
+
+            tasks = [asyncio.create_task(enrich_one(article)) for article in articles]
+            done, pending = await asyncio.wait(tasks, timeout=ENRICH_DEADLINE)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+                logger.warning(f"  ⚠ 超过正文补全总时限 {ENRICH_DEADLINE:.0f}s，{len(pending)} 篇保留原摘要")
+
+        enriched = 0
+        for task in done:
+            if task.exception() is not None:
+                logger.warning(f"  正文补全失败: {task.exception()}")
+            elif task.result():
+                enriched += 1
+        return enriched
+
+    async def _page_text(self, client, url, loop, pool, semaphore, host_semaphores):
+        """按URL读缓存，未命中时下载页面；页面内容与缓存过的相同则不再解析"""
+        url_key = ResultCache.make_key('extract-url', EXTRACTOR_VERSION, url)
+        text = self.cache.get(url_key)
+        if text is not None:
+            return text
+
+        body = await self._download(client, url, semaphore, host_semaphores)
+        if body is None:
+            return None
+        content_key = ResultCache.make_key('extract-body', EXTRACTOR_VERSION, hashlib.sha256(body).hexdigest())
+        text = self.cache.get(content_key)
+        if text is None:
+            with metrics.timer('parse', kind='html'):
+                text = await loop.run_in_executor(pool, extract_text, body)
+            self.cache.set(content_key, text)
+        self.cache.set(url_key, text)
+        return text
+
+    async def _download(self, client, url, semaphore, host_semaphores):
+        """下载HTML页面，最多读取 ENRICH_MAX_BYTES；非HTML或请求失败时返回None"""
+        host = urlsplit(url).hostname or ''
+        host_semaphore = host_semaphores.get(host)
+        if host_semaphore is None:
+            host_semaphore = host_semaphores[host] = asyncio.Semaphore(FETCH_PER_HOST_LIMIT)
+
+        headers = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'}
+        async with host_semaphore, semaphore:
+            try:
+                async with client.stream('GET', url, headers=headers, timeout=ENRICH_TIMEOUT,
+                                         follow_redirects=True) as response:
+                    if response.status_code != 200 or 'html' not in response.headers.get('content-type', ''):
+                        logger.debug("跳过原文 %s: HTTP %s %s", url, response.status_code,
+                                     response.headers.get('content-type', ''))
+                        return None
+                    chunks, size = [], 0
+                    async for chunk in response.aiter_bytes():
+                        chunks.append(chunk)
+                        size += len(chunk)
+                        if size >= ENRICH_MAX_BYTES:
+                            break
+            except httpx.HTTPError as e:
+                logger.debug("原文下载失败 %s: %s", url, e)
+                metrics.incr('enrich_errors')
+                return None
+        metrics.incr('enrich_bytes_downloaded', size)
+        return b''.join(chunks)[:ENRICH_MAX_BYTES]
@@ -0,0 +1,133 @@
+import sys
+import logging
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+logger = logging.getLogger(__name__)
+
+# 每次喂给增量解析器的字节数
+CHUNK_SIZE = 64 * 1024
+
+ATOM_NS = 'http://www.w3.org/2005/Atom'
+ATOM03_NS = 'http://purl.org/atom/ns#'
+RSS1_NS = 'http://purl.org/rss/1.0/'
+RSS09_NS = 'http://my.netscape.com/rdf/simple/0.9/'
+DC_NS = 'http://purl.org/dc/elements/1.1/'
+CONTENT_NS = 'http://purl.org/rss/1.0/modules/content/'
+
+# 这些命名空间下的元素按本地名识别；其他扩展（media:title 等）忽略，避免与正文字段混淆
+CORE_NAMESPACES = {'', ATOM_NS, ATOM03_NS, RSS1_NS, RSS09_NS}
+FEED_ROOTS = {'rss', 'feed', 'RDF'}
+ITEM_TAGS = {'item', 'entry'}
+
+class FeedParseError(ValueError):
+    """快速解析失败（XML格式错误或不是RSS/Atom文档），需要回退到 feedparser"""
+
+def _split_tag(tag):
+    if tag.startswith('{'):
+        namespace, local = tag[1:].split('}', 1)
+        return namespace, local
+    return '', tag
+
+def _field(tag):
+    """把元素标签映射为关心的字段名，不关心的返回None"""
+    namespace, local = _split_tag(tag)
+    if namespace in CORE_NAMESPACES:
+        return local
+    if namespace == DC_NS and local == 'date':
+        return 'date'
+    if namespace == CONTENT_NS and local == 'encoded':
+        return 'encoded'
+    return None
+
+def _text(element):
+    return ''.join(element.itertext()).strip()
+
+def _entry(element):
+    """从 <item>/<entry> 中提取标题、链接、发布时间和摘要，字段含义与 feedparser 一致"""
+    fields = {}
+    link = guid = ''
+    for child in element:
+        field = _field(child.tag)
+        if field is None:
+            continue
+        if field == 'link':
+            # Atom 的链接在 href 属性里，只取 alternate；RSS 的链接是元素文本
+            href = child.get('href')
+            if href is not None:
+                if not link and child.get('rel', 'alternate') == 'alternate':
+                    link = href.strip()
+            elif not link:
+                link = _text(child)
+        elif field == 'guid':
+            if child.get('isPermaLink', 'true').lower() != 'false':
+                guid = _text(child)
+        elif field not in fields:
+            fields[field] = _text(child)
+
+    return {
+        'title': fields.get('title', ''),
+        'link': link or guid,
+        'published': fields.get('pubDate') or fields.get('published') or fields.get('issued') or '',
+        'updated': fields.get('updated') or fields.get('modified') or fields.get('date') or '',
+        'summary': fields.get('description') or fields.get('summary') or fields.get('encoded') or fields.get('content') or ''
+    }
+
+def fast_parse(content, limit=10):
+    """增量解析原始字节，只提取前 limit 条条目，拿够后不再继续解析剩余文档"""
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    entries = []
+    root_checked = False
+    try:
+        for offset in range(0, len(content), CHUNK_SIZE):
+            parser.feed(content[offset:offset + CHUNK_SIZE])
+            for event, element in parser.read_events():
+                if event == 'start':
+                    if not root_checked:
+                        root = _split_tag(element.tag)[1]
+                        if root not in FEED_ROOTS:
+                            raise FeedParseError(f"不是RSS/Atom文档（根元素 <{root}>）")
+                        root_checked = True
+                    continue
+                if _field(element.tag) in ITEM_TAGS:
+                    entries.append(_entry(element))
+                    # 已处理的条目释放子元素，长全文条目不会在内存里累积
+                    element.clear()
+                    if len(entries) >= limit:
+                        return entries
+        parser.close()
+    except FeedParseError:
+        raise
+    except (ET.ParseError, ValueError, LookupError) as e:
+        # expat 不支持的多字节编码（如 GBK）和未知编码同样回退
+        raise FeedParseError(str(e)) from e
+    if not root_checked:
+        raise FeedParseError("文档为空")
+    return entries
+
+def feedparser_parse(content, limit=10):
+    """使用 feedparser 完整解析（容错强但慢），返回与 fast_parse 相同结构的条目"""
+    import feedparser
+
+    feed = feedparser.parse(content)
+    return [
+        {
+            'title': entry.get('title', ''),
+            'link': entry.get('link', ''),
+            'published': entry.get('published', ''),
+            'updated': entry.get('updated', ''),
+            'summary': entry.get('summary', '')
+        }
+        for entry in feed.entries[:limit]
+    ]
+
+def parse_feed(content, limit=10):
+    """解析RSS/Atom原始字节：优先走快速路径，格式不规范时回退到 feedparser"""
+    try:
+        return fast_parse(content, limit)
+    except FeedParseError as e:
+        logger.info(f"  ↺ 快速解析失败，改用feedparser: {e}")
+        return feedparser_parse(content, limit)
@@ -1,70 +1,106 @@
-import os
+import re
 import sys
 import json
+import time
+import random
+import hashlib
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 current_dir = Path(__file__).parent
 sys.path.insert(0, str(current_dir))
 
 import httpx
-from config import FEISHU_WEBHOOK_URL
+from config import (
+    FEISHU_WEBHOOK_URL,
+    FEISHU_WEBHOOK_URLS,
+    FEISHU_MAX_MESSAGE_BYTES,
+    FEISHU_QPS,
+    FEISHU_MAX_RETRIES,
+    FEISHU_BACKOFF_BASE
+)
+from http_client import get_client
+from report_renderer import render_cards, render_markdown_card, render_breaking_card, json_bytes, hard_split
+from metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+# 日报中文章条目的首行，如 "3. **标题**"
+ARTICLE_LINE_RE = re.compile(r'^\d+\. ')
+# 飞书返回的限流错误码
+RATE_LIMIT_CODES = {9499, 11232}
+# 为分条序号 "（12/34）" 预留的字节数
+PART_LABEL_BYTES = 32
+
+def _text_payload(text):
+    return json.dumps({"msg_type": "text", "content": {"text": text}}, ensure_ascii=False).encode('utf-8')
+
+def split_report(report, max_bytes=FEISHU_MAX_MESSAGE_BYTES):
+    """按类别和文章边界把日报拆成请求体不超过 max_bytes 的多条消息。
+
+    日报中条目之间以空行分隔；同一类别被拆到下一条消息时，在新消息开头补上“类别（续）”。
+    拆成多条时在每条末尾标注序号。
+    """
+    budget = max_bytes - len(_text_payload('')) - PART_LABEL_BYTES
+    chunks, current, current_bytes = [], [], 0
+    category = None
+    for block in report.split('\n\n'):
+        lines = block.split('\n')
+        if len(lines) > 1 and not ARTICLE_LINE_RE.match(lines[0]) and ARTICLE_LINE_RE.match(lines[1]):
+            category = lines[0]
+        block_bytes = json_bytes(block)
+        # 块之间的空行 "\n\n" 在JSON中占4字节
+        if current and current_bytes + 4 + block_bytes <= budget:
+            current.append(block)
+            current_bytes += 4 + block_bytes
+            continue
+        if not current and block_bytes <= budget:
+            current, current_bytes = [block], block_bytes
+            continue
+        if current:
+            chunks.append('\n\n'.join(current))
+        if category and ARTICLE_LINE_RE.match(lines[0]):
+            block = f"{category}（续）\n{block}"
+            block_bytes = json_bytes(block)
+        if block_bytes <= budget:
+            current, current_bytes = [block], block_bytes
+        else:
+            pieces = hard_split(block, budget)
+            chunks.extend(pieces[:-1])
+            current, current_bytes = [pieces[-1]], json_bytes(pieces[-1])
+    if current:
+        chunks.append('\n\n'.join(current))
+    if len(chunks) > 1:
+        chunks = [f"{chunk}\n（{i}/{len(chunks)}）" for i, chunk in enumerate(chunks, 1)]
+    return chunks
+
+def delivery_key(webhook_url, body):
+    """某条消息（请求体字节）发往某个Webhook的唯一标识，用于重跑时跳过已送达的消息"""
+    return hashlib.sha256(webhook_url.encode('utf-8') + b'\n' + body).hexdigest()[:32]
+
 class FeishuSender:
-    def __init__(self, webhook_url=None):
+    def __init__(self, webhook_url=None, webhook_urls=None, max_bytes=FEISHU_MAX_MESSAGE_BYTES):
         self.webhook_url = webhook_url or FEISHU_WEBHOOK_URL
+        if webhook_urls is None:
+            webhook_urls = [webhook_url] if webhook_url else FEISHU_WEBHOOK_URLS
+        self.webhook_urls = [url.rstrip('/') for url in webhook_urls]
+        self.max_bytes = max_bytes
+        self._next_send = {}
+        self._throttle_lock = threading.Lock()
         
     def send_rich_text_message(self, content, title="AI新闻日报"):
-        """发送富文本消息到飞书"""
+        """以交互卡片发送 Markdown 内容到飞书（自定义机器人不渲染 rich_text 消息）"""
         if not self.webhook_url:
             logger.error("未配置飞书Webhook URL")
             return False
             
-        url = self.webhook_url.rstrip('/')
-        
-        payload = {
-            "msg_type": "rich_text",
-            "rich_text": {
-                "elements": [
-                    {
-                        "tag": "div",
-                        "elements": [
-                            {
-                                "tag": "lark_md",
-                                "text": content
-                            }
-                        ]
-                    }
-                ]
-            }
-        }
-        
-        try:
-            logger.info("正在发送消息到飞书...")
-            response = httpx.post(
-                url,
-                json=payload,
-                timeout=30.0,
-                headers={'Content-Type': 'application/json'}
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            if result.get('code') == 0:
-                logger.info("✓ 飞书消息发送成功")
-                return True
-            else:
-                logger.error(f"✗ 飞书消息发送失败: {result.get('msg')}")
-                return False
-                
-        except httpx.HTTPStatusError as e:
-            logger.error(f"✗ HTTP错误: {e}")
-            return False
-        except Exception as e:
-            logger.error(f"✗ 发送失败: {e}")
-            return False
+        logger.info("正在发送消息到飞书...")
+        if self._deliver(self.webhook_url.rstrip('/'), render_markdown_card(content, title), 'interactive'):
+            logger.info("✓ 飞书消息发送成功")
+            return True
+        return False
             
     def send_text_message(self, content):
         """发送纯文本消息（备用方案）"""
@@ -72,35 +108,123 @@ class FeishuSender:
             logger.error("未配置飞书Webhook URL")
             return False
             
-        url = self.webhook_url.rstrip('/')
+        if self._deliver(self.webhook_url.rstrip('/'), _text_payload(content), 'text'):
+            logger.info("✓ 文本消息发送成功")
+            return True
+        return False
+        
+    def send_report(self, report, delivered=None):
+        """把日报按大小拆成多条文本消息，依次发送到所有Webhook"""
+        if not self.webhook_urls:
+            logger.error("未配置飞书Webhook URL")
+            return False
+            
+        chunks = split_report(report, self.max_bytes)
+        if len(chunks) > 1:
+            logger.info(f"日报共 {len(_text_payload(report)) / 1024:.1f} KB，拆分为 {len(chunks)} 条消息")
+        return self._send_bodies([_text_payload(chunk) for chunk in chunks], 'text', delivered)
+        
+    def send_card(self, articles, date_str, delivered=None):
+        """把日报渲染为交互卡片（超过大小时拆成多张），依次发送到所有Webhook"""
+        if not self.webhook_urls:
+            logger.error("未配置飞书Webhook URL")
+            return False
+            
+        with metrics.timer('render', format='card'):
+            bodies = render_cards(articles, date_str, self.max_bytes)
+        if len(bodies) > 1:
+            logger.info(f"日报卡片共 {sum(map(len, bodies)) / 1024:.1f} KB，拆分为 {len(bodies)} 张卡片")
+        return self._send_bodies(bodies, 'interactive', delivered)
+        
+    def send_breaking(self, article, delivered=None, card=True):
+        """立即推送一条突发新闻到所有Webhook"""
+        if not self.webhook_urls:
+            logger.error("未配置飞书Webhook URL")
+            return False
+            
+        if card:
+            return self._send_bodies([render_breaking_card(article)], 'interactive', delivered)
+        text = f"🔥 AI快讯\n{article.display_title}\n📝 {article.summary_ai}\n🔗 {article.link}"
+        return self._send_bodies([_text_payload(text)], 'text', delivered)
         
-        payload = {
-            "msg_type": "text",
-            "content": {
-                "text": content
-            }
-        }
+    def _send_bodies(self, bodies, msg_type, delivered=None):
+        """把已序列化的请求体按顺序发送到所有Webhook，所有群共用同一份字节。
+
+        多个Webhook（群）并发发送，同一个群内按顺序逐条发送并限速；某条失败后不再发送该群的后续消息。
+        delivered 为已送达记录（支持 in 和 add），中断后重跑时跳过已送达的消息。
+        """
+        def send_all(target):
+            index, url = target
+            for i, body in enumerate(bodies, 1):
+                key = delivery_key(url, body)
+                if delivered is not None and key in delivered:
+                    logger.info(f"  ⏩ 群{index} 第 {i}/{len(bodies)} 条已送达，跳过")
+                    continue
+                if not self._deliver(url, body, msg_type):
+                    logger.error(f"  ✗ 群{index} 第 {i}/{len(bodies)} 条发送失败，停止发送该群的后续消息")
+                    return False
+                if delivered is not None:
+                    delivered.add(key)
+            logger.info(f"  ✓ 群{index} 已送达全部 {len(bodies)} 条消息")
+            return True
+            
+        targets = list(enumerate(self.webhook_urls, 1))
+        with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+            results = list(executor.map(send_all, targets))
+        return all(results)
         
-        try:
-            response = httpx.post(
-                url,
-                json=payload,
-                timeout=30.0,
-                headers={'Content-Type': 'application/json'}
-            )
-            response.raise_for_status()
+    def _throttle(self, url):
+        """同一个Webhook两次发送之间至少间隔 1/FEISHU_QPS 秒"""
+        interval = 1.0 / FEISHU_QPS
+        with self._throttle_lock:
+            now = time.monotonic()
+            send_at = max(now, self._next_send.get(url, 0.0))
+            self._next_send[url] = send_at + interval
+        if send_at > now:
+            time.sleep(send_at - now)
             
-            result = response.json()
-            if result.get('code') == 0:
-                logger.info("✓ 文本消息发送成功")
-                return True
-            else:
-                logger.error(f"✗ 发送失败: {result.get('msg')}")
+    def _deliver(self, url, body, msg_type):
+        """发送一条已序列化的消息；只在确定未送达时重试（连接失败、429、5xx、限流错误码），避免重复推送"""
+        for attempt in range(FEISHU_MAX_RETRIES + 1):
+            self._throttle(url)
+            retryable = False
+            try:
+                with metrics.timer('feishu_send', msg_type=msg_type):
+                    response = get_client().post(
+                        url,
+                        content=body,
+                        timeout=30.0,
+                        headers={'Content-Type': 'application/json; charset=utf-8'}
+                    )
+                if response.status_code == 429 or response.status_code >= 500:
+                    error = f"HTTP {response.status_code}"
+                    retryable = True
+                else:
+                    response.raise_for_status()
+                    result = response.json()
+                    code = result.get('code', result.get('StatusCode'))
+                    if code == 0:
+                        metrics.incr('feishu_messages', status='ok')
+                        return True
+                    error = result.get('msg') or result.get('StatusMessage')
+                    retryable = code in RATE_LIMIT_CODES
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                # 连接尚未建立，请求一定没有发出
+                error = f"{type(e).__name__}: {e}"
+                retryable = True
+            except Exception as e:
+                # 读取超时等情况下消息可能已经送达，不再重试
+                error = f"{type(e).__name__}: {e}"
+                
+            if not retryable or attempt >= FEISHU_MAX_RETRIES:
+                logger.error(f"✗ 发送失败: {error}")
+                metrics.incr('feishu_messages', status='failed')
                 return False
                 
-        except Exception as e:
-            logger.error(f"✗ 发送失败: {e}")
-            return False
+            delay = FEISHU_BACKOFF_BASE * (2 ** attempt) + random.uniform(0, FEISHU_BACKOFF_BASE)
+            metrics.incr('feishu_retries')
+            logger.warning(f"飞书接口暂不可用({error})，{delay:.1f}s 后第 {attempt + 1} 次重试")
+            time.sleep(delay)
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
@@ -0,0 +1,97 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+from pathlib import Path
+
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+from config import HTTP_CACHE_FILE, HTTP_CACHE_MAX_AGE_DAYS
+
+logger = logging.getLogger(__name__)
+
+def body_digest(body):
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+class HttpCache:
+    """基于 ETag / Last-Modified 的条件请求缓存，连同解析结果一起持久化到磁盘。
+
+    没有校验头的源按响应内容摘要判断是否更新，内容不变时同样复用上次的解析结果。
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path or HTTP_CACHE_FILE)
+        self.entries = {}
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        """从磁盘加载缓存，文件缺失或损坏时从空缓存开始"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            self.entries = {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"HTTP缓存读取失败，将重新建立: {e}")
+            self.entries = {}
+
+    def conditional_headers(self, url, headers=None):
+        """为请求附加 If-None-Match / If-Modified-Since 头"""
+        headers = dict(headers or {})
+        entry = self.entries.get(url)
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def cached_articles(self, url):
+        """返回上次解析的文章副本（304时复用）"""
+        entry = self.entries.get(url)
+        if not entry:
+            return []
+        entry['checked_at'] = time.time()
+        self._dirty = True
+        return [dict(article) for article in entry.get('articles', [])]
+
+    def unchanged(self, url, body):
+        """响应内容与上次解析时完全相同"""
+        entry = self.entries.get(url)
+        return bool(entry) and entry.get('digest') == body_digest(body)
+
+    def store(self, url, response, articles):
+        """记录响应的校验头、内容摘要和解析出的文章"""
+        now = time.time()
+        self.entries[url] = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'digest': body_digest(response.content),
+            'articles': [dict(article) for article in articles],
+            'fetched_at': now,
+            'checked_at': now
+        }
+        self._dirty = True
+
+    def save(self):
+        """清理过期条目后原子写回磁盘"""
+        cutoff = time.time() - HTTP_CACHE_MAX_AGE_DAYS * 86400
+        expired = [url for url, entry in self.entries.items() if entry.get('checked_at', 0) < cutoff]
+        for url in expired:
+            del self.entries[url]
+        if not self._dirty and not expired:
+            return
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError as e:
+            logger.warning(f"HTTP缓存写入失败: {e}")
@@ -0,0 +1,169 @@
+import sys
+import time
+import socket
+import logging
+import threading
+import importlib.util
+from collections import Counter
+from pathlib import Path
+
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+import httpx
+
+from config import (
+    HTTP_PROXY,
+    HTTP2_ENABLED,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_CONNECT_RETRIES,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_TIMEOUT,
+    HTTP_CONNECT_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+# 是否安装了 HTTP/2 所需的 h2 包
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+_client = None
+_client_lock = threading.Lock()
+_original_getaddrinfo = socket.getaddrinfo
+_dns_cache = {}
+_dns_lock = threading.Lock()
+
+class ConnectionStats:
+    """按主机统计请求数与新建连接数，用于观察连接复用情况"""
+
+    def __init__(self):
+        self.requests = Counter()
+        self.connections = Counter()
+        self._lock = threading.Lock()
+
+    def record_request(self, host):
+        with self._lock:
+            self.requests[host] += 1
+
+    def record_connection(self, host):
+        with self._lock:
+            self.connections[host] += 1
+
+    def log_summary(self):
+        """输出每个主机的请求数、新建连接数和复用率"""
+        with self._lock:
+            hosts = sorted(self.requests, key=self.requests.get, reverse=True)
+            if not hosts:
+                return
+            logger.info("🔌 HTTP连接复用统计:")
+            for host in hosts:
+                requests = self.requests[host]
+                connections = self.connections[host]
+                reused = max(requests - connections, 0)
+                logger.info(f"  {host}: 请求 {requests} 次，新建连接 {connections} 个，复用率 {reused / requests:.0%}")
+
+connection_stats = ConnectionStats()
+
+def _cached_getaddrinfo(host, port, *args, **kwargs):
+    """带TTL的DNS解析缓存，同一主机在TTL内只解析一次"""
+    key = (host, port, args, tuple(sorted(kwargs.items())))
+    now = time.monotonic()
+    with _dns_lock:
+        entry = _dns_cache.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+    result = _original_getaddrinfo(host, port, *args, **kwargs)
+    with _dns_lock:
+        _dns_cache[key] = (now + HTTP_DNS_CACHE_TTL, result)
+    return result
+
+def enable_dns_cache():
+    """设置了 HTTP_DNS_CACHE_TTL 时启用DNS缓存。
+
+    缓存通过替换 socket.getaddrinfo 实现，作用于整个进程（包括其它库的解析），因此默认关闭。
+    """
+    if HTTP_DNS_CACHE_TTL > 0 and socket.getaddrinfo is _original_getaddrinfo:
+        socket.getaddrinfo = _cached_getaddrinfo
+
+def _transport_options():
+    options = {
+        'http2': HTTP2_ENABLED and HTTP2_AVAILABLE,
+        'retries': HTTP_CONNECT_RETRIES,
+        'limits': httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+        )
+    }
+    if HTTP_PROXY:
+        options['proxy'] = httpx.Proxy(HTTP_PROXY)
+    return options
+
+def _client_options():
+    return {
+        'timeout': httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        'headers': {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'}
+    }
+
+def _trace_connections(host):
+    def trace(event_name, info):
+        if event_name == 'connection.connect_tcp.complete':
+            connection_stats.record_connection(host)
+    return trace
+
+def _async_trace_connections(host):
+    async def trace(event_name, info):
+        if event_name == 'connection.connect_tcp.complete':
+            connection_stats.record_connection(host)
+    return trace
+
+def _on_request(request):
+    host = request.url.host
+    connection_stats.record_request(host)
+    request.extensions['trace'] = _trace_connections(host)
+
+async def _on_async_request(request):
+    host = request.url.host
+    connection_stats.record_request(host)
+    request.extensions['trace'] = _async_trace_connections(host)
+
+def get_client():
+    """进程内共享的同步客户端（飞书发送、AI接口），连接池跨调用复用"""
+    global _client
+    with _client_lock:
+        if _client is None or _client.is_closed:
+            enable_dns_cache()
+            _client = httpx.Client(
+                transport=httpx.HTTPTransport(**_transport_options()),
+                event_hooks={'request': [_on_request]},
+                **_client_options()
+            )
+            logger.debug(f"创建共享HTTP客户端 (HTTP/2: {'开启' if HTTP2_ENABLED and HTTP2_AVAILABLE else '关闭'}, 代理: {'有' if HTTP_PROXY else '无'})")
+        return _client
+
+def create_async_client(max_connections=None):
+    """创建与共享客户端使用相同代理、HTTP/2、重试和超时策略的异步客户端（每个事件循环一个）"""
+    enable_dns_cache()
+    options = _transport_options()
+    if max_connections:
+        options['limits'] = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+        )
+    return httpx.AsyncClient(
+        transport=httpx.AsyncHTTPTransport(**options),
+        event_hooks={'request': [_on_async_request]},
+        **_client_options()
+    )
+
+def close_client():
+    """关闭共享客户端并输出连接复用统计"""
+    global _client
+    with _client_lock:
+        if _client is not None and not _client.is_closed:
+            _client.close()
+        _client = None
+    connection_stats.log_summary()
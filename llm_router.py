@@ -0,0 +1,271 @@
+import sys
+import time
+import logging
+import threading
+import weakref
+import functools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+from config import (
+    AI_PROVIDER,
+    DEEPSEEK_API_KEY,
+    DEEPSEEK_API_BASE,
+    DEEPSEEK_MODEL,
+    OPENAI_API_KEY,
+    OPENAI_API_BASE,
+    OPENAI_MODEL,
+    LLM_TIMEOUT,
+    LLM_CONCURRENCY,
+    LLM_HEDGE_ENABLED,
+    LLM_HEDGE_PERCENTILE,
+    LLM_HEDGE_MIN_SAMPLES,
+    LLM_HEDGE_DELAY,
+    LLM_HEDGE_MIN_DELAY,
+    LLM_PROVIDER_LATENCY_SAMPLES,
+    LLM_PROVIDER_FAILURE_THRESHOLD,
+    LLM_PROVIDER_COOLDOWN
+)
+from http_client import get_client
+from source_health import percentile
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# 进程内创建的路由器，退出前由 close_routers() 统一关闭线程池
+_routers = weakref.WeakSet()
+
+class Provider:
+    """一个 OpenAI 兼容的后端：客户端在第一次请求时创建，并记录本次运行的延迟与错误"""
+
+    def __init__(self, name, api_key, model, base_url=None):
+        self.name = name
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url
+        self.latencies = deque(maxlen=LLM_PROVIDER_LATENCY_SAMPLES)
+        self.requests = 0
+        self.errors = 0
+        self.wins = 0
+        self.consecutive_failures = 0
+        self.demoted_until = 0.0
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    # 导入 openai 耗时较长，只在真正发请求时才导入
+                    from openai import OpenAI
+                    logger.info(f"正在初始化 {self.name} 客户端...")
+                    with metrics.timer('llm_client_init', provider=self.name):
+                        self._client = OpenAI(
+                            api_key=self.api_key,
+                            base_url=self.base_url,
+                            max_retries=0,
+                            timeout=LLM_TIMEOUT,
+                            http_client=get_client()
+                        )
+        return self._client
+
+    def __repr__(self):
+        return f"Provider({self.name!r}, model={self.model!r})"
+
+def configured_providers(primary=AI_PROVIDER):
+    """按配置创建提供商列表：主提供商在前，其余配置了密钥的作为备用"""
+    candidates = {
+        'deepseek': (DEEPSEEK_API_KEY, DEEPSEEK_MODEL, DEEPSEEK_API_BASE),
+        'openai': (OPENAI_API_KEY, OPENAI_MODEL, OPENAI_API_BASE)
+    }
+    primary = primary.lower()
+    names = [primary] + [name for name in candidates if name != primary]
+    return [
+        Provider(name, candidates[name][0], candidates[name][1], candidates[name][2])
+        for name in names
+        if name in candidates and candidates[name][0]
+    ]
+
+class LLMRouter:
+    """在多个提供商之间路由对话补全请求。
+
+    请求先发往优先级最高的提供商；超过其 p95 延迟仍未返回时向下一个提供商发出对冲请求，
+    取先成功的结果（另一个请求在后台完成后丢弃）；出错时立即切换到下一个提供商。
+    传入AI预算时，每个对冲请求先额外预留一份 token，落败的请求完成后按其用量结算；预留不到时不再对冲。
+    连续失败的提供商暂时降为最低优先级。全部失败时抛出最后一个错误，由调用方决定是否退避重试。
+    """
+
+    def __init__(self, providers, hedge=LLM_HEDGE_ENABLED):
+        self.providers = list(providers)
+        self.hedge = hedge and len(self.providers) > 1
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, LLM_CONCURRENCY) * max(1, len(self.providers)),
+            thread_name_prefix='llm'
+        )
+        _routers.add(self)
+
+    @property
+    def primary(self):
+        return self.providers[0] if self.providers else None
+
+    def _ordered(self):
+        """健康的提供商按配置顺序在前，降级中的排在最后"""
+        now = time.monotonic()
+        with self._lock:
+            return sorted(self.providers, key=lambda provider: provider.demoted_until > now)
+
+    def hedge_delay(self, provider):
+        """向下一个提供商发出对冲请求前的等待时间：该提供商的 p95 延迟"""
+        with self._lock:
+            samples = list(provider.latencies)
+        if len(samples) < LLM_HEDGE_MIN_SAMPLES:
+            return LLM_HEDGE_DELAY
+        return max(LLM_HEDGE_MIN_DELAY, percentile(samples, LLM_HEDGE_PERCENTILE))
+
+    def _call(self, provider, params):
+        started = time.perf_counter()
+        try:
+            response = provider.client.chat.completions.create(model=provider.model, **params)
+        except Exception as e:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                provider.requests += 1
+                provider.errors += 1
+                provider.consecutive_failures += 1
+                if provider.consecutive_failures >= LLM_PROVIDER_FAILURE_THRESHOLD:
+                    provider.demoted_until = time.monotonic() + LLM_PROVIDER_COOLDOWN
+            metrics.incr('llm_provider_errors', provider=provider.name, reason=type(e).__name__)
+            metrics.observe('llm_provider_request', elapsed, provider=provider.name)
+            raise
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            provider.requests += 1
+            provider.consecutive_failures = 0
+            provider.latencies.append(elapsed)
+        metrics.observe('llm_provider_request', elapsed, provider=provider.name)
+        return response
+
+    def complete(self, budget=None, tokens=0, **params):
+        """发送一次对话补全请求（不含 model 参数），返回最先成功的响应。
+
+        调用方已为一个请求预留了 tokens；同时进行的其余请求（对冲）各自从 budget 中再预留 tokens。
+        """
+        order = self._ordered()
+        if not order:
+            raise RuntimeError("没有可用的AI提供商")
+
+        futures = {}
+        errors = []
+        launched = 0
+        hedge = self.hedge
+        held = 0  # 为对冲请求额外预留的份数：进行中的请求多于一个时，多出的每个各占一份
+
+        def launch():
+            nonlocal launched
+            provider = order[launched]
+            launched += 1
+            futures[self._executor.submit(self._call, provider, params)] = provider
+
+        launch()
+        while futures:
+            timeout = self.hedge_delay(order[launched - 1]) if hedge and launched < len(order) else None
+            done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                if budget is not None:
+                    if not budget.try_reserve(tokens):
+                        # 预算不足以再发一个请求：不再对冲，继续等待进行中的请求
+                        hedge = False
+                        continue
+                    held += 1
+                metrics.incr('llm_hedges')
+                logger.debug("%s 超过 %.1fs 未返回，向 %s 发出对冲请求", order[launched - 1].name, timeout, order[launched].name)
+                launch()
+                continue
+
+            for future in done:
+                provider = futures.pop(future)
+                try:
+                    response = future.result()
+                except Exception as e:
+                    errors.append(e)
+                    logger.debug("%s 请求失败: %s", provider.name, e)
+                    if held:
+                        # 失败的请求不计用量，释放一份对冲预留
+                        budget.settle(tokens, 0)
+                        held -= 1
+                    continue
+                with self._lock:
+                    provider.wins += 1
+                if provider is not order[0]:
+                    metrics.incr('llm_fallback_wins', provider=provider.name)
+                # 每个落败的请求占用一份对冲预留，完成后按实际用量结算
+                for loser in futures:
+                    loser.add_done_callback(functools.partial(self._discard, budget, tokens))
+                return response
+
+            # 进行中的请求都失败了：立即切换到下一个提供商
+            if not futures and launched < len(order):
+                metrics.incr('llm_failovers')
+                logger.warning(f"{order[launched - 1].name} 请求失败({type(errors[-1]).__name__})，切换到 {order[launched].name}")
+                launch()
+
+        raise errors[-1]
+
+    def close(self):
+        """关闭线程池：取消排队中的请求，不等待对冲中落败、仍在进行的请求。
+
+        进行中的请求无法中断，解释器退出前仍会等它们结束（最长 LLM_TIMEOUT）。
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _discard(budget, tokens, future):
+        """对冲中落败的请求完成后丢弃结果并结算预留；流式响应需要关闭以归还连接"""
+        used = 0
+        if not future.cancelled() and future.exception() is None:
+            response = future.result()
+            usage = getattr(response, 'usage', None)
+            # 流式响应在读取前关闭，没有用量信息，按预留量计
+            used = (usage.prompt_tokens or 0) + (usage.completion_tokens or 0) if usage is not None else tokens
+            close = getattr(response, 'close', None)
+            if callable(close):
+                close()
+        if budget is not None:
+            budget.settle(tokens, used)
+
+    def stats(self):
+        """各提供商本次运行的请求数、错误率、延迟分位数和被采用的次数"""
+        with self._lock:
+            return {
+                provider.name: {
+                    'model': provider.model,
+                    'requests': provider.requests,
+                    'errors': provider.errors,
+                    'error_rate': round(provider.errors / provider.requests, 3) if provider.requests else 0.0,
+                    'p50': percentile(list(provider.latencies), 0.5),
+                    'p95': percentile(list(provider.latencies), 0.95),
+                    'wins': provider.wins
+                }
+                for provider in self.providers
+            }
+
+    def log_summary(self):
+        for name, stat in self.stats().items():
+            if not stat['requests']:
+                continue
+            latency = f"p50 {stat['p50']:.1f}s，p95 {stat['p95']:.1f}s" if stat['p50'] is not None else "无成功请求"
+            logger.info(
+                f"  {name}({stat['model']}): 请求 {stat['requests']} 次，失败 {stat['errors']} 次"
+                f"（{stat['error_rate']:.0%}），{latency}，采用 {stat['wins']} 次"
+            )
+
+def close_routers():
+    """关闭所有路由器的线程池；与 close_client() 一同在进程退出前调用"""
+    for router in list(_routers):
+        router.close()
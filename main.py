@@ -4,9 +4,9 @@ AI Daily News Collector - Main Entry Point
 每日AI新闻收集与推送系统
 """
 
-import os
 import sys
 import logging
+import argparse
 from datetime import datetime
 from pathlib import Path
 
@@ -15,45 +15,155 @@ sys.path.insert(0, str(current_dir))
 
 from news_collector import NewsCollector
 from feishu_sender import FeishuSender
+from http_client import close_client
+from llm_router import close_routers
+from metrics import metrics
+from config import LOG_LEVEL, FEISHU_WEBHOOK_URLS, FEISHU_MESSAGE_FORMAT, COLLECT_WORKERS
+from run_store import RunStore, STAGE_COLLECTED, STAGE_SELECTED, STAGE_PROCESSED, STAGE_REPORT, STAGE_SENT
+from sources import parse_shard
+from sharding import collect_shard, collect_parallel, merge_shards
 
 logging.basicConfig(
-    level=logging.INFO,
+    level=LOG_LEVEL,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
-def main():
+def shard_arg(text):
+    try:
+        return parse_shard(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='每日AI新闻收集与推送')
+    parser.add_argument('--resume', action='store_true', help='从当天的检查点继续，跳过已完成的阶段')
+    parser.add_argument('--daemon', action='store_true', help='常驻运行：按各源的间隔增量抓取，每天定时推送日报')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--dry-run', action='store_true', help='完整生成日报并打印，不发送、不写检查点、不记录已推送')
+    mode.add_argument('--collect-only', action='store_true', help='只抓取新闻并写入当天检查点，不调用AI；之后可用 --resume 继续')
+    mode.add_argument('--shard', type=shard_arg, metavar='i/N', help='只抓取第 i 个分片（共 N 个）的新闻源，写出分片结果后退出')
+    mode.add_argument('--merge', action='store_true', help='合并当天各分片的抓取结果并去重，然后继续筛选、总结和发送')
+    parser.add_argument('--workers', type=int, default=COLLECT_WORKERS, help='本机分片抓取的进程数，大于 1 时按分片并行抓取后合并')
+    return parser.parse_args()
+
+def collect_and_process(collector, run_store, resume):
+    """抓取、筛选、总结；resume 时从最靠后的已完成阶段继续"""
+    if resume and run_store.has(STAGE_PROCESSED):
+        logger.info("⏩ 检查点: 复用已总结的新闻")
+        return run_store.load_articles(STAGE_PROCESSED)
+        
+    if resume and run_store.has(STAGE_SELECTED):
+        logger.info("⏩ 检查点: 复用已筛选的新闻，继续总结")
+        selected_articles = run_store.load_articles(STAGE_SELECTED)
+    elif resume and run_store.has(STAGE_COLLECTED):
+        logger.info("⏩ 检查点: 复用已抓取的新闻，继续筛选和总结")
+        selected_articles = collector.filter_and_categorize(run_store.load_articles(STAGE_COLLECTED))
+        run_store.save_articles(STAGE_SELECTED, selected_articles)
+    else:
+        processed_articles = collector.run_pipeline(run_store)
+        logger.info("\n" + collector.source_health.scoreboard())
+        return processed_articles
+        
+    logger.info("\n🔄 正在处理和总结新闻...")
+    processed_articles = collector.summarize_articles(selected_articles)
+    run_store.save_articles(STAGE_PROCESSED, processed_articles)
+    return processed_articles
+
+def collect_only(collector, run_store, workers=1):
+    """只抓取：结果写入 collected 检查点，AI客户端不会被创建"""
+    run_store.clear()
+    if workers > 1:
+        collect_parallel(run_store, workers)
+        articles = merge_shards(run_store)
+    else:
+        articles = collector.collect_all_news()
+        run_store.save_articles(STAGE_COLLECTED, articles)
+        logger.info("\n" + collector.source_health.scoreboard())
+    logger.info(f"✅ 已抓取 {len(articles)} 条新闻并写入检查点，运行 python main.py --resume 继续筛选、总结和发送")
+
+def dry_run(collector):
+    """演练：抓取、筛选、总结并打印日报，不发送，也不写检查点和已推送记录"""
+    processed_articles = collector.run_pipeline()
+    if not processed_articles:
+        logger.warning("未收集到任何新闻，退出执行")
+        return
+    with metrics.timer('stage', stage='report'):
+        report = collector.generate_daily_report(processed_articles, datetime.now().strftime('%Y年%m月%d日'))
+    logger.info("\n" + report)
+    logger.info("🧪 演练模式：未发送日报，未记录已推送新闻")
+
+def main(resume=False, dry=False, collect=False, shard=None, merge=False, workers=1):
     """主函数"""
     logger.info("=" * 60)
     logger.info("🤖 AI Daily News Collector Started")
     logger.info(f"⏰ 执行时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     logger.info("=" * 60)
     
+    if dry:
+        dry_run(NewsCollector())
+        return
+    
+    run_store = RunStore()
+    if shard:
+        collect_shard(*shard, run_store.run_date, run_store.root)
+        return
+    if collect:
+        collect_only(NewsCollector(), run_store, workers)
+        return
+        
+    if resume:
+        completed = run_store.completed_stages()
+        logger.info(f"📌 断点续跑: {run_store.run_date} 已完成阶段 {', '.join(completed) if completed else '无'}")
+        if STAGE_SENT in completed:
+            logger.info("✅ 今日日报已发送，无需重复执行")
+            return
+    else:
+        run_store.clear(keep_shards=merge)
+    
     collector = NewsCollector()
+    # 分片抓取（本机多进程，或CI矩阵中的各个任务已写出分片结果）后合并为 collected 检查点，再从该阶段继续
+    if (merge or workers > 1) and not run_store.has(STAGE_COLLECTED):
+        if not merge:
+            collect_parallel(run_store, workers)
+        merge_shards(run_store)
+        resume = True
     
-    articles = collector.collect_all_news()
+    processed_articles = collect_and_process(collector, run_store, resume)
     
-    if not articles:
+    if not processed_articles:
         logger.warning("未收集到任何新闻，退出执行")
         return
-        
-    processed_articles = collector.process_articles(articles)
     
-    date_str = datetime.now().strftime('%Y年%m月%d日')
-    report = collector.generate_daily_report(processed_articles, date_str)
+    # 日期取自运行记录，续跑跨过零点时卡片内容与首次运行一致，已送达的卡片能被识别
+    date_str = datetime.strptime(run_store.run_date, '%Y-%m-%d').strftime('%Y年%m月%d日')
+    if resume and run_store.has(STAGE_REPORT):
+        logger.info("⏩ 检查点: 复用已生成的日报")
+        report = run_store.load_report()
+    else:
+        with metrics.timer('stage', stage='report'):
+            report = collector.generate_daily_report(processed_articles, date_str)
+        run_store.save_report(report)
     
     logger.info("\n" + "=" * 60)
     logger.info("生成的日报预览:")
     logger.info("=" * 60)
     logger.info("\n" + report)
     
-    logger.info(f"飞书Webhook URL配置状态: {'已配置' if os.environ.get('FEISHU_WEBHOOK_URL') else '未配置'}")
-    if os.environ.get('FEISHU_WEBHOOK_URL'):
+    logger.info(f"飞书Webhook URL配置状态: {f'已配置 {len(FEISHU_WEBHOOK_URLS)} 个' if FEISHU_WEBHOOK_URLS else '未配置'}")
+    if FEISHU_WEBHOOK_URLS:
         sender = FeishuSender()
         logger.info("开始发送消息到飞书...")
-        # 尝试使用更简单可靠的文本消息格式
-        success = sender.send_text_message(report)
+        # 默认发送交互卡片；FEISHU_MESSAGE_FORMAT=text 时发送纯文本。超长时都按类别和文章拆成多条
+        with metrics.timer('stage', stage='send'):
+            if FEISHU_MESSAGE_FORMAT == 'text':
+                success = sender.send_report(report, delivered=run_store.delivery_log())
+            else:
+                success = sender.send_card(processed_articles, date_str, delivered=run_store.delivery_log())
         logger.info(f"飞书消息发送结果: {'成功' if success else '失败'}")
+        if success:
+            run_store.mark_sent()
+            collector.mark_reported(processed_articles)
     else:
         logger.warning("未配置飞书Webhook URL，跳过发送")
         
@@ -62,4 +172,16 @@ def main():
     logger.info("=" * 60)
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    try:
+        if args.daemon:
+            from daemon import run_daemon
+            run_daemon()
+        else:
+            main(resume=args.resume, dry=args.dry_run, collect=args.collect_only,
+                 shard=args.shard, merge=args.merge, workers=args.workers)
+    finally:
+        close_routers()
+        close_client()
+        metrics.log_summary()
+        metrics.export()
@@ -0,0 +1,170 @@
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+from config import METRICS_REPORT_FILE, METRICS_PROMETHEUS_FILE, METRICS_PREFIX
+
+logger = logging.getLogger(__name__)
+
+def _label_text(labels):
+    return ','.join(f'{key}={value}' for key, value in labels)
+
+def _prometheus_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        f'{key}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for key, value in labels
+    )
+    return '{' + ','.join(escaped) + '}'
+
+class Metrics:
+    """进程内的轻量指标：计数器和计时器，可按标签区分，线程安全。
+
+    运行结束时导出为JSON运行报告，可选导出Prometheus文本格式（供 node_exporter 的 textfile 收集器读取）。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.timers = {}
+        self.started_at = time.time()
+
+    @staticmethod
+    def _key(name, labels):
+        return (name, tuple(sorted(labels.items())))
+
+    def incr(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        """记录一次耗时（秒）"""
+        key = self._key(name, labels)
+        with self._lock:
+            stat = self.timers.get(key)
+            if stat is None:
+                self.timers[key] = [1, seconds, seconds]
+            else:
+                stat[0] += 1
+                stat[1] += seconds
+                stat[2] = max(stat[2], seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.timers.clear()
+            self.started_at = time.time()
+
+    def snapshot(self):
+        """当前指标的可JSON序列化快照"""
+        with self._lock:
+            counters = {
+                f'{name}{{{_label_text(labels)}}}' if labels else name: value
+                for (name, labels), value in sorted(self.counters.items())
+            }
+            timers = {
+                f'{name}{{{_label_text(labels)}}}' if labels else name: {
+                    'count': count,
+                    'total': round(total, 6),
+                    'avg': round(total / count, 6),
+                    'max': round(maximum, 6)
+                }
+                for (name, labels), (count, total, maximum) in sorted(self.timers.items())
+            }
+        return {
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat(timespec='seconds'),
+            'duration': round(time.time() - self.started_at, 3),
+            'counters': counters,
+            'timers': timers
+        }
+
+    def prometheus_text(self):
+        """Prometheus 文本格式：计数器为 *_total，计时器为 *_seconds 的 count/sum/max"""
+        lines = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            timers = sorted(self.timers.items())
+        declared = set()
+        for (name, labels), value in counters:
+            metric = f'{METRICS_PREFIX}_{name}_total'
+            if metric not in declared:
+                lines.append(f'# TYPE {metric} counter')
+                declared.add(metric)
+            lines.append(f'{metric}{_prometheus_labels(labels)} {value}')
+        # 同一指标族的样本必须连续输出，因此 summary 与 max 分两组
+        families = {}
+        for (name, labels), stat in timers:
+            families.setdefault(name, []).append((labels, stat))
+        for name, samples in families.items():
+            metric = f'{METRICS_PREFIX}_{name}_seconds'
+            lines.append(f'# TYPE {metric} summary')
+            for labels, (count, total, maximum) in samples:
+                label_text = _prometheus_labels(labels)
+                lines.append(f'{metric}_count{label_text} {count}')
+                lines.append(f'{metric}_sum{label_text} {total:.6f}')
+            lines.append(f'# TYPE {metric}_max gauge')
+            for labels, (count, total, maximum) in samples:
+                lines.append(f'{metric}_max{_prometheus_labels(labels)} {maximum:.6f}')
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _write(path, text):
+        path = Path(path)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(path.suffix + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+            return True
+        except OSError as e:
+            logger.warning(f"指标文件写入失败 {path}: {e}")
+            return False
+
+    def export(self, report_path=None, prometheus_path=None):
+        """写出JSON运行报告；配置了 METRICS_PROMETHEUS_FILE 时同时写出Prometheus文本"""
+        report_path = report_path or METRICS_REPORT_FILE
+        if self._write(report_path, json.dumps(self.snapshot(), ensure_ascii=False, indent=2)):
+            logger.info(f"📊 运行报告已写入: {report_path}")
+        prometheus_path = prometheus_path or METRICS_PROMETHEUS_FILE
+        if prometheus_path:
+            self._write(prometheus_path, self.prometheus_text())
+
+    def log_summary(self):
+        """输出各阶段耗时和主要计数"""
+        snapshot = self.snapshot()
+        stages = {key: value for key, value in snapshot['timers'].items() if key.startswith('stage{')}
+        if not stages and not snapshot['counters']:
+            return
+        logger.info("⏱️ 阶段耗时:")
+        for key, stat in stages.items():
+            logger.info(f"  {key[len('stage{stage='):-1]}: {stat['total']:.2f}s")
+        counters = snapshot['counters']
+        logger.info(
+            f"  下载 {counters.get('http_bytes_downloaded', 0) / 1024:.0f} KB，"
+            f"AI请求 {counters.get('llm_requests', 0)} 次（缓存命中 {counters.get('llm_cache_hits', 0)} 次，"
+            f"重试 {sum(v for k, v in counters.items() if k.startswith('llm_retries'))} 次），"
+            f"消耗 tokens {counters.get('llm_prompt_tokens', 0)} + {counters.get('llm_completion_tokens', 0)}"
+        )
+
+# 进程内共享的指标实例
+metrics = Metrics()
@@ -1,264 +1,600 @@
 import os
 import sys
 import json
+import time
+import random
+import asyncio
 import logging
+import threading
+import importlib.util
+import contextlib
+import contextvars
+import email.utils
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from urllib.parse import urlsplit
 
 current_dir = Path(__file__).parent
 sys.path.insert(0, str(current_dir))
 
-try:
-    import requests
-    import feedparser
-    from bs4 import BeautifulSoup
-    from openai import OpenAI
-    import httpx
-except ImportError as e:
-    logging.error(f"导入依赖失败: {e}")
-    logging.info("请运行: pip install -r requirements.txt")
-    sys.exit(1)
-
 from config import (
-    FEISHU_WEBHOOK_URL,
-    NEWS_CATEGORIES,
     CATEGORY_KEYWORDS,
     DATETIME_FORMAT,
-    MAX_NEWS_PER_CATEGORY,
-    TOTAL_NEWS_COUNT,
-    RSS_SOURCES,
-    HTTP_SOURCES,
+    FETCH_CONCURRENCY,
+    FETCH_PER_HOST_LIMIT,
+    FETCH_TIMEOUT,
+    FETCH_DEADLINE,
+    LLM_CONCURRENCY,
+    LLM_MAX_RETRIES,
+    LLM_BACKOFF_BASE,
+    LLM_BACKOFF_MAX,
+    LLM_SUMMARY_MODE,
+    LLM_BATCH_SIZE,
+    LLM_TIMEOUT,
+    LLM_STREAMING,
+    LLM_INPUT_MAX_TOKENS,
+    LLM_SUMMARY_MAX_TOKENS,
+    LLM_SPECULATIVE_BUDGET_SHARE,
+    LLM_SPECULATIVE_DEPTH,
+    LLM_PROMPT_VERSION,
+    LLM_CACHE_FILE,
+    LLM_CACHE_TTL_DAYS,
+    LLM_CACHE_MAX_ENTRIES,
+    SEEN_STORE_FILE,
+    SEEN_RETENTION_DAYS,
+    SKIP_SEEN_ARTICLES,
+    ENRICH_ENABLED,
+    EMBED_ENABLED,
+    EMBED_API_KEY,
+    HTTP_CACHE_FILE,
+    SOURCE_HEALTH_FILE,
     AI_PROVIDER,
     OPENAI_API_KEY,
-    DEEPSEEK_API_KEY,
-    DEEPSEEK_API_BASE
+    DEEPSEEK_API_KEY
 )
+from http_cache import HttpCache
+from sources import load_sources, select_shard, shard_path
+from feed_parser import parse_feed
+from result_cache import ResultCache
+from llm_router import LLMRouter, configured_providers
+from token_budget import TokenBudget, BudgetExhausted, count_tokens, truncate_to_tokens, message_tokens
+from seen_store import SeenStore
+from extractor import ArticleExtractor
+from embeddings import EmbeddingClassifier
+from classifier import KeywordClassifier
+from pipeline import ArticleSelector
+from report_renderer import group_by_category
+from article import Article
+from http_client import create_async_client
+from source_health import SourceHealth, OPEN, HALF_OPEN
+from metrics import metrics
+from run_store import STAGE_COLLECTED, STAGE_SELECTED, STAGE_PROCESSED
 
 logger = logging.getLogger(__name__)
 
+# 当前抓取任务的超时（由新闻源健康记录自适应计算，每个任务独立）
+_source_timeout = contextvars.ContextVar('source_timeout', default=FETCH_TIMEOUT)
+# 当前抓取任务的网络请求耗时（不含排队等待并发名额的时间）
+_request_latencies = contextvars.ContextVar('request_latencies', default=None)
+
 class NewsCollector:
-    def __init__(self):
-        self.articles = []
-<<<<<<< HEAD
-        self.client = None
+    # 源类型 -> 抓取与解析方法
+    FETCHERS = {
+        'rss': 'parse_rss_feed',
+        'hn': 'fetch_hacker_news',
+        'reddit': 'fetch_reddit',
+        'weibo': 'fetch_weibo'
+    }
+
+    def __init__(self, sources=None, shard=None):
+        """sources 默认读取新闻源注册表；shard=(i, N) 时只抓取第 i 个分片的源，并使用该分片自己的缓存文件"""
+        self.sources = load_sources() if sources is None else load_sources(sources)
+        self.shard = shard
+        if shard is not None:
+            self.sources = select_shard(self.sources, *shard)
+        self._http = None
+        self._fetch_semaphore = None
+        self._host_semaphores = {}
+        self.http_cache = HttpCache(shard_path(HTTP_CACHE_FILE, shard))
+        self.source_health = SourceHealth(shard_path(SOURCE_HEALTH_FILE, shard))
+        self.classifier = KeywordClassifier(CATEGORY_KEYWORDS)
+        # 向量分类优先，不可用时（未安装 numpy、没有密钥、请求失败）退回关键词分类
+        self.embedding_classifier = EmbeddingClassifier() if EMBED_ENABLED and EMBED_API_KEY else None
+        self.seen_store = SeenStore(SEEN_STORE_FILE, SEEN_RETENTION_DAYS)
+        self.llm_cache = ResultCache(LLM_CACHE_FILE, LLM_CACHE_TTL_DAYS, LLM_CACHE_MAX_ENTRIES)
+        self.extractor = ArticleExtractor() if ENRICH_ENABLED else None
+        self._llm_pause_until = 0.0
+        self._llm_pause_lock = threading.Lock()
+        # 本次运行的AI预算，只在生成日报期间存在；突发新闻等零散请求不受限
+        self.llm_budget = None
+        self._llm_local = threading.local()
         self.ai_provider = AI_PROVIDER.lower()
         
         logger.info(f"AI提供商配置: {self.ai_provider}")
         logger.info(f"DEEPSEEK_API_KEY是否存在: {'是' if DEEPSEEK_API_KEY else '否'}")
         logger.info(f"OPENAI_API_KEY是否存在: {'是' if OPENAI_API_KEY else '否'}")
         
-        # 初始化AI客户端
-        if self.ai_provider == 'deepseek':
-            if DEEPSEEK_API_KEY:
-                logger.info("正在初始化DeepSeek客户端...")
-                self.client = OpenAI(
-                    api_key=DEEPSEEK_API_KEY,
-                    base_url=DEEPSEEK_API_BASE
-                )
-                logger.info("DeepSeek客户端初始化成功")
-            else:
-                logger.error("DeepSeek API密钥不存在，无法初始化客户端")
-        elif self.ai_provider == 'openai':
-            if OPENAI_API_KEY:
-                logger.info("正在初始化OpenAI客户端...")
-                self.client = OpenAI(
-                    api_key=OPENAI_API_KEY
-                )
-                logger.info("OpenAI客户端初始化成功")
-            else:
-                logger.error("OpenAI API密钥不存在，无法初始化客户端")
-        
-        if not self.client:
+        # 主提供商在前，其余配置了密钥的提供商用于对冲与故障切换；客户端在第一次请求时才创建（导入 openai 耗时较长）
+        self.router = LLMRouter(configured_providers(self.ai_provider))
+        self.llm_enabled = bool(self.router.providers)
+        if not self.llm_enabled:
+            if self.ai_provider in ('deepseek', 'openai'):
+                logger.error(f"{self.ai_provider} API密钥不存在，无法初始化客户端")
             logger.warning("未配置有效的AI API密钥，将使用原始标题")
-=======
-        self.client = OpenAI(
-            api_key=os.environ.get('OPENAI_API_KEY', ''),
-<<<<<<< HEAD
-=======
-            http_client=httpx(proxies=os.environ.get('HTTP_PROXY', None))
->>>>>>> 8af3ff9 (feat: 初始化AI新闻日报项目)
-        )
->>>>>>> a60790c (feat: 添加详细调试日志和配置文件修复)
-        
-    def parse_rss_feed(self, feed_url, source_name):
+        elif importlib.util.find_spec('openai') is None:
+            logger.error("导入依赖失败: 未安装 openai")
+            logger.info("请运行: pip install -r requirements.txt")
+            self.llm_enabled = False
+        else:
+            logger.info(f"AI提供商顺序: {' → '.join(provider.name for provider in self.router.providers)}")
+            
+    async def parse_rss_feed(self, source):
         """解析RSS订阅源"""
+        feed_url, source_name = source.url, source.name
         try:
-            logger.info(f"正在解析RSS源: {source_name}")
+            logger.debug("正在解析RSS源: %s", source_name)
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
             }
-            response = httpx.get(feed_url, headers=headers, timeout=30.0)
-            response.raise_for_status()
-            
-            feed = feedparser.parse(response.text)
-            
-            for entry in feed.entries[:10]:
-                article = {
-                    'title': entry.get('title', '').strip(),
-                    'link': entry.get('link', '').strip(),
-                    'published': entry.get('published', '').strip() or entry.get('updated', '').strip(),
-                    'summary': entry.get('summary', '').strip(),
-                    'source': source_name,
-                    'language': 'en'
-                }
-                if article['title'] and article['link']:
-                    self.articles.append(article)
+            response = await self._get(feed_url, headers=headers)
+            if self._not_modified(feed_url, response):
+                return self._reuse_cached(feed_url, source_name)
+                
+            with metrics.timer('parse', kind='rss'):
+                entries = parse_feed(response.content, limit=10)
+            
+            articles = []
+            for entry in entries:
+                article = Article(
+                    title=entry['title'].strip(),
+                    link=entry['link'].strip(),
+                    published=entry['published'].strip() or entry['updated'].strip(),
+                    summary=entry['summary'].strip(),
+                    source=source_name,
+                    language='en'
+                )
+                if article.title and article.link:
+                    articles.append(article)
                     
-            logger.info(f"  ✓ 从 {source_name} 获取 {min(10, len(feed.entries))} 条新闻")
+            self.http_cache.store(feed_url, response, [article.to_dict() for article in articles])
+            logger.info(f"  ✓ 从 {source_name} 获取 {len(entries)} 条新闻")
+            return articles
             
         except Exception as e:
             logger.error(f"  ✗ 解析 {source_name} 失败: {e}")
+            raise
             
-    def fetch_hacker_news(self, source_config):
+    async def fetch_hacker_news(self, source):
         """获取Hacker News"""
         try:
-            logger.info(f"正在获取: {source_config['name']}")
+            logger.debug("正在获取: %s", source.name)
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
             }
-            response = httpx.get(source_config['url'], headers=headers, timeout=30.0)
-            response.raise_for_status()
-            
-            data = response.json()
+            response = await self._get(source.url, headers=headers)
+            if self._not_modified(source.url, response):
+                return self._reuse_cached(source.url, source.name)
+                
+            with metrics.timer('parse', kind='json'):
+                data = response.json()
             hn_items = data.get('data', {}).get('children', [])[:30]
             
+            articles = []
             for item in hn_items:
                 story = item.get('data', {})
                 if story.get('score', 0) >= 50:
                     title = story.get('title', '')
                     url = f"https://news.ycombinator.com/item?id={story.get('id')}"
                     
-                    article = {
-                        'title': title,
-                        'link': url,
-                        'published': datetime.now().isoformat(),
-                        'summary': '',
-                        'source': source_config['name'],
-                        'language': 'en',
-                        'score': story.get('score', 0)
-                    }
-                    self.articles.append(article)
+                    article = Article(
+                        title=title,
+                        link=url,
+                        published=datetime.now().isoformat(),
+                        summary='',
+                        source=source.name,
+                        language='en',
+                        score=story.get('score', 0),
+                        content_url=story.get('url')
+                    )
+                    articles.append(article)
                     
-            logger.info(f"  ✓ 从 {source_config['name']} 获取热门新闻")
+            self.http_cache.store(source.url, response, [article.to_dict() for article in articles])
+            logger.info(f"  ✓ 从 {source.name} 获取热门新闻")
+            return articles
             
         except Exception as e:
-            logger.error(f"  ✗ 获取 {source_config['name']} 失败: {e}")
+            logger.error(f"  ✗ 获取 {source.name} 失败: {e}")
+            raise
             
-    def fetch_reddit(self, source_config):
+    async def fetch_reddit(self, source):
         """获取Reddit数据"""
         try:
-            logger.info(f"正在获取: {source_config['name']}")
+            logger.debug("正在获取: %s", source.name)
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
             }
-            response = httpx.get(source_config['url'], headers=headers, timeout=30.0)
-            response.raise_for_status()
-            
-            data = response.json()
+            response = await self._get(source.url, headers=headers)
+            if self._not_modified(source.url, response):
+                return self._reuse_cached(source.url, source.name)
+                
+            with metrics.timer('parse', kind='json'):
+                data = response.json()
             posts = data.get('data', {}).get('children', [])[:20]
             
+            articles = []
             for post in posts:
                 post_data = post.get('data', {})
                 title = post_data.get('title', '')
                 self_url = f"https://www.reddit.com{post_data.get('permalink', '')}"
                 
-                article = {
-                    'title': title,
-                    'link': self_url,
-                    'published': datetime.fromtimestamp(post_data.get('created_utc', 0)).isoformat(),
-                    'summary': post_data.get('selftext', '')[:500],
-                    'source': source_config['name'],
-                    'language': 'en',
-                    'score': post_data.get('score', 0)
-                }
-                self.articles.append(article)
+                article = Article(
+                    title=title,
+                    link=self_url,
+                    published=datetime.fromtimestamp(post_data.get('created_utc', 0)).isoformat(),
+                    summary=post_data.get('selftext', '')[:500],
+                    source=source.name,
+                    language='en',
+                    score=post_data.get('score', 0),
+                    content_url=post_data.get('url_overridden_by_dest')
+                )
+                articles.append(article)
                 
-            logger.info(f"  ✓ 从 {source_config['name']} 获取 {len(posts)} 条新闻")
+            self.http_cache.store(source.url, response, [article.to_dict() for article in articles])
+            logger.info(f"  ✓ 从 {source.name} 获取 {len(posts)} 条新闻")
+            return articles
             
         except Exception as e:
-            logger.error(f"  ✗ 获取 {source_config['name']} 失败: {e}")
+            logger.error(f"  ✗ 获取 {source.name} 失败: {e}")
+            raise
             
-    def fetch_weibo(self, source_config):
+    async def fetch_weibo(self, source):
         """获取微博数据"""
         try:
-            logger.info(f"正在获取: {source_config['name']}")
+            logger.debug("正在获取: %s", source.name)
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
                 'cookie': os.environ.get('WEIBO_COOKIE', '')
             }
-            response = httpx.get(source_config['url'], headers=headers, timeout=30.0)
-            response.raise_for_status()
-            
-            data = response.json()
+            response = await self._get(source.url, headers=headers)
+            if self._not_modified(source.url, response):
+                return self._reuse_cached(source.url, source.name)
+                
+            with metrics.timer('parse', kind='json'):
+                data = response.json()
+            articles = []
             if data.get('ok') == 1:
                 list_data = data.get('list', [])
                 for item in list_data[:10]:
                     text = item.get('text_raw', '') or item.get('text', '')
-                    article = {
-                        'title': text[:100] + '...' if len(text) > 100 else text,
-                        'link': f"https://weibo.com/0/statuses/{item.get('mid', '')}",
-                        'published': item.get('created_at', ''),
-                        'summary': text,
-                        'source': source_config['name'],
-                        'language': 'zh',
-                        'attitudes_count': item.get('attitudes_count', 0)
-                    }
-                    if article['title']:
-                        self.articles.append(article)
+                    article = Article(
+                        title=text[:100] + '...' if len(text) > 100 else text,
+                        link=f"https://weibo.com/0/statuses/{item.get('mid', '')}",
+                        published=item.get('created_at', ''),
+                        summary=text,
+                        source=source.name,
+                        language='zh',
+                        attitudes_count=item.get('attitudes_count', 0)
+                    )
+                    if article.title:
+                        articles.append(article)
                         
-            logger.info(f"  ✓ 从 {source_config['name']} 获取微博动态")
+            self.http_cache.store(source.url, response, [article.to_dict() for article in articles])
+            logger.info(f"  ✓ 从 {source.name} 获取微博动态")
+            return articles
             
         except Exception as e:
-            logger.error(f"  ✗ 获取 {source_config['name']} 失败: {e}")
+            logger.error(f"  ✗ 获取 {source.name} 失败: {e}")
+            raise
+            
+    def _not_modified(self, url, response):
+        """304，或没有校验头但响应内容与上次完全相同时，视为未更新，跳过解析"""
+        return response.status_code == 304 or self.http_cache.unchanged(url, response.content)
+        
+    def _reuse_cached(self, url, source_name):
+        """源未更新（304）时复用上次解析的文章"""
+        articles = [Article.from_dict(data) for data in self.http_cache.cached_articles(url)]
+        logger.info(f"  ✓ {source_name} 未更新，复用缓存中的 {len(articles)} 条新闻")
+        return articles
+        
+    async def _get(self, url, headers=None):
+        """在全局与单主机并发限制下发起条件GET请求，304直接返回"""
+        headers = self.http_cache.conditional_headers(url, headers)
+        host = urlsplit(url).hostname or ''
+        host_semaphore = self._host_semaphores.get(host)
+        if host_semaphore is None:
+            host_semaphore = self._host_semaphores[host] = asyncio.Semaphore(FETCH_PER_HOST_LIMIT)
+            
+        # 先占用主机名额再占用全局名额，避免排队等待同一主机时占住全局并发
+        async with host_semaphore:
+            async with self._fetch_semaphore:
+                started = time.perf_counter()
+                response = await self._http.get(url, headers=headers, timeout=_source_timeout.get())
+                elapsed = time.perf_counter() - started
+                latencies = _request_latencies.get()
+                if latencies is not None:
+                    latencies.append(elapsed)
+        metrics.observe('http_request', elapsed)
+        metrics.incr('http_requests', status=response.status_code)
+        metrics.incr('http_bytes_downloaded', response.num_bytes_downloaded)
+        if response.status_code == 304:
+            return response
+        response.raise_for_status()
+        return response
+        
+    async def _fetch_source(self, source):
+        """按健康记录决定跳过、试探或正常抓取一个源，并记录耗时和结果"""
+        key, name, kind = source.key, source.name, source.type
+        fetch = getattr(self, self.FETCHERS[kind])
+        state = self.source_health.state(key, name)
+        if state == OPEN:
+            logger.info(f"  ⏸ {name} 处于熔断冷却期，本次跳过")
+            self.source_health.record_skipped(key, name)
+            metrics.incr('sources_skipped', kind=kind)
+            return []
+        if state == HALF_OPEN:
+            logger.info(f"  ↻ {name} 熔断冷却期已过，试探抓取")
             
+        _source_timeout.set(self.source_health.timeout_for(key, name))
+        latencies = []
+        _request_latencies.set(latencies)
+        started = time.perf_counter()
+        try:
+            articles = await fetch(source)
+        except asyncio.CancelledError:
+            self.source_health.record_failure(key, name, time.perf_counter() - started, TimeoutError("超过采集总时限"))
+            metrics.incr('fetch_errors', kind=kind)
+            raise
+        except Exception as e:
+            self.source_health.record_failure(key, name, time.perf_counter() - started, e)
+            metrics.incr('fetch_errors', kind=kind)
+            return []
+        elapsed = time.perf_counter() - started
+        metrics.observe('fetch', elapsed, kind=kind)
+        metrics.incr('articles_fetched', len(articles), kind=kind)
+        self.source_health.record_success(key, name, elapsed, sum(latencies) if latencies else elapsed)
+        return articles
+        
+    def poll(self, source):
+        """抓取单个源，需在 fetch_session 内调用（守护进程按各源的间隔反复调用）"""
+        return self._fetch_source(source)
+        
+    def _source_tasks(self):
+        """为所有新闻源创建抓取协程，返回 (名称, 协程) 列表"""
+        return [(source.name, self._fetch_source(source)) for source in self.sources]
+        
+    @contextlib.asynccontextmanager
+    async def fetch_session(self):
+        """打开抓取会话：共享的异步客户端和并发限制；退出时保存条件请求缓存和健康记录"""
+        self._fetch_semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+        self._host_semaphores = {}
+        async with create_async_client(max_connections=FETCH_CONCURRENCY) as client:
+            self._http = client
+            try:
+                yield
+            finally:
+                self._http = None
+                self.http_cache.save()
+                self.source_health.save()
+                
+    async def iter_source_batches(self):
+        """并发抓取所有新闻源，按完成先后逐个产出每个源的文章列表；超过总时限的源会被取消"""
+        async with self.fetch_session():
+            tasks = {
+                asyncio.create_task(coro): name
+                for name, coro in self._source_tasks()
+            }
+            pending = set(tasks)
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + FETCH_DEADLINE
+            try:
+                while pending:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    done, pending = await asyncio.wait(
+                        pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        articles = task.result()
+                        if articles:
+                            yield articles
+            finally:
+                if pending:
+                    for task in pending:
+                        task.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
+                    names = ', '.join(tasks[task] for task in pending)
+                    logger.warning(f"  ⚠ 超过采集总时限 {FETCH_DEADLINE:.0f}s，已取消: {names}")
+                
     def collect_all_news(self):
-        """收集所有新闻"""
+        """收集所有新闻，返回完整列表（流式处理请使用 run_pipeline）"""
         logger.info("=" * 60)
         logger.info("开始收集AI新闻...")
         logger.info("=" * 60)
         
-        logger.info("\n📡 解析RSS订阅源...")
-        for category, feeds in RSS_SOURCES.items():
-            for feed_url in feeds:
-                source_name = feed_url.split('//')[1].split('/')[0]
-                self.parse_rss_feed(feed_url, source_name)
-                
-        logger.info("\n🌐 抓取网页新闻源...")
-        for category, sources in HTTP_SOURCES.items():
-            for source in sources:
-                if 'Hacker' in source['name']:
-                    self.fetch_hacker_news(source)
-                elif 'Reddit' in source['name']:
-                    self.fetch_reddit(source)
-                elif '微博' in source['name']:
-                    self.fetch_weibo(source)
+        async def gather_batches():
+            articles = []
+            async for batch in self.iter_source_batches():
+                articles.extend(batch)
+            return articles
+            
+        logger.info("\n📡 并发抓取RSS订阅源与网页新闻源...")
+        started = time.perf_counter()
+        with metrics.timer('stage', stage='collect'):
+            articles = asyncio.run(gather_batches())
+        elapsed = time.perf_counter() - started
                     
-        logger.info(f"\n✅ 共收集到 {len(self.articles)} 条新闻")
-        return self.articles
+        logger.info(f"\n✅ 共收集到 {len(articles)} 条新闻，耗时 {elapsed:.1f}s")
+        return articles
         
-    def categorize_article(self, article):
-        """为文章分类"""
-        title_lower = article['title'].lower()
-        summary_lower = (article.get('summary', '') or '').lower()
-        text = title_lower + ' ' + summary_lower
+    def categorize_articles(self, articles):
+        """为一批文章分类，返回 [(类别, AI相关度)]；关键词分类没有相关度，为 None"""
+        with metrics.timer('categorize'):
+            if self.embedding_classifier is not None:
+                results = self.embedding_classifier.classify(articles)
+                if results is not None:
+                    return results
+            return [(self.classifier.classify(article.title, article.summary), None) for article in articles]
         
-        for category, keywords in CATEGORY_KEYWORDS.items():
-            if category == '📊 其他要闻':
-                continue
-            for keyword in keywords:
-                if keyword.lower() in text:
-                    return category
+    @staticmethod
+    def _retry_after(error):
+        """从429等错误响应中读取 Retry-After（秒），没有时返回None"""
+        response = getattr(error, 'response', None)
+        if response is None:
+            return None
+        value = response.headers.get('retry-after-ms')
+        if value:
+            try:
+                return float(value) / 1000
+            except ValueError:
+                pass
+        value = response.headers.get('retry-after')
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            date_tuple = email.utils.parsedate_tz(value)
+            if date_tuple is None:
+                return None
+            return max(0.0, email.utils.mktime_tz(date_tuple) - time.time())
+            
+    def _chat(self, **kwargs):
+        """调用对话补全接口并返回回复文本；优先读本地缓存，命中缓存不占用预算。
+
+        提供商之间的对冲与切换由 LLMRouter 完成；所有提供商都限流/超时/5xx时按 Retry-After 或指数退避重试。
+        运行中有AI预算时，每次请求前按 提示词估算 + max_tokens 预留，预算用完或超时抛出 BudgetExhausted。
+        """
+        # 以主提供商和模型作为缓存命名空间，备用提供商的结果也记在同一个键下
+        cache_key = ResultCache.make_key(
+            self.router.primary.name,
+            self.router.primary.model,
+            LLM_PROMPT_VERSION,
+            kwargs.get('messages')
+        )
+        cached = self.llm_cache.get(cache_key)
+        if cached is not None:
+            metrics.incr('llm_cache_hits')
+            return cached
+        metrics.incr('llm_cache_misses')
+        # openai 已在创建客户端时导入，这里只取出需要退避重试的异常类型
+        from openai import RateLimitError, APITimeoutError, APIConnectionError, InternalServerError
+        # 突发新闻可能与日报同时生成，在各自线程中标记为不占用日报的预算
+        budget = None if getattr(self._llm_local, 'unbudgeted', False) else self.llm_budget
+        prompt_tokens = message_tokens(kwargs['messages'])
+            
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            # 任一线程被限流后，其它线程也等到同一时刻再发请求
+            wait = self._llm_pause_until - time.monotonic()
+            remaining = budget.remaining_time() if budget is not None else None
+            if remaining is not None:
+                # 不等到时间预算之后；等完仍被限流时由 reserve() 判定超时
+                wait = min(wait, remaining)
+            if wait > 0:
+                time.sleep(wait)
+                
+            reserved = budget.reserve(prompt_tokens + kwargs.get('max_tokens', 0)) if budget is not None else 0
+            used = 0
+            try:
+                params = dict(kwargs)
+                remaining = budget.remaining_time() if budget is not None else None
+                if remaining is not None:
+                    # 单次请求不超过剩余的时间预算
+                    params['timeout'] = max(1.0, min(LLM_TIMEOUT, remaining))
+                metrics.incr('llm_requests')
+                with metrics.timer('llm_request'):
+                    content, usage = self._complete(params, budget, prompt_tokens)
+                prompt_used, completion_used = usage or (prompt_tokens, count_tokens(content))
+                used = prompt_used + completion_used
+                metrics.incr('llm_prompt_tokens', prompt_used)
+                metrics.incr('llm_completion_tokens', completion_used)
+                if content.strip():
+                    self.llm_cache.set(cache_key, content)
+                return content
+            except BudgetExhausted as e:
+                # 中途停止的流式回复：已生成的部分同样计入用量
+                used = e.used
+                raise
+            except (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError) as e:
+                if attempt >= LLM_MAX_RETRIES:
+                    metrics.incr('llm_errors', reason=type(e).__name__)
+                    raise
                     
-        return '📊 其他要闻'
+                delay = self._retry_after(e)
+                if delay is None:
+                    delay = LLM_BACKOFF_BASE * (2 ** attempt) + random.uniform(0, LLM_BACKOFF_BASE)
+                delay = min(delay, LLM_BACKOFF_MAX)
+                if budget is not None and budget.remaining_time() is not None and delay >= budget.remaining_time():
+                    metrics.incr('llm_errors', reason=type(e).__name__)
+                    raise BudgetExhausted(f"等待重试会超过AI时间预算({type(e).__name__})")
+                
+                if isinstance(e, RateLimitError):
+                    with self._llm_pause_lock:
+                        self._llm_pause_until = max(self._llm_pause_until, time.monotonic() + delay)
+                metrics.incr('llm_retries', reason=type(e).__name__)
+                logger.warning(f"AI接口暂不可用({type(e).__name__})，{delay:.1f}s 后第 {attempt + 1} 次重试")
+                time.sleep(delay)
+            finally:
+                if budget is not None:
+                    budget.settle(reserved, used)
+                    
+    def _complete(self, params, budget, prompt_tokens=0):
+        """发出一次请求，返回 (回复文本, (提示词tokens, 生成tokens))；接口没有返回用量时第二项为 None。
+
+        流式模式下边接收边拼接，记录首个分片的等待时间，超过时间预算时关闭连接并抛出 BudgetExhausted。
+        """
+        # 对冲请求与本次请求的预留量相同
+        hedge_tokens = prompt_tokens + params.get('max_tokens', 0)
+        if not LLM_STREAMING:
+            response = self.router.complete(budget, hedge_tokens, **params)
+            usage = getattr(response, 'usage', None)
+            content = response.choices[0].message.content or ''
+            return content, (usage.prompt_tokens or 0, usage.completion_tokens or 0) if usage is not None else None
+            
+        started = time.perf_counter()
+        stream = self.router.complete(budget, hedge_tokens, stream=True, **params)
+        parts = []
+        usage = None
+        first = True
+        try:
+            for chunk in stream:
+                if first:
+                    metrics.observe('llm_first_token', time.perf_counter() - started)
+                    first = False
+                if chunk.choices:
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        parts.append(delta)
+                # 部分提供商（如 DeepSeek）在最后一个分片中附带本次用量
+                usage = getattr(chunk, 'usage', None) or usage
+                if budget is not None and budget.expired:
+                    completion_tokens = count_tokens(''.join(parts))
+                    metrics.incr('llm_streams_aborted')
+                    metrics.incr('llm_prompt_tokens', prompt_tokens)
+                    metrics.incr('llm_completion_tokens', completion_tokens)
+                    raise BudgetExhausted("超过AI时间预算，已中断流式回复", used=prompt_tokens + completion_tokens)
+        finally:
+            stream.close()
+        if isinstance(usage, dict):
+            usage = (usage.get('prompt_tokens') or 0, usage.get('completion_tokens') or 0)
+        elif usage is not None:
+            usage = (usage.prompt_tokens or 0, usage.completion_tokens or 0)
+        return ''.join(parts), usage
+                
+    @staticmethod
+    def _title_reply_tokens(title):
+        """翻译标题的输出 token 上限：按原标题估算，译成中文通常要多用一些 token"""
+        return 2 * count_tokens(title) + 20
         
     def translate_to_chinese(self, text):
         """将英文翻译成中文，保持口语化"""
-        if not self.client:
+        if not self.llm_enabled:
             logger.warning("AI客户端未初始化，跳过翻译")
             return text
             
         try:
-            logger.info(f"开始翻译文本: {text[:50]}...")
+            logger.debug("开始翻译文本: %s...", text[:50])
             prompt = f"""
 请将以下英文文本翻译成中文，要求：
 1. 保持口语化，符合中国人的阅读习惯
@@ -269,49 +605,47 @@ class NewsCollector:
 文本：{text}
 """
             
-            # 根据AI提供商选择合适的模型
-            model = "deepseek-chat" if self.ai_provider == 'deepseek' else "gpt-3.5-turbo"
-            logger.info(f"使用模型: {model}")
             
-            response = self.client.chat.completions.create(
-                model=model,
+            reply = self._chat(
                 messages=[{"role": "user", "content": prompt}],
-                max_tokens=200,
+                max_tokens=self._title_reply_tokens(text),
                 temperature=0.7
             )
             
-            translation = response.choices[0].message.content.strip()
-            logger.info(f"翻译结果: {translation}")
+            translation = reply.strip()
+            logger.debug("翻译结果: %s", translation)
             return translation if translation else text
             
+        except BudgetExhausted:
+            raise
         except Exception as e:
             logger.error(f"翻译失败: {e}")
             return text
             
     def summarize_with_ai(self, article):
         """使用AI总结文章，生成中文口语化摘要"""
-        title = article['title']
-        summary = article.get('summary', '')[:500]
+        title = article.title
+        summary = truncate_to_tokens(article.summary, LLM_INPUT_MAX_TOKENS)
         
-        logger.info(f"处理文章: {title[:50]}...")
+        logger.debug("处理文章: %s...", title[:50])
         is_chinese = any(ord(c) > 127 for c in title)
-        logger.info(f"标题是否为中文: {'是' if is_chinese else '否'}")
+        logger.debug("标题是否为中文: %s", is_chinese)
         
         # 先将英文标题翻译成中文
         if is_chinese:
             chinese_title = title
-            logger.info(f"标题为中文，直接使用: {chinese_title}")
+            logger.debug("标题为中文，直接使用: %s", chinese_title)
         else:
             chinese_title = self.translate_to_chinese(title)
-            article['translated_title'] = chinese_title
-            logger.info(f"英文标题翻译为: {chinese_title}")
+            article.translated_title = chinese_title
+            logger.debug("英文标题翻译为: %s", chinese_title)
         
-        if not self.client:
-            logger.info("AI客户端未初始化，使用原始标题作为摘要")
+        if not self.llm_enabled:
+            logger.debug("AI客户端未初始化，使用原始标题作为摘要")
             return chinese_title
             
         try:
-            logger.info("开始生成摘要...")
+            logger.debug("开始生成摘要...")
             prompt = f"""
 请用一句大白话总结以下AI新闻标题和摘要（20-30字以内），使其通俗易懂：
 
@@ -324,100 +658,366 @@ class NewsCollector:
 3. 直接输出总结，不要添加任何解释
 """
             
-            # 根据AI提供商选择合适的模型
-            model = "deepseek-chat" if self.ai_provider == 'deepseek' else "gpt-3.5-turbo"
-            logger.info(f"使用模型: {model}")
             
-            response = self.client.chat.completions.create(
-                model=model,
+            reply = self._chat(
                 messages=[{"role": "user", "content": prompt}],
-                max_tokens=50,
+                max_tokens=LLM_SUMMARY_MAX_TOKENS,
                 temperature=0.7
             )
             
-            summary_text = response.choices[0].message.content.strip()
-            logger.info(f"生成的摘要: {summary_text}")
+            summary_text = reply.strip()
+            logger.debug("生成的摘要: %s", summary_text)
             return summary_text if summary_text else chinese_title
             
+        except BudgetExhausted:
+            raise
         except Exception as e:
             logger.error(f"AI总结失败: {e}")
             return chinese_title
             
-    def filter_and_categorize(self, articles):
-        """过滤和分类文章"""
-        unique_articles = {}
-        for article in articles:
-            link = article['link']
-            if link not in unique_articles:
-                unique_articles[link] = article
-                
-        unique_articles = list(unique_articles.values())
+    @staticmethod
+    def _parse_json_reply(text):
+        """解析模型返回的JSON，兼容```json代码块和前后多余文字"""
+        text = text.strip()
+        if text.startswith('```'):
+            text = text.strip('`')
+            if text.startswith('json'):
+                text = text[4:]
+        starts = [i for i in (text.find('{'), text.find('[')) if i >= 0]
+        if not starts:
+            raise ValueError("回复中没有JSON")
+        start = min(starts)
+        end = max(text.rfind('}'), text.rfind(']'))
+        return json.loads(text[start:end + 1])
         
-        categorized = {cat: [] for cat in NEWS_CATEGORIES.keys()}
+    def summarize_combined(self, article):
+        """一次请求同时完成标题翻译和摘要，解析失败时退回两次请求的方式"""
+        if not self.llm_enabled:
+            return self.summarize_with_ai(article)
+            
+        title = article.title
+        summary = truncate_to_tokens(article.summary, LLM_INPUT_MAX_TOKENS)
+        is_chinese = any(ord(c) > 127 for c in title)
         
-        for article in unique_articles:
-            category = self.categorize_article(article)
-            article['category'] = category
-            categorized[category].append(article)
-            
-        for category in categorized:
-            categorized[category].sort(
-                key=lambda x: x.get('score', 0) if 'score' in x else 0, 
-                reverse=True
+        try:
+            logger.debug("合并翻译与总结: %s...", title[:50])
+            prompt = f"""
+请处理以下AI新闻，以JSON格式输出，不要添加任何解释：
+{{"title": "中文标题", "summary": "一句大白话总结"}}
+
+标题: {title}
+摘要: {summary}
+
+要求：
+1. title：英文标题翻译成口语化、流畅自然的中文，中文标题原样保留
+2. summary：用简单的中文口语总结新闻内容（20-30字以内），不要包含公司名称
+"""
+            
+            reply = self._chat(
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=self._title_reply_tokens(title) + LLM_SUMMARY_MAX_TOKENS,
+                temperature=0.7
             )
             
-        final_selection = []
-        for category, articles in categorized.items():
-            final_selection.extend(articles[:MAX_NEWS_PER_CATEGORY])
+            data = self._parse_json_reply(reply)
+            chinese_title = title if is_chinese else str(data.get('title') or '').strip()
+            summary_text = str(data.get('summary') or '').strip()
+            if not chinese_title or not summary_text:
+                raise ValueError("JSON缺少title或summary")
+                
+        except BudgetExhausted:
+            raise
+        except Exception as e:
+            logger.warning(f"合并请求失败，改用分步翻译和总结: {e}")
+            return self.summarize_with_ai(article)
+            
+        if not is_chinese:
+            article.translated_title = chinese_title
+        return summary_text
+        
+    def summarize_batch(self, articles):
+        """把多篇文章放进一个请求，按编号取回结果；缺失或解析失败的文章逐篇处理"""
+        if not self.llm_enabled or len(articles) == 1:
+            return [self.summarize_article(article, self.summarize_combined) for article in articles]
+            
+        results = {}
+        try:
+            logger.debug("批量翻译与总结 %d 篇文章...", len(articles))
+            items = []
+            for i, article in enumerate(articles):
+                summary = truncate_to_tokens(article.summary, LLM_INPUT_MAX_TOKENS)
+                items.append(f"[{i}] 标题: {article.title}\n    摘要: {summary}")
+            items_text = '\n'.join(items)
+            prompt = f"""
+请处理以下{len(articles)}条AI新闻，以JSON数组输出，每条新闻对应一个对象，不要添加任何解释：
+[{{"index": 编号, "title": "中文标题", "summary": "一句大白话总结"}}]
+
+{items_text}
+
+要求：
+1. index：与新闻前方括号中的编号一致
+2. title：英文标题翻译成口语化、流畅自然的中文，中文标题原样保留
+3. summary：用简单的中文口语总结新闻内容（20-30字以内），不要包含公司名称
+"""
             
-        if len(final_selection) > TOTAL_NEWS_COUNT:
-            sorted_articles = sorted(
-                final_selection, 
-                key=lambda x: x.get('score', 0) if 'score' in x else 0, 
-                reverse=True
+            reply = self._chat(
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=sum(
+                    self._title_reply_tokens(article.title) + LLM_SUMMARY_MAX_TOKENS + 10 for article in articles
+                ),
+                temperature=0.7
             )
-            final_selection = sorted_articles[:TOTAL_NEWS_COUNT]
             
-        return final_selection
+            data = self._parse_json_reply(reply)
+            if isinstance(data, dict):
+                data = data.get('results') or data.get('items') or []
+            for item in data:
+                if not isinstance(item, dict):
+                    continue
+                try:
+                    index = int(item.get('index'))
+                except (TypeError, ValueError):
+                    continue
+                title = str(item.get('title') or '').strip()
+                summary_text = str(item.get('summary') or '').strip()
+                if 0 <= index < len(articles) and title and summary_text:
+                    results[index] = (title, summary_text)
+                    
+        except BudgetExhausted:
+            # 整批放不进剩余预算时逐篇处理，优先级高的文章仍可能单独放得下
+            pass
+        except Exception as e:
+            logger.warning(f"批量请求失败，改为逐篇处理: {e}")
+            
+        summaries = []
+        for i, article in enumerate(articles):
+            if i not in results:
+                summaries.append(self.summarize_article(article, self.summarize_combined))
+                continue
+            title, summary_text = results[i]
+            if not any(ord(c) > 127 for c in article.title):
+                article.translated_title = title
+            summaries.append(summary_text)
+        return summaries
         
-    def process_articles(self, articles):
-        """处理和总结文章"""
-        logger.info("\n🔄 正在处理和总结新闻...")
+    def _new_selector(self, on_admit=None, on_evict=None, admit_depth=None):
+        return ArticleSelector(
+            self.categorize_articles,
+            seen_store=self.seen_store if SKIP_SEEN_ARTICLES else None,
+            on_admit=on_admit,
+            on_evict=on_evict,
+            admit_depth=admit_depth
+        )
         
-        selected_articles = self.filter_and_categorize(articles)
+    def _log_selection(self, selector, selected_articles):
+        stats = selector.stats
+        logger.info(
+            f"  收到 {stats['received']} 条，重复链接 {stats['duplicates']} 条，"
+            f"已推送过 {stats['seen']} 条，与AI无关 {stats['irrelevant']} 条，近似重复 {stats['near_duplicates']} 条，"
+            f"入选 {len(selected_articles)} 条"
+        )
+        if self.embedding_classifier is not None:
+            cache = self.embedding_classifier.cache
+            cache.evict()
+            cache_stats = cache.stats()
+            logger.info(f"  向量缓存: 命中 {cache_stats['hits']} 条，未命中 {cache_stats['misses']} 条")
+        
+    def filter_and_categorize(self, articles):
+        """过滤和分类文章"""
+        with metrics.timer('stage', stage='filter'):
+            selector = self._new_selector()
+            selector.offer_batch(articles)
+            selected_articles = selector.selected()
+        self._log_selection(selector, selected_articles)
+        return selected_articles
+        
+    def summarize_article(self, article, summarize=None):
+        """总结一篇文章（默认按 LLM_SUMMARY_MODE）；AI预算用完时退回为已翻译的标题或原标题"""
+        if summarize is None:
+            summarize = self.summarize_combined if LLM_SUMMARY_MODE == 'combined' else self.summarize_with_ai
+        try:
+            return summarize(article)
+        except BudgetExhausted:
+            if self.llm_budget is not None:
+                self.llm_budget.record_fallback()
+            return article.display_title
+            
+    def summarize_breaking(self, article):
+        """突发新闻的即时总结：不占用（可能正在生成的）日报的AI预算"""
+        self._llm_local.unbudgeted = True
+        try:
+            return self.summarize_combined(article)
+        finally:
+            self._llm_local.unbudgeted = False
+            
+    def _speculate(self, article):
+        """抓取期间提前总结；预算已用去 LLM_SPECULATIVE_BUDGET_SHARE 时返回 None，留给最终按优先级排定的文章"""
+        if self.llm_budget is not None and self.llm_budget.share_used() >= LLM_SPECULATIVE_BUDGET_SHARE:
+            return None
+        return self.summarize_article(article)
         
+    @contextlib.contextmanager
+    def ai_budget(self):
+        """在 with 块内启用一份新的AI预算（LLM_TOKEN_BUDGET / LLM_TIME_BUDGET）"""
+        self.llm_budget = TokenBudget()
+        try:
+            yield self.llm_budget
+        finally:
+            self.llm_budget = None
+            
+    def _summarize_selected(self, selected_articles, executor, futures=None):
+        """在AI预算内按优先级总结入选文章，复用抓取期间已提前开始的任务；结果顺序与输入一致。
+
+        热度和AI相关度高的文章先提交，预算用完或超时后，排在后面的文章退回为标题。
+        """
+        futures = futures or {}
+        if self.extractor is not None and self.llm_enabled:
+            self.extractor.enrich(selected_articles)
+        if self.llm_budget is not None:
+            # 时间预算从这里开始计算，抓取期间的提前总结只占用 token 预算
+            self.llm_budget.start()
+        ordered = sorted(selected_articles, key=ArticleSelector.rank, reverse=True)
+        results = {}
+        if LLM_SUMMARY_MODE == 'batch':
+            batch_size = max(1, LLM_BATCH_SIZE)
+            batches = [ordered[i:i + batch_size] for i in range(0, len(ordered), batch_size)]
+            for batch, batch_summaries in zip(batches, executor.map(self.summarize_batch, batches)):
+                for article, summary in zip(batch, batch_summaries):
+                    results[id(article)] = summary
+        else:
+            pending = {}
+            for article in ordered:
+                future = futures.pop(id(article), None)
+                # 抓取期间提前提交但还没开始或让出了预算的任务，按优先级重新排队
+                if future is None or future.cancel() or (future.done() and future.result() is None):
+                    future = executor.submit(self.summarize_article, article)
+                pending[id(article)] = future
+            for article in ordered:
+                summary = pending[id(article)].result()
+                results[id(article)] = summary if summary is not None else self.summarize_article(article)
+        summaries = [results[id(article)] for article in selected_articles]
+            
+        for future in futures.values():
+            future.cancel()
+            
         processed_articles = []
-        for i, article in enumerate(selected_articles, 1):
-            article['index'] = i
-            article['summary_ai'] = self.summarize_with_ai(article)
+        for i, (article, summary_ai) in enumerate(zip(selected_articles, summaries), 1):
+            article.index = i
+            article.summary_ai = summary_ai
             processed_articles.append(article)
             
+        self.llm_cache.evict()
+        stats = self.llm_cache.stats()
         logger.info(f"  ✓ 处理完成 {len(processed_articles)} 条新闻")
+        logger.info(f"  AI结果缓存: 命中 {stats['hits']} 次，未命中 {stats['misses']} 次，淘汰 {stats['evictions']} 条")
+        if self.llm_budget is not None:
+            budget_stats = self.llm_budget.stats()
+            limit = f"/{budget_stats['max_tokens']}" if budget_stats['max_tokens'] else ''
+            logger.info(
+                f"  AI预算: 已用约 {budget_stats['used']}{limit} tokens，"
+                f"{budget_stats['fallbacks']} 条因预算不足使用标题"
+            )
+        self.router.log_summary()
         return processed_articles
         
+    def summarize_articles(self, selected_articles):
+        """总结已筛选好的文章"""
+        with self.ai_budget(), ThreadPoolExecutor(max_workers=max(1, LLM_CONCURRENCY)) as executor, \
+                metrics.timer('stage', stage='summarize'):
+            return self._summarize_selected(selected_articles, executor)
+            
+    def process_articles(self, articles):
+        """处理和总结文章"""
+        logger.info("\n🔄 正在处理和总结新闻...")
+        
+        selected_articles = self.filter_and_categorize(articles)
+        return self.summarize_articles(selected_articles)
+            
+    def run_pipeline(self, run_store=None):
+        """流式流水线：抓取 → 去重 → 分类 → 每类Top-K → 总结。
+
+        每个来源抓取完成后立即进入选稿，文章排进某类Top-K的前 LLM_SPECULATIVE_DEPTH 名（且该类已满）时
+        就开始总结，被挤出时取消尚未开始的总结任务，因此总结与后续来源的抓取重叠进行。
+        已经发出的请求无法撤回，之后被挤出的文章仍会计费，见 LLM_SPECULATIVE_DEPTH。
+        传入 run_store 时把抓取、筛选、总结三个阶段的产出写入检查点。
+        """
+        logger.info("=" * 60)
+        logger.info("开始收集AI新闻...")
+        logger.info("=" * 60)
+        logger.info("\n📡 并发抓取新闻源，边抓取边筛选和总结...")
+        started = time.perf_counter()
+        
+        # 预算在整条流水线内有效：抓取期间提前开始的总结也计入
+        with self.ai_budget(), ThreadPoolExecutor(max_workers=max(1, LLM_CONCURRENCY)) as executor:
+            futures = {}
+            
+            def submit_speculative(article):
+                futures[id(article)] = executor.submit(self._speculate, article)
+                
+            def cancel_speculative(article):
+                future = futures.pop(id(article), None)
+                if future is not None:
+                    future.cancel()
+                    
+            # batch 模式需要凑齐一批再请求，开启正文补全时要先补全再总结，这两种情况都不做提前总结
+            if self.llm_enabled and LLM_SUMMARY_MODE != 'batch' and self.extractor is None and LLM_SPECULATIVE_DEPTH > 0:
+                selector = self._new_selector(submit_speculative, cancel_speculative, LLM_SPECULATIVE_DEPTH)
+            else:
+                selector = self._new_selector()
+            
+            async def feed_selector(write=None):
+                async for batch in self.iter_source_batches():
+                    if write:
+                        for article in batch:
+                            write(article.to_dict())
+                    # 分类可能要请求 embeddings 接口，放到线程中执行，不阻塞其它来源的抓取
+                    await asyncio.to_thread(selector.offer_batch, batch)
+                    
+            # 流式模式下抓取与筛选交织进行，合并计入 collect 阶段
+            with metrics.timer('stage', stage='collect'):
+                if run_store is not None:
+                    with run_store.writer(STAGE_COLLECTED) as write:
+                        asyncio.run(feed_selector(write))
+                else:
+                    asyncio.run(feed_selector())
+                selected_articles = selector.selected()
+            logger.info(f"\n✅ 抓取完成，耗时 {time.perf_counter() - started:.1f}s")
+            self._log_selection(selector, selected_articles)
+            if run_store is not None:
+                run_store.save_articles(STAGE_SELECTED, selected_articles)
+            
+            logger.info("\n🔄 正在处理和总结新闻...")
+            with metrics.timer('stage', stage='summarize'):
+                processed_articles = self._summarize_selected(selected_articles, executor, futures)
+            if run_store is not None:
+                run_store.save_articles(STAGE_PROCESSED, processed_articles)
+            return processed_articles
+            
+    def mark_reported(self, articles):
+        """记录已成功推送的文章，之后的日报不再重复收录"""
+        self.seen_store.mark_seen(articles)
+        logger.info(f"  ✓ 已记录 {len(articles)} 条已推送新闻")
+        
     def generate_daily_report(self, articles, date_str=None):
         """生成每日日报"""
         if not date_str:
             date_str = datetime.now().strftime(DATETIME_FORMAT)
             
+        metrics.incr('report_articles', len(articles))
         report_lines = []
         report_lines.append("━━━━━━━━━━━━━━━━━━━━")
         report_lines.append(f"📅 {date_str} AI新闻日报")
         report_lines.append("━━━━━━━━━━━━━━━━━━━━")
         report_lines.append("")
         
-        categories_order = ['🚀 产品发布', '💰 投融资', '🔬 技术突破', '🎯 行业观点', '📊 其他要闻']
-        
-        for category in categories_order:
-            category_articles = [a for a in articles if a.get('category') == category]
+        for category, category_articles in group_by_category(articles).items():
             if category_articles:
                 report_lines.append(f"{category}")
                 for article in category_articles:
                     # 使用翻译后的标题，如果没有则使用原始标题
-                    display_title = article.get('translated_title', article['title'])
-                    report_lines.append(f"{article['index']}. **{display_title}**")
-                    report_lines.append(f"   📝 {article['summary_ai']}")
-                    report_lines.append(f"   🔗 {article['link']}")
+                    report_lines.append(f"{article.index}. **{article.display_title}**")
+                    report_lines.append(f"   📝 {article.summary_ai}")
+                    report_lines.append(f"   🔗 {article.link}")
                     report_lines.append("")
                     
         report_lines.append("━━━━━━━━━━━━━━━━━━━━")
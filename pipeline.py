@@ -0,0 +1,165 @@
+import sys
+import heapq
+import logging
+from pathlib import Path
+
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+from config import (
+    NEWS_CATEGORIES,
+    MAX_NEWS_PER_CATEGORY,
+    TOTAL_NEWS_COUNT,
+    NEAR_DUP_ENABLED,
+    EMBED_MIN_RELEVANCE
+)
+from dedup import MinHashLSH, article_text, representative_key
+
+logger = logging.getLogger(__name__)
+
+class ArticleSelector:
+    """流式选稿：逐批去重、分类，并放入每个类别的有界小顶堆。
+
+    内存只与保留下来的文章数有关，与输入总量无关；文章进入或被挤出堆时
+    通过 on_admit / on_evict 回调通知调用方（用于提前开始总结）。
+    给出 admit_depth 时，只在文章排进已满的堆的前 admit_depth 名时才调用 on_admit（每篇至多一次），
+    刚进入堆尾、很可能随后被挤出的文章不通知。
+    categorize 按批调用，返回与输入对应的 [(类别, AI相关度)]，相关度未知时为 None。
+    """
+
+    def __init__(self, categorize, seen_store=None, per_category=MAX_NEWS_PER_CATEGORY,
+                 total=TOTAL_NEWS_COUNT, near_dup=NEAR_DUP_ENABLED, on_admit=None, on_evict=None,
+                 min_relevance=EMBED_MIN_RELEVANCE, admit_depth=None):
+        self.categorize = categorize
+        self.min_relevance = min_relevance
+        self.seen_store = seen_store
+        self.per_category = per_category
+        self.total = total
+        self.on_admit = on_admit
+        self.on_evict = on_evict
+        self.admit_depth = admit_depth
+        self._admitted = set()
+        self._links = set()
+        self._heaps = {category: [] for category in NEWS_CATEGORIES}
+        self._retained = {}
+        self._lsh = MinHashLSH() if near_dup else None
+        self._seq = 0
+        self.stats = {'received': 0, 'duplicates': 0, 'seen': 0, 'irrelevant': 0, 'near_duplicates': 0}
+
+    def offer_batch(self, articles):
+        """处理一个来源的一批文章"""
+        fresh = []
+        for article in articles:
+            self.stats['received'] += 1
+            link = article.link
+            if link in self._links:
+                self.stats['duplicates'] += 1
+                continue
+            self._links.add(link)
+            fresh.append(article)
+
+        # 已推送索引按批查询，避免每篇文章一次数据库往返
+        if self.seen_store is not None and fresh:
+            unseen = self.seen_store.filter_unseen(fresh)
+            self.stats['seen'] += len(fresh) - len(unseen)
+            fresh = unseen
+
+        if not fresh:
+            return
+        # 整批分类：向量分类一次请求、一次矩阵运算完成，而不是逐篇调用
+        for article, (category, relevance) in zip(fresh, self.categorize(fresh)):
+            article.relevance = relevance
+            if relevance is not None and relevance < self.min_relevance:
+                self.stats['irrelevant'] += 1
+                continue
+            self._offer(article, category)
+
+    @staticmethod
+    def rank(article):
+        """排序键：热度优先，同热度（如RSS文章都为0）时AI相关度高者优先"""
+        return (article.score, article.relevance or 0.0)
+
+    def _offer(self, article, category):
+        signature = None
+        duplicates = ()
+        if self._lsh is not None:
+            signature = self._lsh.signature(article_text(article))
+            if signature is not None:
+                duplicates = self._lsh.query(signature)
+                # 只有比簇内已保留的代表更好时才替换，否则丢弃
+                if any(representative_key(self._retained[seq][0]) >= representative_key(article) for seq in duplicates):
+                    self.stats['near_duplicates'] += 1
+                    return
+
+        article.category = category
+        heap = self._heaps[category]
+        seq = self._seq
+        self._seq += 1
+
+        # 小顶堆：堆顶是排序最低、同分时最晚到达的文章，与按排序键稳定排序后取前K条一致
+        entry = (self.rank(article), -seq, seq)
+        # 先确认新文章能进入本类Top-K（同类中将被它替换的重复文章让出的位置也算在内），再移除重复簇；
+        # 进不去时保留原有代表、丢弃新文章，避免整条新闻从日报中消失
+        contenders = [other for other in heap if other[2] not in duplicates] if duplicates else heap
+        if len(contenders) >= self.per_category and entry <= min(contenders):
+            if duplicates:
+                self.stats['near_duplicates'] += 1
+            return
+        for duplicate in duplicates:
+            self._remove(duplicate)
+            self.stats['near_duplicates'] += 1
+        if len(heap) >= self.per_category:
+            self._remove(heap[0][2])
+
+        heapq.heappush(heap, entry)
+        self._retained[seq] = (article, category)
+        if signature is not None:
+            self._lsh.add(seq, signature)
+        if self.on_admit:
+            self._notify_admitted(heap, seq)
+
+    def _notify_admitted(self, heap, seq):
+        """对新进入（或因新文章进入而排到前 admit_depth 名）的文章调用 on_admit"""
+        if self.admit_depth is None:
+            admitted = [seq]
+        elif len(heap) >= self.per_category:
+            admitted = [entry[2] for entry in heapq.nlargest(self.admit_depth, heap)]
+        else:
+            return
+        for seq in admitted:
+            if seq not in self._admitted:
+                self._admitted.add(seq)
+                self.on_admit(self._retained[seq][0])
+
+    def _remove(self, seq):
+        """把已保留的文章移出堆和近似去重索引"""
+        article, category = self._retained.pop(seq)
+        self._admitted.discard(seq)
+        heap = self._heaps[category]
+        heap[:] = [entry for entry in heap if entry[2] != seq]
+        heapq.heapify(heap)
+        if self._lsh is not None:
+            self._lsh.remove(seq)
+        if self.on_evict:
+            self.on_evict(article)
+
+    def selected(self):
+        """最终入选的文章：按类别顺序排列，每类按分数从高到低，总数不超过 total"""
+        final_selection = []
+        for category, heap in self._heaps.items():
+            for rank, neg_seq, seq in sorted(heap, reverse=True):
+                final_selection.append(self._retained[seq][0])
+
+        if len(final_selection) > self.total:
+            final_selection = sorted(
+                final_selection,
+                key=self.rank,
+                reverse=True
+            )[:self.total]
+
+        if self.on_evict:
+            chosen = {id(article) for article in final_selection}
+            for article, category in self._retained.values():
+                if id(article) not in chosen:
+                    self.on_evict(article)
+        return final_selection
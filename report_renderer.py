@@ -0,0 +1,163 @@
+import sys
+import json
+import functools
+from pathlib import Path
+
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+from config import NEWS_CATEGORIES, FEISHU_MAX_MESSAGE_BYTES, FEISHU_CARD_MAX_ELEMENTS
+
+# 日报中类别的展示顺序
+REPORT_CATEGORIES = list(NEWS_CATEGORIES)
+
+_json_string = functools.partial(json.dumps, ensure_ascii=False)
+
+# 预编译的卡片JSON片段模板：占位符处填入已转义的JSON字符串，整张卡片只拼接一次，不再经过 json.dumps
+CARD_TEMPLATE = (
+    '{"msg_type":"interactive","card":{"config":{"wide_screen_mode":true},'
+    '"header":{"template":"blue","title":{"tag":"plain_text","content":%s}},'
+    '"elements":[%s]}}'
+)
+MARKDOWN_ELEMENT = '{"tag":"div","text":{"tag":"lark_md","content":%s}}'
+DIVIDER_ELEMENT = '{"tag":"hr"}'
+NOTE_ELEMENT = '{"tag":"note","elements":[{"tag":"plain_text","content":%s}]}'
+ARTICLE_MARKDOWN = '**%d. [%s](%s)**\n📝 %s'
+BREAKING_MARKDOWN = '**[%s](%s)**\n📝 %s'
+# 为分卡序号 "（12/34）" 预留的字节数
+PART_LABEL_BYTES = 32
+
+def group_by_category(articles, categories=REPORT_CATEGORIES):
+    """一次遍历把文章按类别分组，保持类别顺序和组内原有顺序；不在 categories 中的类别忽略"""
+    groups = {category: [] for category in categories}
+    for article in articles:
+        group = groups.get(article.category)
+        if group is not None:
+            group.append(article)
+    return groups
+
+def json_bytes(text):
+    """文本放进JSON字符串后占用的字节数（含转义）"""
+    return len(json.dumps(text, ensure_ascii=False).encode('utf-8')) - 2
+
+def hard_split(text, budget):
+    """单个条目仍超长时按行切分，单行超长再按字符切分"""
+    pieces, current, current_bytes = [], [], 0
+    for line in text.split('\n'):
+        line_bytes = json_bytes(line)
+        if current and current_bytes + 2 + line_bytes > budget:
+            pieces.append('\n'.join(current))
+            current, current_bytes = [], 0
+        if line_bytes > budget:
+            part, part_bytes = '', 0
+            for ch in line:
+                ch_bytes = json_bytes(ch)
+                if part_bytes + ch_bytes > budget:
+                    pieces.append(part)
+                    part, part_bytes = '', 0
+                part += ch
+                part_bytes += ch_bytes
+            line, line_bytes = part, part_bytes
+        current.append(line)
+        current_bytes += line_bytes + (2 if len(current) > 1 else 0)
+    if current:
+        pieces.append('\n'.join(current))
+    return pieces
+
+def _markdown_element(text):
+    return MARKDOWN_ELEMENT % _json_string(text)
+
+def _link_text(title):
+    # 方括号会破坏 lark_md 的链接语法，替换为全角
+    return title.replace('[', '［').replace(']', '］')
+
+def render_markdown_card(content, title):
+    """单个 lark_md 元素组成的卡片请求体"""
+    return (CARD_TEMPLATE % (_json_string(title), _markdown_element(content))).encode('utf-8')
+
+def render_breaking_card(article):
+    """突发新闻卡片：单篇文章，脚注注明来源和热度"""
+    elements = _markdown_element(BREAKING_MARKDOWN % (
+        _link_text(article.display_title), article.link, article.summary_ai or ''
+    )) + ',' + NOTE_ELEMENT % _json_string(f"{article.source} · 🔥 {article.score}")
+    return (CARD_TEMPLATE % (_json_string("🔥 AI快讯"), elements)).encode('utf-8')
+
+def render_cards(articles, date_str, max_bytes=FEISHU_MAX_MESSAGE_BYTES, max_elements=FEISHU_CARD_MAX_ELEMENTS):
+    """把日报渲染为飞书交互卡片，返回序列化好的请求体（bytes）列表。
+
+    每个元素只渲染、编码一次；超过请求体大小或元素数上限时按元素边界拆成多张卡片，
+    类别跨卡片时在新卡片开头补上“类别（续）”，单篇超长的文章按行切成多个元素。
+    卡片不以分隔线或没有文章的类别标题结尾。总耗时与文章数成线性关系。
+    """
+    title = f"📅 {date_str} AI新闻日报"
+    budget = max_bytes - len((CARD_TEMPLATE % (_json_string(title), '')).encode('utf-8')) - PART_LABEL_BYTES
+    element_overhead = len((MARKDOWN_ELEMENT % '""').encode('utf-8'))
+
+    def continuation(category):
+        heading = _markdown_element(f"**{category}（续）**")
+        return heading, len(heading.encode('utf-8'))
+
+    # (JSON片段, UTF-8字节数, 所属类别, 是否为结构元素)；类别为None的元素（标题、分隔线、脚注）不触发“续”，
+    # 结构元素（分隔线、类别标题）不能单独留在卡片末尾
+    elements = []
+    for category, items in group_by_category(articles).items():
+        if not items:
+            continue
+        if elements:
+            elements.append((DIVIDER_ELEMENT, len(DIVIDER_ELEMENT), None, True))
+        heading = _markdown_element(f"**{category}**")
+        elements.append((heading, len(heading.encode('utf-8')), None, True))
+        # 跟在“续”标题后面也要放得下（元素之间的逗号占1字节）
+        text_budget = max(1, budget - continuation(category)[1] - 1 - element_overhead)
+        for article in items:
+            text = ARTICLE_MARKDOWN % (
+                article.index, _link_text(article.display_title), article.link, article.summary_ai or ''
+            )
+            pieces = [text] if json_bytes(text) <= text_budget else hard_split(text, text_budget)
+            for piece in pieces:
+                fragment = _markdown_element(piece)
+                elements.append((fragment, len(fragment.encode('utf-8')), category, False))
+    footer = NOTE_ELEMENT % _json_string(f"⏰ 每天早上8:00自动推送 | 共{len(articles)}条要闻")
+    elements.append((footer, len(footer.encode('utf-8')), None, False))
+
+    cards, current, current_bytes = [], [], 0
+
+    def fits(fragment_bytes):
+        return current_bytes + (1 if current else 0) + fragment_bytes <= budget and len(current) < max_elements
+
+    def close_card():
+        """收尾当前卡片，返回从末尾摘下的类别标题，放到下一张卡片开头"""
+        carried = []
+        while current and current[-1][3]:
+            element = current.pop()
+            if element[0] is not DIVIDER_ELEMENT:
+                carried.insert(0, element)
+        if current:
+            cards.append([element[0] for element in current])
+        return carried
+
+    for element in elements:
+        fragment, fragment_bytes, category, structural = element
+        if current and not fits(fragment_bytes):
+            carried = close_card()
+            current, current_bytes = [], 0
+            if not carried and category:
+                heading, heading_bytes = continuation(category)
+                carried = [(heading, heading_bytes, None, True)]
+            for item in carried:
+                current_bytes += item[1] + (1 if current else 0)
+                current.append(item)
+            # 补上的标题与当前元素放不进同一张卡片时（上限设得极小），不补标题
+            if not fits(fragment_bytes):
+                current, current_bytes = [], 0
+        if fragment is DIVIDER_ELEMENT and not current:
+            continue
+        current_bytes += fragment_bytes + (1 if current else 0)
+        current.append(element)
+    close_card()
+
+    bodies = []
+    for i, fragments in enumerate(cards, 1):
+        card_title = title if len(cards) == 1 else f"{title}（{i}/{len(cards)}）"
+        bodies.append((CARD_TEMPLATE % (_json_string(card_title), ','.join(fragments))).encode('utf-8'))
+    return bodies
@@ -0,0 +1,175 @@
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+logger = logging.getLogger(__name__)
+
+class ResultCache:
+    """单文件SQLite键值缓存：按TTL过期，超出容量时按最近访问时间(LRU)淘汰，可跨线程使用"""
+
+    def __init__(self, path, ttl_days, max_entries):
+        self.path = Path(path)
+        self.ttl = ttl_days * 86400
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                'created_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache(accessed_at)')
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"缓存 {self.path.name} 打开失败，本次运行不使用缓存: {e}")
+            self._conn = None
+
+    @staticmethod
+    def make_key(*parts):
+        """由任意可JSON序列化的部分生成内容寻址的键"""
+        raw = json.dumps(parts, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """读取未过期的值，命中时刷新访问时间；未命中返回None"""
+        if self._conn is None:
+            self.misses += 1
+            return None
+
+        now = time.time()
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    'SELECT value, created_at FROM cache WHERE key = ?', (key,)
+                ).fetchone()
+                if row is None or now - row[1] > self.ttl:
+                    if row is not None:
+                        self._conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+                        self.evictions += 1
+                    self.misses += 1
+                    return None
+                self._conn.execute('UPDATE cache SET accessed_at = ? WHERE key = ?', (now, key))
+            except sqlite3.Error as e:
+                logger.warning(f"缓存读取失败: {e}")
+                self.misses += 1
+                return None
+
+        self.hits += 1
+        return row[0]
+
+    def set(self, key, value):
+        """写入或覆盖一个值"""
+        if self._conn is None:
+            return
+
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)',
+                    (key, value, now, now)
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"缓存写入失败: {e}")
+
+    def get_many(self, keys):
+        """批量读取未过期的值，返回 {键: 值}（只含命中的键），命中时刷新访问时间"""
+        keys = list(dict.fromkeys(keys))
+        if self._conn is None:
+            self.misses += len(keys)
+            return {}
+
+        now = time.time()
+        found = {}
+        with self._lock:
+            try:
+                # SQLite 单条语句的参数个数有上限，分段查询
+                for start in range(0, len(keys), 500):
+                    chunk = keys[start:start + 500]
+                    placeholders = ','.join('?' * len(chunk))
+                    found.update(
+                        (key, value)
+                        for key, value in self._conn.execute(
+                            f'SELECT key, value FROM cache WHERE key IN ({placeholders}) AND created_at >= ?',
+                            (*chunk, now - self.ttl)
+                        )
+                    )
+                    hit_keys = [key for key in chunk if key in found]
+                    if hit_keys:
+                        self._conn.execute(
+                            f'UPDATE cache SET accessed_at = ? WHERE key IN ({",".join("?" * len(hit_keys))})',
+                            (now, *hit_keys)
+                        )
+            except sqlite3.Error as e:
+                logger.warning(f"缓存读取失败: {e}")
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def set_many(self, items):
+        """在一个事务中写入多个 (键, 值)"""
+        if self._conn is None:
+            return
+
+        now = time.time()
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.execute('BEGIN')
+                    self._conn.executemany(
+                        'INSERT OR REPLACE INTO cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)',
+                        [(key, value, now, now) for key, value in items]
+                    )
+            except sqlite3.Error as e:
+                logger.warning(f"缓存写入失败: {e}")
+
+    def evict(self):
+        """删除过期条目，并在超出容量时淘汰最久未访问的条目"""
+        if self._conn is None:
+            return
+
+        with self._lock:
+            try:
+                cursor = self._conn.execute('DELETE FROM cache WHERE created_at < ?', (time.time() - self.ttl,))
+                self.evictions += max(cursor.rowcount, 0)
+
+                count = self._conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+                overflow = count - self.max_entries
+                if overflow > 0:
+                    self._conn.execute(
+                        'DELETE FROM cache WHERE key IN '
+                        '(SELECT key FROM cache ORDER BY accessed_at ASC LIMIT ?)',
+                        (overflow,)
+                    )
+                    self.evictions += overflow
+            except sqlite3.Error as e:
+                logger.warning(f"缓存清理失败: {e}")
+
+    def stats(self):
+        """返回命中、未命中和淘汰计数"""
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+    def close(self):
+        """清理后关闭数据库连接"""
+        if self._conn is None:
+            return
+        self.evict()
+        with self._lock:
+            self._conn.close()
+            self._conn = None
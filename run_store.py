@@ -0,0 +1,152 @@
+import os
+import re
+import sys
+import gzip
+import json
+import time
+import shutil
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+from config import RUN_STORE_DIR, RUN_RETENTION_DAYS
+from article import Article
+
+logger = logging.getLogger(__name__)
+
+# 流水线各阶段的检查点，按执行顺序排列
+STAGE_COLLECTED = 'collected'   # 抓取到的全部文章
+STAGE_SELECTED = 'selected'     # 去重、分类、筛选后的文章
+STAGE_PROCESSED = 'processed'   # 完成翻译和总结的文章
+STAGE_REPORT = 'report'         # 日报文本
+STAGE_SENT = 'sent'             # 已成功推送
+STAGES = [STAGE_COLLECTED, STAGE_SELECTED, STAGE_PROCESSED, STAGE_REPORT, STAGE_SENT]
+DELIVERY_LOG = 'delivered'      # 已送达的飞书消息，不属于阶段，发送过程中逐条更新
+SHARD_FILE_RE = re.compile(rf'^{STAGE_COLLECTED}\.shard-(\d+)-of-(\d+)\.jsonl\.gz$')
+
+def shard_stage(index, count):
+    """分片抓取结果的检查点名，如 collected.shard-2-of-4"""
+    return f'{STAGE_COLLECTED}.shard-{index}-of-{count}'
+
+class RunStore:
+    """按日期保存流水线各阶段产出的检查点，用于中断后 --resume 跳过已完成的阶段。
+
+    每个阶段一个 gzip 文件，先写临时文件再原子替换，文件存在即表示该阶段已完整完成。
+    文章列表按 JSON Lines 逐条写入，抓取阶段可以边抓边写而不必在内存中保留全部文章。
+    """
+
+    def __init__(self, run_date=None, root=None):
+        self.run_date = run_date or datetime.now().strftime('%Y-%m-%d')
+        self.root = Path(root or RUN_STORE_DIR)
+        self.path = self.root / self.run_date
+        self.prune()
+
+    def _file(self, stage):
+        return self.path / f'{stage}.jsonl.gz'
+
+    def has(self, stage):
+        return self._file(stage).exists()
+
+    def completed_stages(self):
+        return [stage for stage in STAGES if self.has(stage)]
+
+    def clear(self, keep_shards=False):
+        """丢弃本日期已有的检查点（不带 --resume 的全新运行）；keep_shards 时保留待合并的分片抓取结果"""
+        if not keep_shards:
+            shutil.rmtree(self.path, ignore_errors=True)
+            return
+        for stage in STAGES + [DELIVERY_LOG]:
+            self._file(stage).unlink(missing_ok=True)
+
+    def shards(self):
+        """本日期已完成的分片抓取结果，返回 [(序号, 分片总数)]"""
+        if not self.path.exists():
+            return []
+        return sorted(
+            (int(match.group(1)), int(match.group(2)))
+            for match in (SHARD_FILE_RE.match(path.name) for path in self.path.iterdir())
+            if match
+        )
+
+    def prune(self):
+        """删除超过保留天数的历史运行记录"""
+        if not self.root.exists():
+            return
+        cutoff = time.time() - RUN_RETENTION_DAYS * 86400
+        for run_dir in self.root.iterdir():
+            if run_dir.is_dir() and run_dir.name != self.run_date and run_dir.stat().st_mtime < cutoff:
+                shutil.rmtree(run_dir, ignore_errors=True)
+
+    @contextmanager
+    def writer(self, stage):
+        """逐条写入记录；正常退出时原子提交，出现异常则丢弃，阶段保持未完成状态"""
+        self.path.mkdir(parents=True, exist_ok=True)
+        final_path = self._file(stage)
+        tmp_path = final_path.with_suffix('.tmp')
+        f = gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6)
+
+        def write(record):
+            f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+            f.write('\n')
+
+        try:
+            yield write
+        except BaseException:
+            f.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
+        f.close()
+        os.replace(tmp_path, final_path)
+
+    def save(self, stage, records):
+        try:
+            with self.writer(stage) as write:
+                for record in records:
+                    write(record)
+        except OSError as e:
+            logger.warning(f"检查点 {stage} 写入失败: {e}")
+
+    def load(self, stage):
+        with gzip.open(self._file(stage), 'rt', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def save_articles(self, stage, articles):
+        self.save(stage, (article.to_dict() for article in articles))
+
+    def load_articles(self, stage):
+        return [Article.from_dict(data) for data in self.load(stage)]
+
+    def save_report(self, report):
+        self.save(STAGE_REPORT, [report])
+
+    def load_report(self):
+        return self.load(STAGE_REPORT)[0]
+
+    def delivery_log(self):
+        """记录已送达消息的集合，重跑时跳过这些消息，避免分条发送中途失败后重复推送"""
+        return DeliveryLog(self)
+
+    def mark_sent(self):
+        self.save(STAGE_SENT, [{'sent_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}])
+
+class DeliveryLog:
+    """线程安全的已送达消息记录，每次新增后立即写回检查点"""
+
+    def __init__(self, run_store):
+        self.run_store = run_store
+        self._lock = threading.Lock()
+        self._keys = set(run_store.load(DELIVERY_LOG)) if run_store.has(DELIVERY_LOG) else set()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._keys
+
+    def add(self, key):
+        with self._lock:
+            self._keys.add(key)
+            self.run_store.save(DELIVERY_LOG, sorted(self._keys))
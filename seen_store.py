@@ -0,0 +1,130 @@
+import re
+import sys
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+logger = logging.getLogger(__name__)
+
+# 不影响文章身份的跟踪参数
+TRACKING_PARAMS = {'fbclid', 'gclid', 'ref', 'ref_src', 'spm'}
+
+# 标题指纹时忽略的字符：空白和中英文标点
+TITLE_NOISE_RE = re.compile(r'[\s\W_]+', re.UNICODE)
+
+# SQLite 单条语句的参数上限较低，批量查询时分段
+QUERY_CHUNK_SIZE = 500
+
+def normalize_url(url):
+    """规范化URL：小写协议和主机、去掉www.、锚点、跟踪参数和末尾斜杠，查询参数排序"""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith('utm_') and k.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit(('https' if parts.scheme in ('http', 'https') else parts.scheme, host, path, urlencode(query), ''))
+
+def title_fingerprint(title):
+    """标题指纹：去掉大小写、空白和标点后的哈希，标题为空时返回None"""
+    text = TITLE_NOISE_RE.sub('', (title or '').lower())
+    if not text:
+        return None
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+class SeenStore:
+    """跨运行的已推送文章索引，按规范化URL和标题指纹去重，超过保留期的记录自动清除"""
+
+    def __init__(self, path, retention_days):
+        self.path = Path(path)
+        self.retention = retention_days * 86400
+        self._lock = threading.Lock()
+        self._conn = None
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY, seen_at REAL NOT NULL)')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_seen_at ON seen(seen_at)')
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"已推送索引打开失败，本次运行不做跨天去重: {e}")
+            self._conn = None
+
+    @staticmethod
+    def article_keys(article):
+        """文章的全部去重键：URL键和标题键"""
+        keys = ['u:' + normalize_url(article.link)]
+        fingerprint = title_fingerprint(article.title)
+        if fingerprint:
+            keys.append('t:' + fingerprint)
+        return keys
+
+    def _existing(self, keys):
+        """返回已存在于索引中的键集合"""
+        found = set()
+        keys = list(keys)
+        for i in range(0, len(keys), QUERY_CHUNK_SIZE):
+            chunk = keys[i:i + QUERY_CHUNK_SIZE]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self._conn.execute(
+                f'SELECT key FROM seen WHERE key IN ({placeholders}) AND seen_at >= ?',
+                (*chunk, time.time() - self.retention)
+            )
+            found.update(row[0] for row in rows)
+        return found
+
+    def filter_unseen(self, articles):
+        """过滤掉保留期内已推送过的文章"""
+        if self._conn is None:
+            return list(articles)
+
+        articles = list(articles)
+        keyed = [(article, self.article_keys(article)) for article in articles]
+        with self._lock:
+            try:
+                seen = self._existing({key for _, keys in keyed for key in keys})
+            except sqlite3.Error as e:
+                logger.warning(f"已推送索引查询失败: {e}")
+                return articles
+        return [article for article, keys in keyed if not any(key in seen for key in keys)]
+
+    def mark_seen(self, articles):
+        """记录已推送的文章，并清除超过保留期的旧记录"""
+        if self._conn is None:
+            return
+
+        now = time.time()
+        rows = [(key, now) for article in articles for key in self.article_keys(article)]
+        with self._lock:
+            try:
+                self._conn.execute('BEGIN')
+                self._conn.executemany('INSERT OR REPLACE INTO seen (key, seen_at) VALUES (?, ?)', rows)
+                self._conn.execute('DELETE FROM seen WHERE seen_at < ?', (now - self.retention,))
+                self._conn.execute('COMMIT')
+            except sqlite3.Error as e:
+                if self._conn.in_transaction:
+                    self._conn.execute('ROLLBACK')
+                logger.warning(f"已推送索引写入失败: {e}")
+
+    def close(self):
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.close()
+            self._conn = None
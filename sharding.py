@@ -0,0 +1,87 @@
+import sys
+import time
+import logging
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+from config import NEAR_DUP_ENABLED
+from news_collector import NewsCollector
+from dedup import collapse_near_duplicates, representative_key
+from metrics import metrics
+from run_store import RunStore, STAGE_COLLECTED, shard_stage
+
+logger = logging.getLogger(__name__)
+
+def collect_shard(index, count, run_date=None, root=None):
+    """抓取第 index/count 个分片的新闻源，结果写入当天的分片检查点，返回文章数。
+
+    可以在CI矩阵的各个任务中直接调用，也可以作为本机多进程抓取的子进程入口。
+    """
+    collector = NewsCollector(shard=(index, count))
+    run_store = RunStore(run_date, root)
+    logger.info(f"🧩 分片 {index}/{count}: {len(collector.sources)} 个新闻源")
+    articles = collector.collect_all_news()
+    run_store.save_articles(shard_stage(index, count), articles)
+    logger.info("\n" + collector.source_health.scoreboard())
+    logger.info(f"  ✓ 分片 {index}/{count} 写入 {len(articles)} 条新闻")
+    return len(articles)
+
+def collect_parallel(run_store, workers):
+    """在 workers 个子进程中分片抓取，各自写出分片检查点；某个分片失败时其余分片照常完成"""
+    logger.info(f"\n📡 使用 {workers} 个进程分片抓取新闻源...")
+    started = time.perf_counter()
+    # 与正文补全一致使用 spawn，避免 fork 继承父进程中其它线程持有的锁
+    context = multiprocessing.get_context('spawn')
+    with metrics.timer('stage', stage='collect'), \
+            ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {
+            pool.submit(collect_shard, index, workers, run_store.run_date, run_store.root): index
+            for index in range(1, workers + 1)
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"  ✗ 分片 {futures[future]}/{workers} 抓取失败: {e}")
+    logger.info(f"✅ 分片抓取完成，耗时 {time.perf_counter() - started:.1f}s")
+
+def merge_shards(run_store):
+    """合并当天的分片抓取结果：同一链接保留热度高者，再合并近似重复，写入 collected 检查点并返回文章列表"""
+    shards = run_store.shards()
+    if not shards:
+        logger.warning(f"{run_store.run_date} 没有可合并的分片抓取结果")
+        run_store.save_articles(STAGE_COLLECTED, [])
+        return []
+
+    # 目录中混有不同分片数的结果时（如修改过分片数），以文件最多的一组为准
+    count = Counter(count for index, count in shards).most_common(1)[0][0]
+    present = [index for index, shard_count in shards if shard_count == count]
+    missing = sorted(set(range(1, count + 1)) - set(present))
+    if missing:
+        logger.warning(f"  ⚠ 缺少分片 {', '.join(f'{index}/{count}' for index in missing)}，只合并已完成的 {len(present)} 个分片")
+
+    with metrics.timer('stage', stage='merge'):
+        by_link = {}
+        received = 0
+        for index in present:
+            for article in run_store.load_articles(shard_stage(index, count)):
+                received += 1
+                existing = by_link.get(article.link)
+                if existing is None or representative_key(article) > representative_key(existing):
+                    by_link[article.link] = article
+        articles = list(by_link.values())
+        if NEAR_DUP_ENABLED:
+            articles = collapse_near_duplicates(articles)
+        run_store.save_articles(STAGE_COLLECTED, articles)
+
+    metrics.incr('shards_merged', len(present))
+    logger.info(
+        f"🧩 合并 {len(present)}/{count} 个分片: 共 {received} 条，重复链接 {received - len(by_link)} 条，"
+        f"近似重复 {len(by_link) - len(articles)} 条，保留 {len(articles)} 条"
+    )
+    return articles
@@ -0,0 +1,142 @@
+import os
+import sys
+import json
+import time
+import logging
+from datetime import datetime
+from pathlib import Path
+
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+from config import (
+    FETCH_TIMEOUT,
+    SOURCE_HEALTH_FILE,
+    SOURCE_LATENCY_SAMPLES,
+    SOURCE_TIMEOUT_FACTOR,
+    SOURCE_TIMEOUT_MIN,
+    SOURCE_BREAKER_THRESHOLD,
+    SOURCE_BREAKER_COOLDOWN,
+    SOURCE_BREAKER_MAX_COOLDOWN,
+    SOURCE_PROBE_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+# 熔断器状态
+CLOSED = 'closed'      # 正常抓取
+OPEN = 'open'          # 连续失败，冷却期内直接跳过
+HALF_OPEN = 'half_open'  # 冷却期已过，用较短超时试探一次
+
+def percentile(values, q):
+    """线性插值百分位数，values 为空时返回None"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+class SourceHealth:
+    """持久化的新闻源健康记录：延迟样本、连续失败次数、最近成功时间。
+
+    据此为每个源计算自适应超时，并对持续失败的源熔断（跳过）或试探。
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path or SOURCE_HEALTH_FILE)
+        self.records = {}
+        self.run = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.records = json.load(f)
+        except FileNotFoundError:
+            self.records = {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"新闻源健康记录读取失败，将重新建立: {e}")
+            self.records = {}
+
+    def _record(self, key, name):
+        record = self.records.setdefault(key, {
+            'latencies': [],
+            'error_streak': 0,
+            'last_success': None,
+            'last_error': None,
+            'open_until': 0
+        })
+        record['name'] = name
+        return record
+
+    def state(self, key, name):
+        """熔断器状态：CLOSED / OPEN / HALF_OPEN"""
+        record = self._record(key, name)
+        if record['error_streak'] < SOURCE_BREAKER_THRESHOLD:
+            return CLOSED
+        if time.time() < record['open_until']:
+            return OPEN
+        return HALF_OPEN
+
+    def timeout_for(self, key, name):
+        """自适应超时：历史 p95 延迟乘以系数，限制在 [SOURCE_TIMEOUT_MIN, FETCH_TIMEOUT]；试探时用短超时"""
+        if self.state(key, name) == HALF_OPEN:
+            return SOURCE_PROBE_TIMEOUT
+        latencies = self._record(key, name)['latencies']
+        if len(latencies) < 3:
+            return FETCH_TIMEOUT
+        return min(FETCH_TIMEOUT, max(SOURCE_TIMEOUT_MIN, percentile(latencies, 0.95) * SOURCE_TIMEOUT_FACTOR))
+
+    def record_success(self, key, name, elapsed, latency):
+        """elapsed 为本次总耗时（含排队），latency 为网络请求耗时，只有后者用于自适应超时"""
+        record = self._record(key, name)
+        record['latencies'] = (record['latencies'] + [round(latency, 3)])[-SOURCE_LATENCY_SAMPLES:]
+        record['error_streak'] = 0
+        record['open_until'] = 0
+        record['last_success'] = time.time()
+        self.run[key] = {'name': name, 'elapsed': elapsed, 'status': 'ok'}
+
+    def record_failure(self, key, name, elapsed, error):
+        record = self._record(key, name)
+        record['error_streak'] += 1
+        record['last_error'] = f"{type(error).__name__}: {error}"[:200]
+        streak_over = record['error_streak'] - SOURCE_BREAKER_THRESHOLD
+        if streak_over >= 0:
+            # 每多失败一次冷却时间翻倍，直到上限
+            cooldown = min(SOURCE_BREAKER_COOLDOWN * (2 ** streak_over), SOURCE_BREAKER_MAX_COOLDOWN)
+            record['open_until'] = time.time() + cooldown
+            logger.warning(f"  ⚡ {name} 已连续失败 {record['error_streak']} 次，熔断 {cooldown / 3600:.1f} 小时")
+        self.run[key] = {'name': name, 'elapsed': elapsed, 'status': 'error'}
+
+    def record_skipped(self, key, name):
+        self.run[key] = {'name': name, 'elapsed': 0.0, 'status': 'skipped'}
+
+    def save(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.records, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"新闻源健康记录写入失败: {e}")
+
+    def scoreboard(self):
+        """本次运行的新闻源记分板，按耗时从高到低排列"""
+        lines = ["📈 新闻源健康记分板（按本次耗时排序）:"]
+        status_text = {'ok': '✓', 'error': '✗', 'skipped': '⏸'}
+        for key, run in sorted(self.run.items(), key=lambda item: item[1]['elapsed'], reverse=True):
+            record = self.records.get(key, {})
+            latencies = record.get('latencies', [])
+            p50 = percentile(latencies, 0.5)
+            p95 = percentile(latencies, 0.95)
+            last_success = record.get('last_success')
+            last_success_text = datetime.fromtimestamp(last_success).strftime('%m-%d %H:%M') if last_success else '从未'
+            lines.append(
+                f"  {status_text[run['status']]} {run['name']}: 本次 {run['elapsed']:.1f}s，"
+                f"p50 {p50 or 0:.1f}s，p95 {p95 or 0:.1f}s，"
+                f"连续失败 {record.get('error_streak', 0)} 次，最近成功 {last_success_text}"
+            )
+        return '\n'.join(lines)
@@ -0,0 +1,107 @@
+import sys
+import json
+import zlib
+import logging
+from pathlib import Path
+from urllib.parse import urlsplit
+
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+from config import SOURCES, NEWS_SOURCES_FILE, DAEMON_POLL_INTERVALS
+
+logger = logging.getLogger(__name__)
+
+# 支持的源类型；每种类型在 NewsCollector.FETCHERS 中对应一个抓取与解析方法
+SOURCE_TYPES = ('rss', 'hn', 'reddit', 'weibo')
+
+class Source:
+    """注册表中的一个新闻源。key 用作条件请求缓存和健康记录的键，取源的URL"""
+
+    __slots__ = ('type', 'url', 'name', 'region', 'interval', 'keywords')
+
+    def __init__(self, type, url, name=None, region='', interval=None, keywords=None):
+        if type not in SOURCE_TYPES:
+            raise ValueError(f"新闻源 {name or url} 的类型 {type!r} 不受支持，可选: {', '.join(SOURCE_TYPES)}")
+        if not url:
+            raise ValueError(f"新闻源 {name or type} 缺少 url")
+        self.type = type
+        self.url = url
+        self.name = sys.intern(name or urlsplit(url).netloc or url)
+        self.region = sys.intern(region or '')
+        self.interval = float(interval or DAEMON_POLL_INTERVALS.get(type, DAEMON_POLL_INTERVALS['rss']))
+        self.keywords = list(keywords or [])
+
+    @property
+    def key(self):
+        return self.url
+
+    def to_dict(self):
+        data = {'type': self.type, 'url': self.url, 'name': self.name}
+        if self.region:
+            data['region'] = self.region
+        if self.interval != DAEMON_POLL_INTERVALS.get(self.type, DAEMON_POLL_INTERVALS['rss']):
+            data['interval'] = self.interval
+        if self.keywords:
+            data['keywords'] = self.keywords
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            type=data.get('type', ''),
+            url=data.get('url', ''),
+            name=data.get('name'),
+            region=data.get('region', ''),
+            interval=data.get('interval'),
+            keywords=data.get('keywords')
+        )
+
+    def __repr__(self):
+        return f"Source({self.type}, {self.name!r})"
+
+def load_sources(entries=None, path=NEWS_SOURCES_FILE):
+    """读取新闻源注册表：传入 entries 时直接使用，否则读 path 指向的JSON文件，都没有时用 config.SOURCES。
+
+    配置有误（未知类型、缺少url）时抛出 ValueError；URL重复的源只保留第一个。
+    """
+    if entries is None and path:
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        logger.info(f"📋 从 {path} 加载 {len(entries)} 个新闻源")
+    elif entries is None:
+        entries = SOURCES
+
+    sources = {}
+    for entry in entries:
+        source = entry if isinstance(entry, Source) else Source.from_dict(entry)
+        if source.key in sources:
+            logger.warning(f"新闻源 {source.name} 的URL重复，已忽略: {source.url}")
+            continue
+        sources[source.key] = source
+    return list(sources.values())
+
+def parse_shard(text):
+    """解析 'i/N'（1 ≤ i ≤ N）为 (i, N)，用作 argparse 的 type"""
+    try:
+        index, count = (int(part) for part in text.split('/'))
+    except ValueError:
+        raise ValueError(f"分片格式应为 i/N，例如 1/4: {text!r}")
+    if not 1 <= index <= count:
+        raise ValueError(f"分片序号应在 1 到 {count} 之间: {text!r}")
+    return index, count
+
+def shard_of(source, count):
+    """源所属的分片（1 起）。按URL哈希分配，增删其它源不会改变已有源的分片，各分片的缓存保持有效"""
+    return zlib.crc32(source.key.encode('utf-8')) % count + 1
+
+def select_shard(sources, index, count):
+    return [source for source in sources if shard_of(source, count) == index]
+
+def shard_path(path, shard):
+    """分片各自的缓存文件，如 http_cache.json -> http_cache.shard-2-of-4.json；不分片时返回原路径"""
+    path = Path(path)
+    if shard is None:
+        return path
+    index, count = shard
+    return path.with_name(f'{path.stem}.shard-{index}-of-{count}{path.suffix}')
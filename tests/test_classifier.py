@@ -0,0 +1,42 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classifier import KeywordClassifier
+from config import CATEGORY_KEYWORDS, DEFAULT_CATEGORY
+
+@pytest.fixture(scope='module')
+def classifier():
+    return KeywordClassifier(CATEGORY_KEYWORDS)
+
+@pytest.mark.parametrize('title, expected', [
+    # 短关键词不做词形变化：ipo 不命中 ipod
+    ("Apple iPod turns 25", DEFAULT_CATEGORY),
+    # 列出变体的关键词只匹配自身和变体：round 不命中 rounding
+    ("Fixing rounding errors in fp8 training kernels", '🔬 技术突破'),
+    # 词组不做词形变化：series a 不命中 series as
+    ("A series as well as films", DEFAULT_CATEGORY),
+    # 不再允许派生后缀：product 不命中 productions
+    ("Productions of AI films", DEFAULT_CATEGORY),
+])
+def test_no_false_inflections(classifier, title, expected):
+    assert classifier.classify(title) == expected
+
+@pytest.mark.parametrize('title, expected', [
+    ("OpenAI launches a new agent", '🚀 产品发布'),
+    ("Startup raised $20M in new funding rounds", '💰 投融资'),
+    ("Two AI startups file for IPOs", '💰 投融资'),
+    ("New language models top the benchmarks", '🔬 技术突破'),
+    ("Background noise in audio", DEFAULT_CATEGORY),
+])
+def test_inflections_and_variants(classifier, title, expected):
+    assert classifier.classify(title) == expected
+
+def test_explicit_variants_replace_inflection():
+    classifier = KeywordClassifier({'A': [('launch', ['launched'])], 'B': ['release'], 'other': []}, default_category='other')
+    assert classifier.classify("Launched today") == 'A'
+    assert classifier.classify("Launches today") == 'other'
+    assert classifier.classify("Releases today") == 'B'
@@ -0,0 +1,63 @@
+import sys
+import time
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llm_router import LLMRouter, Provider
+from token_budget import TokenBudget
+
+class FakeCompletions:
+    """按固定延迟返回带用量的回复，记录被调用的次数"""
+
+    def __init__(self, delay, prompt_tokens, completion_tokens):
+        self.delay = delay
+        self.usage = SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def create(self, model, **params):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return SimpleNamespace(usage=self.usage, choices=[SimpleNamespace(message=SimpleNamespace(content=model))])
+
+def fake_provider(name, delay, prompt_tokens=100, completion_tokens=20):
+    provider = Provider(name, 'key', name)
+    completions = FakeCompletions(delay, prompt_tokens, completion_tokens)
+    provider._client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return provider, completions
+
+def make_router(primary_delay, backup_delay):
+    primary, primary_calls = fake_provider('primary', primary_delay, 100, 20)
+    backup, backup_calls = fake_provider('backup', backup_delay, 90, 10)
+    router = LLMRouter([primary, backup], hedge=True)
+    router.hedge_delay = lambda provider: 0.05
+    return router, primary_calls, backup_calls
+
+def test_losing_hedge_is_settled_against_budget():
+    router, primary_calls, backup_calls = make_router(primary_delay=0.5, backup_delay=0.01)
+    budget = TokenBudget(max_tokens=1000, seconds=0)
+    reserved = budget.reserve(150)
+    response = router.complete(budget, 150, messages=[])
+    budget.settle(reserved, response.usage.prompt_tokens + response.usage.completion_tokens)
+    assert response.choices[0].message.content == 'backup'
+    # 等落败的主提供商请求结束，其用量通过完成回调结算
+    router._executor.shutdown(wait=True)
+    assert (primary_calls.calls, backup_calls.calls) == (1, 1)
+    assert budget.reserved == 0
+    assert budget.used == 100 + 120
+
+def test_no_hedge_without_budget_for_it():
+    router, primary_calls, backup_calls = make_router(primary_delay=0.2, backup_delay=0.01)
+    budget = TokenBudget(max_tokens=200, seconds=0)
+    reserved = budget.reserve(150)
+    response = router.complete(budget, 150, messages=[])
+    budget.settle(reserved, 120)
+    router.close()
+    assert response.choices[0].message.content == 'primary'
+    assert backup_calls.calls == 0
+    assert budget.rejected == 0
+    assert budget.reserved == 0
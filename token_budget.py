@@ -0,0 +1,160 @@
+import re
+import sys
+import time
+import logging
+import threading
+from pathlib import Path
+
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+from config import LLM_TOKEN_BUDGET, LLM_TIME_BUDGET, LLM_TOKENIZER
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# 中日韩文字与全角标点：估算时每个字符约计 1 个 token
+CJK_RE = re.compile(r'[　-〿㐀-䶿一-鿿가-힯＀-￯]')
+# 每条消息的角色与分隔符开销
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+def _get_encoding():
+    """安装了 tiktoken 时返回编码器（只在第一次计数时导入），否则返回 None"""
+    global _encoding
+    if _encoding is None:
+        with _encoding_lock:
+            if _encoding is None:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding(LLM_TOKENIZER)
+                except Exception as e:  # 未安装，或首次使用时下载编码文件失败
+                    logger.debug("tiktoken 不可用，按字符数估算 token: %s", e)
+                    _encoding = False
+    return _encoding or None
+
+def count_tokens(text):
+    """估算文本的 token 数：有 tiktoken 时精确计数，否则中文按每字 1 个、其它按每 4 个字符 1 个"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    cjk = len(CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+def truncate_to_tokens(text, limit):
+    """截断到不超过 limit 个 token"""
+    if not text or count_tokens(text) <= limit:
+        return text
+    encoding = _get_encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:limit]).rstrip()
+    cut = len(text) * limit // count_tokens(text)
+    while cut > 0 and count_tokens(text[:cut]) > limit:
+        cut = cut * 9 // 10
+    return text[:cut].rstrip()
+
+def message_tokens(messages):
+    """对话请求提示词部分的 token 估算"""
+    return sum(count_tokens(message.get('content', '')) + MESSAGE_OVERHEAD_TOKENS for message in messages) + 2
+
+class BudgetExhausted(Exception):
+    """本次运行的AI token 或时间预算已用完；used 为被中止的请求已消耗的 token 估算"""
+
+    def __init__(self, message, used=0):
+        super().__init__(message)
+        self.used = used
+
+class TokenBudget:
+    """单次运行的AI请求预算：token 总量与时间上限（0 表示不限），可跨线程使用。
+
+    请求前按 提示词估算 + max_tokens 预留，完成后按实际用量结算并退回多预留的部分。
+    时间从调用 start()（开始总结入选文章）时计算；在此之前的请求（抓取期间的提前总结）只占用 token 预算。
+    """
+
+    def __init__(self, max_tokens=LLM_TOKEN_BUDGET, seconds=LLM_TIME_BUDGET):
+        self.max_tokens = max_tokens
+        self.seconds = seconds
+        self.deadline = None
+        self.used = 0
+        self.reserved = 0
+        self.rejected = 0
+        self.fallbacks = 0
+        self._lock = threading.Lock()
+
+    def remaining_time(self):
+        """距离截止时间的秒数；不限时或尚未开始计时返回 None"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    @property
+    def expired(self):
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def _reject(self, reason):
+        # 调用方持有锁
+        self.rejected += 1
+        if self.rejected == 1:
+            logger.warning(f"  ⚠ {reason}，优先级靠后的文章将使用标题代替AI总结")
+        metrics.incr('llm_budget_rejections')
+        raise BudgetExhausted(reason)
+
+    def check_time(self):
+        if self.expired:
+            with self._lock:
+                self._reject(f"超过本次运行的AI时间预算 {self.seconds:g}s")
+
+    def start(self):
+        """开始计时；重复调用不会推迟截止时间"""
+        with self._lock:
+            if self.deadline is None and self.seconds:
+                self.deadline = time.monotonic() + self.seconds
+
+    def reserve(self, tokens):
+        """为一次请求预留 tokens，预算不足或已超时时抛出 BudgetExhausted"""
+        self.check_time()
+        with self._lock:
+            if self.max_tokens and self.used + self.reserved + tokens > self.max_tokens:
+                self._reject(f"本次运行的AI token 预算不足（已用 {self.used}/{self.max_tokens}）")
+            self.reserved += tokens
+        return tokens
+
+    def try_reserve(self, tokens):
+        """为可有可无的请求（如对冲）预留 tokens；预算不足或已超时时返回 False，不计为拒绝"""
+        if self.expired:
+            return False
+        with self._lock:
+            if self.max_tokens and self.used + self.reserved + tokens > self.max_tokens:
+                return False
+            self.reserved += tokens
+        return True
+
+    def settle(self, reserved, used):
+        """请求结束（成功或失败）后结算：释放预留，计入实际用量"""
+        with self._lock:
+            self.reserved -= reserved
+            self.used += used
+
+    def share_used(self):
+        """已用与预留的 token 占预算的比例；不限 token 时为 0"""
+        with self._lock:
+            return (self.used + self.reserved) / self.max_tokens if self.max_tokens else 0.0
+
+    def record_fallback(self):
+        """记录一篇因预算不足而使用标题代替总结的文章"""
+        with self._lock:
+            self.fallbacks += 1
+        metrics.incr('llm_budget_fallbacks')
+
+    def stats(self):
+        with self._lock:
+            return {
+                'used': self.used,
+                'max_tokens': self.max_tokens,
+                'rejected': self.rejected,
+                'fallbacks': self.fallbacks
+            }